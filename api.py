@@ -1,7 +1,10 @@
 import os
 import sys
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, Any
 from fastapi import FastAPI, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -16,12 +19,24 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from business_state import BusinessState
 from monte_carlo import run_monte_carlo
 from node_generation_gemini import generate_child_nodes
+from utils.schemas import SimulationResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Business Simulator API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Monte Carlo runs are CPU-bound Python; run them in worker processes so
+    # concurrent requests are not serialized by the GIL on the event loop.
+    # Created here rather than at import, so importing the module spawns nothing.
+    app.state.executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+    try:
+        yield
+    finally:
+        app.state.executor.shutdown(cancel_futures=True)
+
+app = FastAPI(title="Business Simulator API", lifespan=lifespan)
 
 # Configure CORS - Allow all origins for local development
 app.add_middleware(
@@ -41,10 +56,10 @@ class SimulationRequest(BaseModel):
 class NodeGenerationRequest(BaseModel):
     state: Dict[str, Any]
 
-@app.post("/simulate")
+@app.post("/simulate", response_model=SimulationResponse, response_model_exclude_none=True)
 async def simulate(request: SimulationRequest):
     try:
-        logger.info(f"Received simulation request: {request.action}")
+        logger.info("Received simulation request: %s", request.action)
         
         # Parse state
         try:
@@ -54,21 +69,23 @@ async def simulate(request: SimulationRequest):
             
         # Run Simulation
         try:
-            results = run_monte_carlo(
-                state, 
-                request.action, 
-                months=request.months, 
-                num_runs=request.num_runs
+            results = await asyncio.get_running_loop().run_in_executor(
+                app.state.executor,
+                run_monte_carlo,
+                state,
+                request.action,
+                request.months,
+                request.num_runs
             )
         except Exception as e:
-            logger.error(f"Simulation failed: {e}", exc_info=True)
+            logger.error("Simulation failed: %s", e, exc_info=True)
             raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
             
         return results
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error: {e}", exc_info=True)
+        logger.error("Unexpected error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/generate_nodes")
@@ -79,7 +96,7 @@ async def generate_nodes(request: NodeGenerationRequest):
         nodes = generate_child_nodes(state)
         return {"nodes": nodes}
     except Exception as e:
-        logger.error(f"Node generation failed: {e}", exc_info=True)
+        logger.error("Node generation failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
@@ -21,6 +21,7 @@ load_dotenv()
 from business_state import BusinessState
 from monte_carlo import run_monte_carlo
 from node_generation_gemini import generate_child_nodes
+from utils.schemas import SimulationResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -54,10 +55,10 @@ async def root():
     return {"message": "Business Simulator API", "status": "healthy"}
 
 
-@app.post("/api/simulate")
+@app.post("/api/simulate", response_model=SimulationResponse, response_model_exclude_none=True)
 async def simulate(request: SimulationRequest):
     try:
-        logger.info(f"Received simulation request: {request.action}")
+        logger.info("Received simulation request: %s", request.action)
 
         try:
             state = BusinessState.from_dict(request.initial_state)
@@ -72,14 +73,14 @@ async def simulate(request: SimulationRequest):
                 num_runs=request.num_runs
             )
         except Exception as e:
-            logger.error(f"Simulation failed: {e}", exc_info=True)
+            logger.error("Simulation failed: %s", e, exc_info=True)
             raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
         return results
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error: {e}", exc_info=True)
+        logger.error("Unexpected error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -91,5 +92,5 @@ async def generate_nodes(request: NodeGenerationRequest):
         nodes = generate_child_nodes(state)
         return {"nodes": nodes}
     except Exception as e:
-        logger.error(f"Node generation failed: {e}", exc_info=True)
+        logger.error("Node generation failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -7,21 +7,104 @@ Implements 'Probabilistic Priors' to attach downstream outcome distributions to
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple, Dict
+from typing import List, Optional, Sequence, Tuple, Dict, Iterator
 import random
+import functools
 import itertools
 import math
 
+import numpy as np
+
+# Shared generator for batched sampling (PCG64); pass an explicit rng for reproducibility
+_RNG = np.random.default_rng()
+
+# Batched multipliers match the float32 batch state in causal_graph_prototype
+_DTYPE = np.float32
+
+# Keeps stratified uniforms strictly inside (0, 1) for the inverse CDF
+_OPEN_UNIT = (np.finfo(np.float64).tiny, 1.0 - np.finfo(np.float64).epsneg)
+
+
+def _standard_normal(rng: np.random.Generator, n: int, antithetic: bool) -> np.ndarray:
+    """n standard normals; antithetic draws pair each z with -z"""
+    if not antithetic:
+        return rng.standard_normal(n, dtype=_DTYPE)
+    z = rng.standard_normal((n + 1) // 2, dtype=_DTYPE)
+    return np.concatenate([z, -z])[:n]
+
+
+def _uniform(rng: np.random.Generator, n: int, antithetic: bool) -> np.ndarray:
+    """n uniforms on [0, 1); antithetic draws pair each u with 1 - u"""
+    if not antithetic:
+        return rng.random(n, dtype=_DTYPE)
+    u = rng.random((n + 1) // 2, dtype=_DTYPE)
+    return np.concatenate([u, 1.0 - u])[:n]
+
+
+def _stratified_uniform(rng: np.random.Generator, n: int) -> np.ndarray:
+    """
+    n float64 uniforms with exactly one draw in each stratum [i/n, (i+1)/n),
+    shuffled so independent calls pair up like a Latin hypercube.
+    """
+    u = (rng.permutation(n) + rng.random(n)) / n
+    return np.clip(u, *_OPEN_UNIT)
+
+
+# Acklam's rational approximation to the standard normal inverse CDF
+# (relative error below 1.2e-9): a central rational in q = u - 0.5 and a
+# tail rational in sqrt(-2 ln u), switched at _ACKLAM_LOW
+_ACKLAM_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+             1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_ACKLAM_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+             6.680131188771972e+01, -1.328068155288572e+01)
+_ACKLAM_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+             -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_ACKLAM_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+             3.754408661907416e+00)
+_ACKLAM_LOW = 0.02425
+
+
+def _inverse_normal_cdf(u: np.ndarray) -> np.ndarray:
+    """Vectorized standard normal inverse CDF for u strictly inside (0, 1)"""
+    a, b, c, d = _ACKLAM_A, _ACKLAM_B, _ACKLAM_C, _ACKLAM_D
+    q = u - 0.5
+    r = q * q
+    z = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / \
+        (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1.0)
+
+    tail = np.minimum(u, 1.0 - u) < _ACKLAM_LOW
+    if tail.any():
+        ut = u[tail]
+        t = np.sqrt(-2.0 * np.log(np.minimum(ut, 1.0 - ut)))
+        zt = (((((c[0] * t + c[1]) * t + c[2]) * t + c[3]) * t + c[4]) * t + c[5]) / \
+             ((((d[0] * t + d[1]) * t + d[2]) * t + d[3]) * t + 1.0)
+        z[tail] = np.where(ut < 0.5, zt, -zt)
+    return z
+
+
+def _stratified_standard_normal(rng: np.random.Generator, n: int) -> np.ndarray:
+    """n standard normals by inverting the CDF at stratified uniforms"""
+    return _inverse_normal_cdf(_stratified_uniform(rng, n)).astype(_DTYPE)
+
 # ============================================================================
 # Prior Distribution Logic
 # ============================================================================
 
-@dataclass
+@dataclass(frozen=True)
 class PriorDistribution:
     """Defines the shape of the outcome distribution"""
     dist_type: str  # "log-normal", "sales-normal" (clipped), "fat-tailed"
     mean_multiplier: float  # Multiplier on the baseline metric (e.g. 1.2x CAC)
     variance_sigma: float   # Variance/Risk parameter (sigma for log-normal)
+    _mu: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # mu parameter needs to be adjusted so that the *expected value* matches mean_multiplier
+        # E[X] = exp(mu + sigma^2/2) => mu = ln(E[X]) - sigma^2/2
+        mu = math.nan
+        if self.dist_type in ("log-normal", "fat-tailed"):
+            mu = math.log(self.mean_multiplier) - (self.variance_sigma**2 / 2)
+        object.__setattr__(self, "_mu", mu)
     
     def sample_multiplier(self) -> float:
         """Sample a multiplier from the distribution"""
@@ -30,15 +113,12 @@ class PriorDistribution:
             
         elif self.dist_type == "log-normal":
             # Log-normal: Good for things that can't be negative (CAC, Price)
-            # mu parameter needs to be adjusted so that the *expected value* matches mean_multiplier
-            # E[X] = exp(mu + sigma^2/2) => mu = ln(E[X]) - sigma^2/2
-            mu = math.log(self.mean_multiplier) - (self.variance_sigma**2 / 2)
-            return random.lognormvariate(mu, self.variance_sigma)
+            return random.lognormvariate(self._mu, self.variance_sigma)
             
         elif self.dist_type == "fat-tailed":
             # Simulating fat tails using a mix of log-normal and occasional extreme outliers
             # Or just a high-sigma log-normal for MVP simplicity with occasional boost
-            basis = self.sample_log_normal(self.mean_multiplier, self.variance_sigma)
+            basis = random.lognormvariate(self._mu, self.variance_sigma)
             # 5% chance of a "Black Swan" event (extreme failure/variance)
             if random.random() < 0.05:
                 return basis * random.uniform(1.5, 3.0) # Disaster/Extreme scenario
@@ -51,6 +131,50 @@ class PriorDistribution:
         mu = math.log(mean) - (sigma**2 / 2)
         return random.lognormvariate(mu, sigma)
 
+    def sample_multiplier_batch(
+        self,
+        n: int,
+        rng: Optional[np.random.Generator] = None,
+        antithetic: bool = False,
+        stratified: bool = False
+    ) -> np.ndarray:
+        """
+        Sample n multipliers in one vectorized call (one per Monte Carlo path).
+        Same distributions as sample_multiplier, drawn from a NumPy Generator.
+
+        With antithetic=True the underlying draws come in mirrored pairs
+        (z, -z) for the normal and (u, 1 - u) for uniforms. The pairs are
+        negatively correlated, so estimators that are near-monotone in the
+        multiplier (revenue, cash) reach the same precision with fewer paths.
+
+        With stratified=True (takes precedence over antithetic) [0, 1) is cut
+        into n equal strata and each underlying draw takes one point per
+        stratum before the inverse CDF, so the tails are covered in
+        proportion even for small n. Each draw (normal, black-swan trigger,
+        boost) is stratified independently, approximating a Latin hypercube.
+        """
+        rng = _RNG if rng is None else rng
+
+        if stratified:
+            normal = lambda: _stratified_standard_normal(rng, n)
+            uniform = lambda: _stratified_uniform(rng, n).astype(_DTYPE)
+        else:
+            normal = lambda: _standard_normal(rng, n, antithetic)
+            uniform = lambda: _uniform(rng, n, antithetic)
+
+        if self.dist_type == "log-normal":
+            return np.exp(self._mu + self.variance_sigma * normal())
+
+        elif self.dist_type == "fat-tailed":
+            basis = np.exp(self._mu + self.variance_sigma * normal())
+            # 5% chance of a "Black Swan" event, applied branchlessly per path
+            black_swan = uniform() < 0.05
+            boost = 1.5 + 1.5 * uniform()
+            return np.where(black_swan, basis * boost, basis)
+
+        # "deterministic" and unknown types return the mean
+        return np.full(n, self.mean_multiplier, dtype=_DTYPE)
+
 @dataclass
 class Prior:
     """Attaches a distribution to a specific downstream variable"""
@@ -78,15 +202,92 @@ class MonthlyPolicy:
     """
     name: str  # Generated name, e.g., "Aggressive Spend / Premium Price"
     decisions: Dict[str, StrategicGroup]
+    description: str = field(init=False)  # Combined descriptions of all decisions
     
-    @property
-    def description(self) -> str:
-        """Combine descriptions of all decisions"""
-        return " + ".join([g.description for g in self.decisions.values()])
+    def __post_init__(self):
+        self.description = " + ".join(g.description for g in self.decisions.values())
     
     def __repr__(self):
         return self.name
 
+# Distribution codes used by PolicyTable; unknown types sample the mean like "deterministic"
+_DIST_CODES = {"log-normal": 1, "fat-tailed": 2}
+
+class PolicyTable:
+    """
+    A list of policies flattened into per-move parameter arrays, so a batched
+    rollout can realize every bet of every month in a few vectorized calls.
+
+    Decisions are indexed by variable (V rows, in first-seen order) and
+    priors by slot (S rows: each variable's priors in order), so applying
+    slots 0..S-1 in turn replays sample_multiplier in the scalar order.
+    Every array has one column per move (M).
+    """
+
+    def __init__(self, policies: Sequence[MonthlyPolicy]):
+        self.policies = tuple(policies)
+        num_moves = len(self.policies)
+
+        variables: Dict[str, int] = {}    # name -> max number of priors
+        for policy in self.policies:
+            for var_name, group in policy.decisions.items():
+                variables[var_name] = max(variables.get(var_name, 0), len(group.priors))
+        self.variables: Tuple[str, ...] = tuple(variables)
+
+        shape = (len(variables), num_moves)
+        self.has_decision = np.zeros(shape, dtype=bool)
+        self.low = np.zeros(shape, dtype=_DTYPE)
+        self.high = np.zeros(shape, dtype=_DTYPE)
+
+        num_slots = sum(variables.values())
+        shape = (num_slots, num_moves)
+        self.prior_target = np.full(shape, -1, dtype=np.int8)    # index into prior_targets
+        self.dist = np.zeros(shape, dtype=np.int8)
+        self.mu = np.zeros(shape, dtype=_DTYPE)
+        self.sigma = np.zeros(shape, dtype=_DTYPE)
+        self.mean = np.ones(shape, dtype=_DTYPE)
+        targets: Dict[str, int] = {}
+
+        for m, policy in enumerate(self.policies):
+            slot = 0
+            for v, (var_name, max_priors) in enumerate(variables.items()):
+                group = policy.decisions.get(var_name)
+                if group is not None:
+                    self.has_decision[v, m] = True
+                    self.low[v, m], self.high[v, m] = group.min_value, group.max_value
+                    for k, prior in enumerate(group.priors):
+                        dist = prior.distribution
+                        self.prior_target[slot + k, m] = targets.setdefault(prior.target_variable, len(targets))
+                        self.dist[slot + k, m] = _DIST_CODES.get(dist.dist_type, 0)
+                        self.mean[slot + k, m] = dist.mean_multiplier
+                        if dist.dist_type in _DIST_CODES:
+                            self.mu[slot + k, m], self.sigma[slot + k, m] = dist._mu, dist.variance_sigma
+                slot += max_priors
+        self.prior_targets: Tuple[str, ...] = tuple(targets)
+
+    def sample(self, rng: np.random.Generator, choice: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Realizes the bets for an array of move indices (any shape, e.g.
+        (months, paths)) with one normal and one uniform draw from rng.
+        Returns (values, multipliers) with a leading V or S axis; a value
+        or multiplier is meaningless where has_decision / prior_target
+        says the move has none.
+        """
+        num_vars, num_slots = len(self.low), len(self.mu)
+        z = rng.standard_normal((num_slots,) + choice.shape, dtype=_DTYPE)
+        u = rng.random((num_vars + 2 * num_slots,) + choice.shape, dtype=_DTYPE)
+
+        low, high = self.low[:, choice], self.high[:, choice]
+        values = low + (high - low) * u[:num_vars]
+
+        dist = self.dist[:, choice]
+        basis = np.exp(self.mu[:, choice] + self.sigma[:, choice] * z)
+        # 5% chance of a "Black Swan" event on fat-tailed priors, as in sample_multiplier_batch
+        black_swan = (dist == 2) & (u[num_vars:num_vars + num_slots] < 0.05)
+        basis = np.where(black_swan, basis * (1.5 + 1.5 * u[num_vars + num_slots:]), basis)
+        multipliers = np.where(dist > 0, basis, self.mean[:, choice])
+        return values, multipliers
+
 class Discretizer:
     """Manages the mapping between variables and their strategic groups"""
     
@@ -96,6 +297,7 @@ class Discretizer:
     def add_variable(self, name: str, groups: List[StrategicGroup]):
         """Define groups for a specific variable (e.g., 'ad_spend')"""
         self.variables[name] = groups
+        self.__dict__.pop("all_policies", None)  # Invalidate cached product
 
     def get_groups(self, variable_name: str) -> List[StrategicGroup]:
         """Get all defined groups for a variable"""
@@ -103,39 +305,40 @@ class Discretizer:
             raise ValueError(f"Variable '{variable_name}' not defined")
         return list(self.variables[variable_name])
 
+    @functools.cached_property
+    def all_policies(self) -> Tuple[MonthlyPolicy, ...]:
+        """Every MonthlyPolicy combination, computed once per configuration"""
+        return tuple(self._build_policies())
+
     def generate_all_policies(self) -> List[MonthlyPolicy]:
         """
-        Generates the Cartesian product of all defined variable groups.
         Returns a list of all possible MonthlyPolicy combinations.
+        The list is fresh (callers may pop from it); the policies are shared.
         """
+        return list(self.all_policies)
+
+    def _build_policies(self) -> Iterator[MonthlyPolicy]:
+        """Lazily yields the Cartesian product of all defined variable groups."""
         # 1. Get all variables and their groups
         var_names = list(self.variables.keys())
         list_of_group_lists = [self.variables[name] for name in var_names]
         
-        # 2. Generate Cartesian Product
-        combinations = list(itertools.product(*list_of_group_lists))
-        
-        policies = []
-        for combo in combinations:
-            decisions_map = {}
-            name_parts = []
-            
-            for i, group in enumerate(combo):
-                var_name = var_names[i]
-                decisions_map[var_name] = group
-                name_parts.append(group.name) 
-            
-            full_name = " + ".join(name_parts)
-            policies.append(MonthlyPolicy(name=full_name, decisions=decisions_map))
-            
-        return policies
+        # 2. Walk the Cartesian Product without materializing it
+        for combo in itertools.product(*list_of_group_lists):
+            decisions_map = dict(zip(var_names, combo))
+            full_name = " + ".join(group.name for group in combo)
+            yield MonthlyPolicy(name=full_name, decisions=decisions_map)
 
 # ============================================================================
 # Default Configuration
 # ============================================================================
 
+@functools.lru_cache(maxsize=1)
 def create_default_discretizer() -> Discretizer:
-    """Creates the standard discretizer configuration for the simulation"""
+    """
+    Creates the standard discretizer configuration for the simulation.
+    Built once and shared by every caller; treat it as read-only.
+    """
     disc = Discretizer()
     
     # 1. Ad Spend Configuration (Absolute Values) + PRIORS (CAC Impact)
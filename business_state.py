@@ -1,10 +1,15 @@
-from dataclasses import dataclass, asdict
-from typing import Dict, Any
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, Any, Sequence
 
-@dataclass
+import numpy as np
+
+@dataclass(slots=True)
 class BusinessState:
     """
     Represents the state of the business at a specific timestep.
+
+    Slotted: no per-instance __dict__, which keeps the many short-lived
+    states created by Monte Carlo / MCTS runs small and fast to copy.
     """
     cac: float
     ltv: float
@@ -26,8 +31,113 @@ class BusinessState:
     month: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Written out by hand: asdict() deep-copies recursively, and this runs
+        # once per month per Monte Carlo path
+        return {
+            'cac': self.cac,
+            'ltv': self.ltv,
+            'arpu': self.arpu,
+            'burn': self.burn,
+            'cash': self.cash,
+            'revenue': self.revenue,
+            'customers': self.customers,
+            'new_customers': self.new_customers,
+            'traffic': self.traffic,
+            'ad_spend': self.ad_spend,
+            'runway': self.runway,
+            'churn_rate': self.churn_rate,
+            'churned_customers': self.churned_customers,
+            'month': self.month,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BusinessState':
         return cls(**data)
+
+    def to_row(self) -> np.ndarray:
+        """Per-path fields as a float64 row in BATCH_FIELDS order (see FIELD_INDEX)"""
+        return np.array((
+            self.cac, self.ltv, self.arpu, self.burn, self.cash, self.revenue,
+            self.customers, self.new_customers, self.traffic, self.ad_spend,
+            self.runway, self.churn_rate, self.churned_customers,
+        ), dtype=np.float64)
+
+    def clone(self) -> 'BusinessState':
+        """Field-by-field copy; every field is an immutable scalar so shallow is enough"""
+        return BusinessState(
+            self.cac, self.ltv, self.arpu, self.burn, self.cash, self.revenue,
+            self.customers, self.new_customers, self.traffic, self.ad_spend,
+            self.runway, self.churn_rate, self.churned_customers, self.month,
+        )
+
+
+# Every BusinessState field name (BusinessStateBatch has the same fields), for
+# membership checks in place of hasattr reflection
+STATE_FIELDS = frozenset(f.name for f in fields(BusinessState))
+
+# Slot setters keyed by field name: a dict lookup plus a C-level descriptor
+# call, in place of setattr on the per-month hot path
+STATE_SETTERS: Dict[str, Callable[[BusinessState, Any], None]] = {
+    f.name: getattr(BusinessState, f.name).__set__ for f in fields(BusinessState)
+}
+
+# Per-path fields carried by BusinessStateBatch (month is shared by all paths)
+BATCH_FIELDS = tuple(f.name for f in fields(BusinessState) if f.name != 'month')
+
+# Fixed schema: integer offsets of each field in rows from BusinessState.to_row
+FIELD_INDEX = {name: i for i, name in enumerate(BATCH_FIELDS)}
+CASH_IDX = FIELD_INDEX['cash']
+CUSTOMERS_IDX = FIELD_INDEX['customers']
+
+# Count fields; stored as integral float64 in a batch, converted back on export
+INT_FIELDS = tuple(f.name for f in fields(BusinessState) if f.type in (int, 'int') and f.name != 'month')
+
+
+@dataclass
+class BusinessStateBatch:
+    """
+    Struct-of-Arrays state for num_runs Monte Carlo paths advancing in lockstep.
+
+    Each field of BusinessState becomes a float64 array of length num_runs
+    (count fields hold integral values); month is shared by every path.
+    """
+    cac: np.ndarray
+    ltv: np.ndarray
+    arpu: np.ndarray
+    burn: np.ndarray
+    cash: np.ndarray
+    revenue: np.ndarray
+    customers: np.ndarray
+    new_customers: np.ndarray
+    traffic: np.ndarray
+    ad_spend: np.ndarray
+    runway: np.ndarray
+    churn_rate: np.ndarray
+    churned_customers: np.ndarray
+    month: int = 0
+
+    @classmethod
+    def from_state(cls, state: BusinessState, num_runs: int) -> 'BusinessStateBatch':
+        """Broadcast a single state to num_runs identical paths"""
+        arrays = {name: np.full(num_runs, getattr(state, name), dtype=np.float64) for name in BATCH_FIELDS}
+        return cls(**arrays, month=state.month)
+
+    @classmethod
+    def from_states(cls, states: Sequence[BusinessState]) -> 'BusinessStateBatch':
+        """Stack scalar states (all at the same month) into one path each"""
+        months = {state.month for state in states}
+        if len(months) != 1:
+            raise ValueError(f"States must share one month to batch, got {sorted(months)}")
+        columns = np.ascontiguousarray(np.array([state.to_row() for state in states]).T)
+        return cls(*columns, month=months.pop())
+
+    @property
+    def num_runs(self) -> int:
+        return len(self.cash)
+
+    def get_run(self, index: int) -> BusinessState:
+        """Extract one path as a scalar BusinessState"""
+        values = {name: getattr(self, name)[index].item() for name in BATCH_FIELDS}
+        for name in INT_FIELDS:
+            values[name] = int(values[name])
+        return BusinessState(**values, month=self.month)
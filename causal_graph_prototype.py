@@ -7,19 +7,29 @@ This prototype validates the causal graph approach with:
 3. Effect propagation and accumulation
 """
 
-from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
 from typing import Callable, List, Dict, Any, Optional, Tuple
-import copy
+import functools
 import random
 
+import numpy as np
+
 
 # ============================================================================
 # Data Structures
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class BusinessState:
-    """Simplified business state for prototype"""
+    """
+    Simplified business state for prototype (slotted: no per-instance __dict__).
+
+    Deliberately mutable rather than a NamedTuple: the month kernels update
+    ~10 fields in place on a private clone, and clone + setattr is about
+    twice as fast as NamedTuple._replace, at a smaller instance (144 vs
+    152 bytes for these 14 fields).
+    """
     # Core metrics
     cash: float
     customers: int
@@ -42,12 +52,118 @@ class BusinessState:
     month: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Explicit fields instead of asdict(), which deep-copies recursively
+        return {
+            'cash': self.cash,
+            'customers': self.customers,
+            'ad_spend': self.ad_spend,
+            'cac': self.cac,
+            'arpu': self.arpu,
+            'burn': self.burn,
+            'churn_rate': self.churn_rate,
+            'new_customers': self.new_customers,
+            'revenue': self.revenue,
+            'runway': self.runway,
+            'market_saturation': self.market_saturation,
+            'cultural_degradation': self.cultural_degradation,
+            'rapid_growth': self.rapid_growth,
+            'month': self.month,
+        }
+    
+    def clone(self) -> 'BusinessState':
+        """Cheap copy; every field is an immutable scalar so shallow is enough"""
+        return BusinessState(
+            self.cash, self.customers, self.ad_spend, self.cac, self.arpu,
+            self.burn, self.churn_rate, self.new_customers, self.revenue,
+            self.runway, self.market_saturation, self.cultural_degradation,
+            self.rapid_growth, self.month,
+        )
 
 
-@dataclass
+# Slot setters keyed by field name: a dict lookup plus a C-level descriptor
+# call, in place of hasattr/setattr reflection on the per-month hot path
+STATE_SETTERS: Dict[str, Callable[[BusinessState, Any], None]] = {
+    f.name: getattr(BusinessState, f.name).__set__ for f in fields(BusinessState)
+}
+
+
+# Batched state precision: business metrics need ~3 significant figures, and
+# float32 halves the memory traffic of the bandwidth-bound batch kernels.
+# Counts (customers, new_customers) stay exact in float32 up to 2**24.
+_DTYPE = np.float32
+
+# Per-path numeric fields carried by BusinessStateBatch (month is shared)
+BATCH_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(BusinessState) if f.name != "month")
+BATCH_FIELD_INDEX: Dict[str, int] = {name: i for i, name in enumerate(BATCH_FIELDS)}
+
+
+def _batch_field(name: str) -> property:
+    """Expose one row of BusinessStateBatch.data as a named attribute"""
+    index = BATCH_FIELD_INDEX[name]
+    
+    def fget(self) -> np.ndarray:
+        return self.data[index]
+    
+    def fset(self, values):
+        self.data[index] = values
+    
+    return property(fget, fset)
+
+
+class BusinessStateBatch:
+    """
+    Struct-of-Arrays business state for num_runs Monte Carlo paths.
+    All fields live in one contiguous (len(BATCH_FIELDS), num_runs) block;
+    each field is a row view, so assigning to a field writes in place and
+    kernels can address fields by BATCH_FIELD_INDEX instead of by name.
+    """
+    cash = _batch_field("cash")
+    customers = _batch_field("customers")
+    ad_spend = _batch_field("ad_spend")
+    cac = _batch_field("cac")
+    arpu = _batch_field("arpu")
+    burn = _batch_field("burn")
+    churn_rate = _batch_field("churn_rate")
+    new_customers = _batch_field("new_customers")
+    revenue = _batch_field("revenue")
+    runway = _batch_field("runway")
+    market_saturation = _batch_field("market_saturation")
+    cultural_degradation = _batch_field("cultural_degradation")
+    rapid_growth = _batch_field("rapid_growth")
+    
+    def __init__(self, data: np.ndarray, month: int = 0):
+        self.data = data
+        self.month = month
+    
+    @classmethod
+    def from_state(cls, state: BusinessState, num_runs: int) -> 'BusinessStateBatch':
+        """Broadcast a single state to num_runs identical paths"""
+        values = np.array([getattr(state, name) for name in BATCH_FIELDS], dtype=_DTYPE)
+        data = np.repeat(values[:, np.newaxis], num_runs, axis=1)
+        return cls(data, month=state.month)
+    
+    @classmethod
+    def from_states(cls, states: List[BusinessState], month: int = 0) -> 'BusinessStateBatch':
+        """One path per state (states may differ, e.g. MCTS leaves)"""
+        data = np.array([[getattr(state, name) for state in states] for name in BATCH_FIELDS], dtype=_DTYPE)
+        return cls(data, month=month)
+    
+    @property
+    def num_runs(self) -> int:
+        return self.data.shape[1]
+
+
+@dataclass(slots=True)
 class LaggedEffect:
-    """Represents an effect that will manifest in the future"""
+    """
+    Represents an effect that will manifest in the future.
+    Treated as immutable once queued (propagate_effects builds new ones),
+    so queues may share instances.
+
+    Scalar queues stay plain lists: MCTS rollouts hold 0-8 pending effects,
+    and a masked NumPy activation (~3.5us) costs more than walking the list.
+    Batches use the struct-of-arrays LaggedEffectRing instead.
+    """
     target_metric: str
     effect_value: float
     effect_type: str  # "multiplicative", "additive", "set"
@@ -56,6 +172,41 @@ class LaggedEffect:
     description: str = ""
 
 
+@dataclass
+class BatchLaggedEffect:
+    """A lagged effect queued for a batch of paths (only `active` paths receive it)"""
+    target_idx: int
+    effect_values: np.ndarray
+    active: np.ndarray
+    effect_type: int
+
+
+class LaggedEffectRing:
+    """
+    Ring buffer of pending batch effects, bucketed by the month they fall due.
+    Scheduling appends to one bucket and each month drains exactly one bucket,
+    so nothing is rebuilt or decremented per month.
+    """
+    
+    def __init__(self, max_lag: int):
+        # An effect queued in month m with lag L is applied in month m + L + 1
+        # (the scalar queue is checked before it is decremented)
+        self.size = max_lag + 2
+        self.buckets: List[List[BatchLaggedEffect]] = [[] for _ in range(self.size)]
+    
+    def schedule(self, month: int, lag_months: int, effect: BatchLaggedEffect):
+        self.buckets[(month + lag_months + 1) % self.size].append(effect)
+    
+    def pop_due(self, month: int) -> List[BatchLaggedEffect]:
+        slot = month % self.size
+        due = self.buckets[slot]
+        self.buckets[slot] = []
+        return due
+    
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self.buckets)
+
+
 @dataclass
 class CausalEdge:
     """Represents a causal relationship between metrics"""
@@ -68,6 +219,50 @@ class CausalEdge:
     description: str = ""
 
 
+# Integer op codes for compiled edges
+EFFECT_MULTIPLICATIVE = 0
+EFFECT_ADDITIVE = 1
+EFFECT_SET = 2
+EFFECT_TYPE_CODES: Dict[str, int] = {
+    "multiplicative": EFFECT_MULTIPLICATIVE,
+    "additive": EFFECT_ADDITIVE,
+    "set": EFFECT_SET,
+}
+
+
+@dataclass(frozen=True)
+class CompiledGraph:
+    """
+    Static per-month edge plan: field offsets, op codes and thresholds
+    resolved once per graph so propagation does no name lookups.
+    """
+    source_idx: np.ndarray   # int32, offsets into the batch field block
+    target_idx: np.ndarray   # int32
+    lag_months: np.ndarray   # int32
+    effect_type: np.ndarray  # int8 EFFECT_* codes
+    threshold: np.ndarray    # float64, -inf where the edge has no threshold
+    effect_fns: Tuple[Callable, ...]
+    
+    @property
+    def num_edges(self) -> int:
+        return len(self.effect_fns)
+    
+    @property
+    def max_lag(self) -> int:
+        return int(self.lag_months.max()) if self.num_edges else 0
+    
+    def rows(self) -> List[Tuple[int, int, int, int, float, Callable]]:
+        """Edges as native-Python tuples for the per-edge dispatch loop"""
+        return [
+            (src, tgt, lag, code, thr, fn)
+            for src, tgt, lag, code, thr, fn in zip(
+                self.source_idx.tolist(), self.target_idx.tolist(),
+                self.lag_months.tolist(), self.effect_type.tolist(),
+                self.threshold.tolist(), self.effect_fns
+            )
+        ]
+
+
 @dataclass
 class CausalGraph:
     """The complete causal graph"""
@@ -75,15 +270,33 @@ class CausalGraph:
     
     def add_edge(self, edge: CausalEdge):
         self.edges.append(edge)
+    
+    def compile(self, field_names: List[str]) -> CompiledGraph:
+        """Resolve edges against a field layout (e.g. BATCH_FIELDS)"""
+        index = {name: i for i, name in enumerate(field_names)}
+        return CompiledGraph(
+            source_idx=np.array([index[e.source] for e in self.edges], dtype=np.int32),
+            target_idx=np.array([index[e.target] for e in self.edges], dtype=np.int32),
+            lag_months=np.array([e.lag_months for e in self.edges], dtype=np.int32),
+            effect_type=np.array([EFFECT_TYPE_CODES[e.effect_type] for e in self.edges], dtype=np.int8),
+            threshold=np.array(
+                [-np.inf if e.threshold is None else e.threshold for e in self.edges],
+                dtype=np.float64
+            ),
+            effect_fns=tuple(e.effect_fn for e in self.edges),
+        )
 
 
 # ============================================================================
 # Static Causal Graph Definition
 # ============================================================================
 
+@functools.lru_cache(maxsize=1)
 def build_prototype_graph() -> CausalGraph:
     """
     Builds a minimal causal graph with examples of all three orders.
+    
+    The graph is built once and shared by every caller; treat it as read-only.
     """
     graph = CausalGraph()
     
@@ -92,7 +305,7 @@ def build_prototype_graph() -> CausalGraph:
     graph.add_edge(CausalEdge(
         source="ad_spend",
         target="new_customers",
-        effect_fn=lambda state, ad_spend: int(ad_spend / state.cac),
+        effect_fn=lambda state, ad_spend: np.trunc(ad_spend / state.cac),
         lag_months=0,
         effect_type="set",
         description="Ad spend directly acquires customers (1st order)"
@@ -124,7 +337,7 @@ def build_prototype_graph() -> CausalGraph:
     graph.add_edge(CausalEdge(
         source="ad_spend",
         target="market_saturation",
-        effect_fn=lambda state, ad_spend: min(ad_spend / 100000, 1.0),  # 0-1 scale
+        effect_fn=lambda state, ad_spend: np.minimum(ad_spend / 100000, 1.0),  # 0-1 scale
         lag_months=1,  # Takes 1 month to manifest
         effect_type="set",
         description="High ad spend saturates market (3rd order, lag=1)"
@@ -153,7 +366,7 @@ def build_prototype_graph() -> CausalGraph:
     graph.add_edge(CausalEdge(
         source="customers",
         target="rapid_growth",
-        effect_fn=lambda state, customers: max(0, (customers - state.customers) / max(state.customers, 1)),
+        effect_fn=lambda state, customers: np.maximum(0, (customers - state.customers) / np.maximum(state.customers, 1)),
         lag_months=0,
         effect_type="set",
         threshold=0.2,  # 20% growth
@@ -199,7 +412,13 @@ def apply_effect(state: BusinessState, effect: LaggedEffect):
     else:
         raise ValueError(f"Unknown effect type: {effect.effect_type}")
     
-    setattr(state, effect.target_metric, new_value)
+    # Effect functions are NumPy-friendly; keep scalar fields as plain Python numbers
+    if isinstance(new_value, np.generic):
+        new_value = new_value.item()
+    if effect.effect_type == "set" and isinstance(current_value, int):
+        new_value = int(new_value)
+    
+    STATE_SETTERS[effect.target_metric](state, new_value)
 
 
 def propagate_effects(
@@ -285,6 +504,282 @@ def propagate_effects(
     return state, lagged_effects_queue, effect_log
 
 
+def _negligible_mask(effect_type: int, effect_values: np.ndarray) -> np.ndarray:
+    """Per-path version of the 'skip if effect is negligible' rules"""
+    if effect_type == EFFECT_SET:
+        return effect_values == 0
+    if effect_type == EFFECT_MULTIPLICATIVE:
+        return np.abs(effect_values - 1.0) < 0.001
+    return np.abs(effect_values) < 0.01
+
+
+def apply_effect_batch(
+    batch: BusinessStateBatch,
+    target_idx: int,
+    effect_values: np.ndarray,
+    active: np.ndarray,
+    effect_type: int
+):
+    """
+    Apply an effect in place to a batch. Inactive paths get the identity
+    effect (x1, +0, or their current value) instead of being skipped.
+    """
+    current = batch.data[target_idx]
+    
+    if effect_type == EFFECT_MULTIPLICATIVE:
+        current *= np.where(active, effect_values, 1.0)
+    elif effect_type == EFFECT_ADDITIVE:
+        current += np.where(active, effect_values, 0.0)
+    else:
+        current[:] = np.where(active, effect_values, current)
+
+
+def propagate_effects_batch(
+    batch: BusinessStateBatch,
+    compiled: CompiledGraph,
+    pending: LaggedEffectRing
+) -> Tuple[BusinessStateBatch, LaggedEffectRing]:
+    """
+    Vectorized propagate_effects: evaluates every edge once for all paths.
+    Thresholds and negligible-effect skips become per-path `active` masks
+    (edges without a threshold compile to -inf, so the check is unconditional).
+    Takes a graph compiled against BATCH_FIELDS (see CausalGraph.compile)
+    and a ring sized for it (LaggedEffectRing(compiled.max_lag)).
+    
+    Returns:
+        - Updated batch (mutated in place)
+        - The pending-effects ring (mutated in place)
+    """
+    # 1. Apply lagged effects that are due this month
+    for effect in pending.pop_due(batch.month):
+        apply_effect_batch(
+            batch, effect.target_idx, effect.effect_values,
+            effect.active, effect.effect_type
+        )
+    
+    # 2. Calculate new effects from current state
+    data = batch.data
+    shape = (batch.num_runs,)
+    for src, tgt, lag, effect_type, threshold, effect_fn in compiled.rows():
+        source_values = data[src]
+        active = source_values >= threshold
+        
+        effect_values = np.broadcast_to(
+            np.asarray(effect_fn(batch, source_values), dtype=_DTYPE), shape
+        )
+        active &= ~_negligible_mask(effect_type, effect_values)
+        if not active.any():
+            continue
+        
+        if lag > 0:
+            pending.schedule(batch.month, lag, BatchLaggedEffect(
+                target_idx=tgt,
+                effect_values=effect_values.copy(),
+                active=active,
+                effect_type=effect_type
+            ))
+        else:
+            apply_effect_batch(batch, tgt, effect_values, active, effect_type)
+    
+    return batch, pending
+
+
+# ============================================================================
+# Specialized Kernels (runtime codegen)
+# ============================================================================
+
+# Per-effect-type source templates; `values`/`active` are the edge's locals
+_NOT_NEGLIGIBLE_TEMPLATES = {
+    EFFECT_SET: "~(values == 0)",
+    EFFECT_MULTIPLICATIVE: "~(np.abs(values - 1.0) < 0.001)",
+    EFFECT_ADDITIVE: "~(np.abs(values) < 0.01)",
+}
+
+_APPLY_TEMPLATES = {
+    EFFECT_MULTIPLICATIVE: "data[{tgt}] *= np.where(active, values, 1.0)",
+    EFFECT_ADDITIVE: "data[{tgt}] += np.where(active, values, 0.0)",
+    EFFECT_SET: "data[{tgt}] = np.where(active, values, data[{tgt}])",
+}
+
+_KERNEL_CACHE: Dict[tuple, Callable] = {}
+_SCALAR_KERNEL_CACHE: Dict[tuple, Callable] = {}
+
+# Scalar "skip if negligible" tests and in-place updates, as in propagate_effects / apply_effect
+_SCALAR_NEGLIGIBLE_TEMPLATES = {
+    "set": "value == 0",
+    "multiplicative": "abs(value - 1.0) < 0.001",
+    "additive": "abs(value) < 0.01",
+}
+
+_SCALAR_APPLY_TEMPLATES = {
+    "multiplicative": "new = state.{tgt} * value",
+    "additive": "new = state.{tgt} + value",
+    "set": "new = value",
+}
+
+
+def _graph_key(graph: CausalGraph) -> tuple:
+    """Cache key identifying a graph's edge set"""
+    return tuple(
+        (e.source, e.target, e.lag_months, e.effect_type, e.threshold, e.effect_fn)
+        for e in graph.edges
+    )
+
+
+def _kernel_source(graph: CausalGraph, compiled: CompiledGraph) -> str:
+    """Emit an unrolled propagate_effects_batch with every edge inlined"""
+    lines = [
+        "def propagate_specialized(batch, pending):",
+        "    for effect in pending.pop_due(batch.month):",
+        "        apply_effect_batch(batch, effect.target_idx, effect.effect_values,",
+        "                           effect.active, effect.effect_type)",
+        "    data = batch.data",
+        "    shape = (batch.num_runs,)",
+    ]
+    for i, (edge, (src, tgt, lag, effect_type, threshold, _)) in enumerate(
+        zip(graph.edges, compiled.rows())
+    ):
+        lines += [
+            f"    # {edge.source} -> {edge.target}",
+            f"    values = np.broadcast_to(np.asarray(fn_{i}(batch, data[{src}]), dtype=_DTYPE), shape)",
+            f"    active = {_NOT_NEGLIGIBLE_TEMPLATES[effect_type]}",
+        ]
+        if threshold != -np.inf:
+            lines.append(f"    active &= data[{src}] >= {threshold!r}")
+        lines.append("    if active.any():")
+        if lag > 0:
+            lines.append(
+                f"        pending.schedule(batch.month, {lag}, "
+                f"BatchLaggedEffect({tgt}, values.copy(), active, {effect_type}))"
+            )
+        else:
+            lines.append("        " + _APPLY_TEMPLATES[effect_type].format(tgt=tgt))
+    lines.append("    return batch, pending")
+    return "\n".join(lines) + "\n"
+
+
+def compile_specialized_kernel(
+    graph: CausalGraph
+) -> Callable[[BusinessStateBatch, LaggedEffectRing], Tuple[BusinessStateBatch, LaggedEffectRing]]:
+    """
+    Generate a drop-in replacement for propagate_effects_batch specialized
+    to one graph: field offsets, lags, thresholds and op codes are folded
+    into straight-line code, so there is no per-edge dispatch loop and edges
+    without a threshold carry no mask at all. Kernels are cached per edge
+    set, so repeated calls with the (shared) prototype graph are free.
+    """
+    key = _graph_key(graph)
+    kernel = _KERNEL_CACHE.get(key)
+    if kernel is None:
+        compiled = graph.compile(BATCH_FIELDS)
+        source = _kernel_source(graph, compiled)
+        namespace = {
+            "np": np,
+            "_DTYPE": _DTYPE,
+            "apply_effect_batch": apply_effect_batch,
+            "BatchLaggedEffect": BatchLaggedEffect,
+        }
+        namespace.update({f"fn_{i}": fn for i, fn in enumerate(compiled.effect_fns)})
+        exec(compile(source, "<specialized causal kernel>", "exec"), namespace)
+        kernel = _KERNEL_CACHE[key] = namespace["propagate_specialized"]
+    return kernel
+
+
+# calculate_basic_financials inlined into the fused scalar kernel, reading each field once
+_SCALAR_FINANCIALS_SOURCE = """\
+    # Basic financials (calculate_basic_financials)
+    customers = state.customers
+    revenue = customers * state.arpu
+    state.revenue = revenue
+    burn = state.burn
+    ad_spend = state.ad_spend
+    cash = state.cash + revenue - burn - ad_spend
+    state.cash = cash
+    total_monthly_spend = burn + ad_spend
+    state.runway = cash / total_monthly_spend if total_monthly_spend > 0 else 999.0
+    churned = int(customers * state.churn_rate)
+    state.customers = max(0, customers - churned + state.new_customers)
+"""
+
+
+def _scalar_kernel_source(graph: CausalGraph, with_financials: bool = False) -> str:
+    """Emit an unrolled, log-free propagate_effects with every edge inlined"""
+    lines = [
+        "def propagate_scalar_specialized(state, queue):",
+        "    new_queue = []",
+        "    for e in queue:",
+        "        if e.months_remaining == 0:",
+        "            apply_effect(state, e)",
+        "        else:",
+        "            new_queue.append(LaggedEffect(e.target_metric, e.effect_value, e.effect_type,",
+        "                                          e.months_remaining - 1, e.source_path, e.description))",
+    ]
+    for i, edge in enumerate(graph.edges):
+        body = [
+            f"value = fn_{i}(state, source)",
+            f"if not ({_SCALAR_NEGLIGIBLE_TEMPLATES[edge.effect_type]}):",
+        ]
+        if edge.lag_months > 0:
+            body.append(
+                f"    new_queue.append(LaggedEffect({edge.target!r}, value, {edge.effect_type!r}, "
+                f"{edge.lag_months}, [{edge.source!r}, {edge.target!r}], desc_{i}))"
+            )
+        else:
+            body += [
+                "    " + _SCALAR_APPLY_TEMPLATES[edge.effect_type].format(tgt=edge.target),
+                "    if isinstance(new, np.generic):",
+                "        new = new.item()",
+            ]
+            if edge.effect_type == "set":
+                body += [
+                    f"    if isinstance(state.{edge.target}, int):",
+                    "        new = int(new)",
+                ]
+            body.append(f"    state.{edge.target} = new")
+        
+        lines += [f"    # {edge.source} -> {edge.target}", f"    source = state.{edge.source}"]
+        if edge.threshold is None:
+            lines += ["    " + line for line in body]
+        else:
+            lines.append(f"    if not source < {edge.threshold!r}:")
+            lines += ["        " + line for line in body]
+    if with_financials:
+        lines += _SCALAR_FINANCIALS_SOURCE.splitlines()
+    lines.append("    return state, new_queue")
+    return "\n".join(lines) + "\n"
+
+
+def compile_specialized_scalar_kernel(
+    graph: CausalGraph,
+    with_financials: bool = False
+) -> Callable[[BusinessState, List[LaggedEffect]], Tuple[BusinessState, List[LaggedEffect]]]:
+    """
+    Scalar counterpart of compile_specialized_kernel for the per-path MCTS
+    step: same effects, in the same order, as propagate_effects, but with
+    field access, thresholds and op codes folded into straight-line code and
+    no effect log. Returns (state, new lagged queue); the input queue is
+    only read. Cached per edge set.
+
+    With with_financials=True the kernel also runs calculate_basic_financials
+    in the same function body, so one call advances the whole month.
+    """
+    key = (_graph_key(graph), with_financials)
+    kernel = _SCALAR_KERNEL_CACHE.get(key)
+    if kernel is None:
+        namespace = {
+            "np": np,
+            "apply_effect": apply_effect,
+            "LaggedEffect": LaggedEffect,
+        }
+        for i, edge in enumerate(graph.edges):
+            namespace[f"fn_{i}"] = edge.effect_fn
+            namespace[f"desc_{i}"] = edge.description
+        source = _scalar_kernel_source(graph, with_financials)
+        exec(compile(source, "<specialized scalar causal kernel>", "exec"), namespace)
+        kernel = _SCALAR_KERNEL_CACHE[key] = namespace["propagate_scalar_specialized"]
+    return kernel
+
+
 # ============================================================================
 # Basic Financial Calculations
 # ============================================================================
@@ -311,6 +806,39 @@ def calculate_basic_financials(state: BusinessState) -> BusinessState:
     return state
 
 
+def calculate_basic_financials_batch(batch: BusinessStateBatch) -> BusinessStateBatch:
+    """
+    Vectorized calculate_basic_financials over all paths of a batch.
+    Every step writes into the batch rows with out= / in-place ufuncs, so
+    only two scratch arrays are allocated instead of one per sub-expression.
+    """
+    cash = batch.cash
+    customers = batch.customers
+    
+    # Revenue from existing customers
+    np.multiply(customers, batch.arpu, out=batch.revenue)
+    
+    # Update cash
+    cash += batch.revenue
+    cash -= batch.burn
+    cash -= batch.ad_spend
+    
+    # Calculate runway (999 months when nothing is being spent)
+    total_monthly_spend = np.add(batch.burn, batch.ad_spend)
+    runway = batch.runway
+    runway.fill(999.0)
+    np.divide(cash, total_monthly_spend, out=runway, where=total_monthly_spend > 0)
+    
+    # Apply churn
+    churned = np.multiply(customers, batch.churn_rate)
+    np.trunc(churned, out=churned)
+    customers -= churned
+    customers += batch.new_customers
+    np.maximum(customers, 0, out=customers)
+    
+    return batch
+
+
 # ============================================================================
 # Monte Carlo Simulator
 # ============================================================================
@@ -334,9 +862,10 @@ def run_single_simulation(
     Returns:
         List of monthly states with decisions and effects
     """
-    state = copy.deepcopy(initial_state)
+    state = initial_state.clone()
     lagged_effects_queue = []
-    trajectory = []
+    
+    trajectory: List[Dict] = [None] * months
     
     for month in range(months):
         state.month = month
@@ -367,13 +896,13 @@ def run_single_simulation(
         state = calculate_basic_financials(state)
         
         # 4. Record trajectory
-        trajectory.append({
+        trajectory[month] = {
             'month': month,
             'decision': decision,
             'state': state.to_dict(),
             'active_lagged_effects': len(lagged_effects_queue),
             'effect_log': effect_log
-        })
+        }
         
         if verbose:
             print(f"\nState Summary:")
@@ -389,6 +918,125 @@ def run_single_simulation(
     return trajectory
 
 
+def run_single_simulation_final_state(
+    initial_state: BusinessState,
+    graph: CausalGraph,
+    months: int
+) -> BusinessState:
+    """
+    run_single_simulation without the trajectory: no per-month dicts or
+    effect-log strings are built, the month runs through the log-free fused
+    scalar kernel and only the final BusinessState is returned. Decisions
+    are drawn identically, so it equals the last trajectory state.
+    """
+    state = initial_state.clone()
+    lagged_effects_queue = []
+    month_kernel = compile_specialized_scalar_kernel(graph, with_financials=True)
+    for month in range(months):
+        state.month = month
+        state.ad_spend = sample_random_decision(state)['ad_spend']
+        state, lagged_effects_queue = month_kernel(state, lagged_effects_queue)
+    return state
+
+
+def _simulate_shard(
+    initial_state: BusinessState,
+    kernel: Callable,
+    max_lag: int,
+    months: int,
+    num_runs: int,
+    rng: np.random.Generator,
+    antithetic: bool,
+    stratified: bool = False
+) -> np.ndarray:
+    """Simulate one shard of paths; returns history of shape (months, fields, num_runs)"""
+    batch = BusinessStateBatch.from_state(initial_state, num_runs)
+    pending = LaggedEffectRing(max_lag)
+    history = np.empty((months,) + batch.data.shape, dtype=_DTYPE)
+    
+    for month in range(months):
+        batch.month = month
+        
+        # 1. Sample random decisions for every path
+        if stratified:
+            u = ((rng.permutation(num_runs) + rng.random(num_runs)) / num_runs).astype(_DTYPE)
+        elif antithetic:
+            u = rng.random((num_runs + 1) // 2, dtype=_DTYPE)
+            u = np.concatenate([u, 1.0 - u])[:num_runs]
+        else:
+            u = rng.random(num_runs, dtype=_DTYPE)
+        batch.ad_spend = 100000 * u
+        
+        # 2. Propagate through causal graph
+        batch, pending = kernel(batch, pending)
+        
+        # 3. Calculate basic financials
+        batch = calculate_basic_financials_batch(batch)
+        
+        # 4. Record trajectory
+        history[month] = batch.data
+    
+    return history
+
+
+def run_batch_simulation(
+    initial_state: BusinessState,
+    graph: CausalGraph,
+    months: int,
+    num_runs: int,
+    seed: Optional[int] = None,
+    antithetic: bool = True,
+    workers: int = 1,
+    stratified: bool = False
+) -> Dict[str, np.ndarray]:
+    """
+    Run num_runs Monte Carlo simulations at once on a BusinessStateBatch.
+    
+    With antithetic=True (default) the ad_spend decisions are drawn as
+    antithetic pairs: path i uses U and path i + num_runs/2 uses 1 - U.
+    The paired estimates are negatively correlated, so the variance of
+    the mean becomes sigma^2 (1 + rho) / N with rho <= 0. For cash and
+    revenue, which are close to linear in ad_spend, this roughly halves
+    the num_runs needed for the same precision.
+    
+    With stratified=True (takes precedence over antithetic) each month's
+    decisions put exactly one path in each of num_runs equal strata of the
+    ad_spend range, in a fresh random order per month, so extreme spends
+    are covered even at small num_runs. With workers > 1 each shard is
+    stratified on its own.
+    
+    With workers > 1 the paths are split into that many shards that run on
+    a thread pool (NumPy ufuncs release the GIL), each with an independent
+    stream spawned from seed. Pass os.cpu_count() for large num_runs.
+    Results are reproducible for a given (seed, workers) pair.
+    
+    Returns:
+        Dict mapping each field in BATCH_FIELDS to an array of shape
+        (months, num_runs) holding the end-of-month values of every path
+    """
+    kernel = compile_specialized_kernel(graph)
+    max_lag = max((e.lag_months for e in graph.edges), default=0)
+    
+    if workers <= 1:
+        history = _simulate_shard(
+            initial_state, kernel, max_lag, months, num_runs,
+            np.random.default_rng(seed), antithetic, stratified
+        )
+    else:
+        shard_sizes = [len(shard) for shard in np.array_split(np.arange(num_runs), workers)]
+        rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            shards = executor.map(
+                lambda args: _simulate_shard(
+                    initial_state, kernel, max_lag, months, *args, antithetic, stratified
+                ),
+                zip(shard_sizes, rngs)
+            )
+            history = np.concatenate(list(shards), axis=2)
+    
+    return {name: history[:, i] for i, name in enumerate(BATCH_FIELDS)}
+
+
 # ============================================================================
 # Main Test
 # ============================================================================
@@ -1,9 +1,12 @@
 import random
+from typing import Optional, Tuple
 
-from business_state import BusinessState
+import numpy as np
 
+from business_state import BusinessState, BusinessStateBatch
 
-def apply_first_order_effects(state: BusinessState) -> BusinessState:
+
+def apply_first_order_effects(state: BusinessState, rng: Optional[random.Random] = None) -> BusinessState:
     """
     Calculates direct outcomes based on current state and actions.
 
@@ -19,43 +22,123 @@ def apply_first_order_effects(state: BusinessState) -> BusinessState:
     - revenue = customers * ARPU * revenue_noise
     - LTV = ARPU / churn_rate (HP-1: derived, not input)
     - cash_next = cash + revenue - burn - ad_spend
+
+    Noise is drawn from rng when given (e.g. one random.Random per run),
+    otherwise from the module-level random generator.
     """
+    uniform = random.uniform if rng is None else rng.uniform
+
     # Stochastic noise factors (HP-4)
-    acquisition_noise = random.uniform(0.90, 1.10)  # ±10%
-    churn_noise = random.uniform(0.85, 1.15)        # ±15%
-    revenue_noise = random.uniform(0.95, 1.05)      # ±5%
+    acquisition_noise = uniform(0.90, 1.10)  # ±10%
+    churn_noise = uniform(0.85, 1.15)        # ±15%
+    revenue_noise = uniform(0.95, 1.05)      # ±5%
+
+    # Hot fields bound to locals once; written back at the end
+    cac = state.cac
+    ad_spend = state.ad_spend
+    customers = state.customers
+    churn_rate = state.churn_rate
+    arpu = state.arpu
+    burn = state.burn
 
     # Calculate new customers with acquisition noise
-    if state.cac > 0:
-        state.new_customers = int((state.ad_spend / state.cac) * acquisition_noise)
+    if cac > 0:
+        new_customers = int((ad_spend / cac) * acquisition_noise)
     else:
-        state.new_customers = 0
+        new_customers = 0
 
     # Calculate churned customers with churn noise (HP-1 + HP-4)
-    state.churned_customers = int(state.customers * state.churn_rate * churn_noise)
+    churned_customers = int(customers * churn_rate * churn_noise)
 
     # Update total customers (now includes churn subtraction)
-    state.customers = state.customers + state.new_customers - state.churned_customers
+    customers = customers + new_customers - churned_customers
 
     # Derive LTV from ARPU and churn_rate (HP-1)
-    if state.churn_rate > 0:
-        state.ltv = state.arpu / state.churn_rate
+    if churn_rate > 0:
+        ltv = arpu / churn_rate
     else:
-        state.ltv = state.arpu * 100  # Cap at 100 months if no churn
+        ltv = arpu * 100  # Cap at 100 months if no churn
 
     # Calculate revenue with revenue noise (HP-4)
-    state.revenue = state.customers * state.arpu * revenue_noise
+    revenue = customers * arpu * revenue_noise
     
     # Update cash
     # Assuming 'cost' in the prompt refers to ad_spend as it's the variable action
     # and burn is fixed operational costs.
-    state.cash = state.cash + state.revenue - state.burn - state.ad_spend
+    cash = state.cash + revenue - burn - ad_spend
     
     # Update runway
-    total_monthly_spend = state.burn + state.ad_spend
+    total_monthly_spend = burn + ad_spend
     if total_monthly_spend > 0:
-        state.runway = state.cash / total_monthly_spend
+        runway = cash / total_monthly_spend
     else:
-        state.runway = 999.0 # Infinite runway
+        runway = 999.0 # Infinite runway
+
+    state.new_customers = new_customers
+    state.churned_customers = churned_customers
+    state.customers = customers
+    state.ltv = ltv
+    state.revenue = revenue
+    state.cash = cash
+    state.runway = runway
         
     return state
+
+
+# (acquisition, churn, revenue) noise bounds: ±10%, ±15%, ±5% (HP-4)
+FIRST_ORDER_NOISE_LOW = (0.90, 0.85, 0.95)
+FIRST_ORDER_NOISE_HIGH = (1.10, 1.15, 1.05)
+
+
+def sample_first_order_noise(rng: np.random.Generator, size: Tuple[int, ...]) -> np.ndarray:
+    """
+    Draws first-order noise for many steps in one call.
+
+    Returns an array of shape size + (3,) whose last axis holds the
+    (acquisition, churn, revenue) factors, e.g. size=(months, num_runs)
+    pre-generates the noise for an entire Monte Carlo run.
+    """
+    return rng.uniform(FIRST_ORDER_NOISE_LOW, FIRST_ORDER_NOISE_HIGH, size=size + (3,))
+
+
+def apply_first_order_effects_batch(
+    batch: BusinessStateBatch, noise: np.ndarray
+) -> BusinessStateBatch:
+    """
+    Vectorized apply_first_order_effects: advances every path at once.
+
+    Same formulas as the scalar version; the noise is passed in as a
+    (num_runs, 3) array from sample_first_order_noise instead of being
+    drawn here. int() truncation becomes np.trunc and the branches become
+    np.where. Mutates and returns the batch.
+    """
+    # Stochastic noise factors (HP-4), one row per path
+    acquisition_noise, churn_noise, revenue_noise = noise.T
+
+    # Calculate new customers with acquisition noise (none where CAC <= 0)
+    has_cac = batch.cac > 0
+    safe_cac = np.where(has_cac, batch.cac, 1.0)
+    batch.new_customers = np.where(has_cac, np.trunc(batch.ad_spend / safe_cac * acquisition_noise), 0.0)
+
+    # Calculate churned customers with churn noise (HP-1 + HP-4)
+    batch.churned_customers = np.trunc(batch.customers * batch.churn_rate * churn_noise)
+
+    # Update total customers (now includes churn subtraction)
+    batch.customers = batch.customers + batch.new_customers - batch.churned_customers
+
+    # Derive LTV from ARPU and churn_rate (HP-1); cap at 100 months if no churn
+    has_churn = batch.churn_rate > 0
+    batch.ltv = np.where(has_churn, batch.arpu / np.where(has_churn, batch.churn_rate, 1.0), batch.arpu * 100)
+
+    # Calculate revenue with revenue noise (HP-4)
+    batch.revenue = batch.customers * batch.arpu * revenue_noise
+
+    # Update cash
+    batch.cash = batch.cash + batch.revenue - batch.burn - batch.ad_spend
+
+    # Update runway (infinite when nothing is being spent)
+    total_monthly_spend = batch.burn + batch.ad_spend
+    spending = total_monthly_spend > 0
+    batch.runway = np.where(spending, batch.cash / np.where(spending, total_monthly_spend, 1.0), 999.0)
+
+    return batch
@@ -4,6 +4,7 @@ Strategic Business Simulator - MCTS/Causal Graph Edition
 CLI Interface to run the simulation.
 """
 
+import os
 import time
 import sys
 from typing import List
@@ -14,6 +15,10 @@ from simulation_engine import SimulationEngine
 from mcts import MCTSEngine
 # from bet_sizing import StrategicGroup (Unused)
 
+# Root-parallel MCTS workers. Defaults to 1 so the seeded recommendations do
+# not depend on the host's core count; set MCTS_WORKERS to search in parallel.
+MCTS_WORKERS = int(os.environ.get("MCTS_WORKERS", "1"))
+
 def print_header():
     print("\n" + "="*60)
     print("STRATEGIC BUSINESS SIMULATOR (MCTS + Causal Graph)")
@@ -60,7 +65,9 @@ def main():
         print("\nThinking (Running MCTS)...")
         # Run MCTS to find best move
         start_time = time.time()
-        best_move, survival_prob = mcts.run_search(state, effects, iterations=500)
+        best_move, survival_prob = mcts.run_search(
+            state, effects, iterations=500, workers=MCTS_WORKERS
+        )
         elapsed = time.time() - start_time
         
         print(f"Analysis Complete ({elapsed:.2f}s).")
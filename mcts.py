@@ -8,13 +8,29 @@ Now tracks SURVIVAL PROBABILITY (Risk Analysis).
 
 import math
 import random
-from typing import List, Optional, Tuple, Dict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+from typing import Callable, List, Optional, Sequence, Tuple, Dict
 from dataclasses import dataclass, field
 
+import numpy as np
+
 from simulation_engine import SimulationEngine
 from causal_graph_prototype import BusinessState, LaggedEffect
 from bet_sizing import MonthlyPolicy
 
+# Below this many children the scalar UCB1 loop beats the NumPy call overhead
+VECTORIZED_UCB_MIN_CHILDREN = 24
+
+# Rollouts a transposition-table entry needs before its mean replaces a playout
+TT_MIN_SAMPLES = 4
+
+
+def state_hash(s: BusinessState) -> int:
+    """Quantized key: states within ~$1k cash / 10 customers share rollouts"""
+    return hash((round(s.cash / 1000), round(s.customers / 10), round(s.cac), round(s.arpu), s.month))
+
 class MCTSNode:
     """Represents a node in the game tree (a specific business state)"""
     def __init__(self, state: BusinessState, lagged_effects: List[LaggedEffect], parent=None, move=None):
@@ -23,13 +39,18 @@ class MCTSNode:
         self.parent: Optional[MCTSNode] = parent
         self.move: Optional[MonthlyPolicy] = move 
         self.children: List[MCTSNode] = []
+        self.index: int = 0  # Position in parent.children
+        
+        # Per-child stats mirrored in arrays so UCB1 is one vector expression
+        self._child_visits = np.zeros(0)
+        self._child_values = np.zeros(0)
         
         # MCTS Stats
         self.visits: int = 0
         self.value: float = 0.0
         
         # Risk Stats
-        self.survival_wins: int = 0  # Count of rollouts that didn't go bankrupt
+        self.survival_wins: float = 0  # Count of rollouts that didn't go bankrupt
         
         self.untried_moves: List[MonthlyPolicy] = [] 
 
@@ -42,15 +63,63 @@ class MCTSNode:
             return 0.0
         return self.survival_wins / self.visits
 
+    def add_child(self, child: 'MCTSNode'):
+        """Attaches a child and grows the per-child stat arrays"""
+        child.index = len(self.children)
+        self.children.append(child)
+        self._child_visits = np.append(self._child_visits, child.visits)
+        self._child_values = np.append(self._child_values, child.value)
+
+    def record(self, score: float, survived: float):
+        """
+        Adds one rollout result to this node (and its parent's arrays).
+        `survived` may be a fraction when the score averages a leaf batch.
+        """
+        self.visits += 1
+        self.value += score
+        self.survival_wins += survived
+        if self.parent is not None:
+            self.parent._child_visits[self.index] += 1
+            self.parent._child_values[self.index] += score
+
+    def add_virtual_loss(self):
+        """
+        Counts an in-flight rollout as a visit with no value, so the UCB1
+        terms become Q/(N+vl) and sqrt(ln(N_parent+vl_parent)/(N+vl)) and
+        the next selection in the same batch is steered elsewhere.
+        """
+        self.visits += 1
+        if self.parent is not None:
+            self.parent._child_visits[self.index] += 1
+
+    def revert_virtual_loss(self):
+        """Removes one add_virtual_loss (call before recording the real result)"""
+        self.visits -= 1
+        if self.parent is not None:
+            self.parent._child_visits[self.index] -= 1
+
     def best_child(self, exploration_weight: float = 1.414) -> 'MCTSNode':
-        """Selects best child using UCB1 formula"""
+        """Selects best child using UCB1 formula (vectorized over children)"""
+        if not self.children:
+            return None
+        if len(self.children) < VECTORIZED_UCB_MIN_CHILDREN:
+            return self._best_child_scalar(exploration_weight)
+        
+        visits = self._child_visits
+        exploit = self._child_values / visits
+        explore = np.sqrt(math.log(self.visits) / visits)
+        scores = exploit + exploration_weight * explore
+        return self.children[int(scores.argmax())]
+
+    def _best_child_scalar(self, exploration_weight: float) -> 'MCTSNode':
+        """UCB1 as a plain loop; cheaper than NumPy for a handful of children"""
+        log_parent = math.log(self.visits)
         best_score = -float('inf')
         best_check_node = None
         
         for child in self.children:
-            exploit = child.value / child.visits
-            explore = math.sqrt(math.log(self.visits) / child.visits)
-            score = exploit + exploration_weight * explore
+            inv_visits = 1.0 / child.visits
+            score = child.value * inv_visits + exploration_weight * math.sqrt(log_parent * inv_visits)
             
             if score > best_score:
                 best_score = score
@@ -59,21 +128,41 @@ class MCTSNode:
         return best_check_node
 
 class MCTSEngine:
-    def __init__(self, sim_engine: SimulationEngine):
+    def __init__(self, sim_engine: SimulationEngine, tt_capacity: int = 0, leaf_batch: int = 0,
+                 tree_batch: int = 0):
+        """
+        tt_capacity > 0 enables a fixed-size transposition table of rollout
+        results keyed by state_hash. Each key maps to one slot; on a collision
+        the shallower (lower month) state keeps the slot.
+        leaf_batch > 0 replaces each random playout by the mean of that many
+        playouts advanced together by SimulationEngine.rollout_batch.
+        tree_batch > 0 selects that many leaves per round under virtual loss
+        and rolls them out together with SimulationEngine.rollout_leaves
+        (one playout per leaf; takes precedence over the options above).
+        """
         self.sim = sim_engine
+        self.tt_capacity = tt_capacity
+        # Slot: [key, depth, sum_score, sum_survived, count]
+        self._tt: List[Optional[list]] = [None] * tt_capacity
+        self.leaf_batch = leaf_batch
+        self.tree_batch = tree_batch
+        # Seeded from `random` so a seeded caller stays reproducible
+        self._leaf_rng = (
+            np.random.default_rng(random.getrandbits(64)) if leaf_batch or tree_batch else None
+        )
 
-    def run_search(self, root_state: BusinessState, initial_effects: List[LaggedEffect], iterations: int = 1000) -> Tuple[MonthlyPolicy, float]:
+    def run_search(self, root_state: BusinessState, initial_effects: List[LaggedEffect], iterations: int = 1000, workers: int = 1) -> Tuple[MonthlyPolicy, float]:
         """
         Runs MCTS for N iterations.
+        With workers > 1 uses root parallelization: `workers` independent trees
+        (iterations split between them) are grown in separate processes and
+        their root statistics are summed before picking the move.
         Returns: (Best Move, Survival Probability of that move)
         """
-        root_node = MCTSNode(root_state, initial_effects)
-        root_node.untried_moves = self.sim.get_legal_moves() 
+        if workers > 1:
+            return self._run_parallel_search(root_state, initial_effects, iterations, workers)
 
-        for _ in range(iterations):
-            node = self._select(root_node)
-            score, survived = self._simulate(node)
-            self._backpropagate(node, score, survived)
+        root_node = self._build_tree(root_state, initial_effects, iterations)
 
         if not root_node.children:
             moves = self.sim.get_legal_moves()
@@ -83,6 +172,89 @@ class MCTSEngine:
         best_node = max(root_node.children, key=lambda c: c.visits)
         return best_node.move, best_node.get_survival_probability()
 
+    def _build_tree(self, root_state: BusinessState, initial_effects: List[LaggedEffect], iterations: int) -> MCTSNode:
+        """Grows one search tree and returns its root"""
+        root_node = MCTSNode(root_state, initial_effects)
+        root_node.untried_moves = self.sim.get_legal_moves() 
+        
+        # Cached on the engine and shared read-only by every rollout
+        legal_moves = self.sim.legal_moves
+
+        if self.tree_batch:
+            self._grow_batched(root_node, iterations, legal_moves)
+            return root_node
+
+        for _ in range(iterations):
+            node = self._select(root_node)
+            score, survived = self._simulate(node, legal_moves)
+            self._backpropagate(node, score, survived)
+
+        return root_node
+
+    def _grow_batched(self, root_node: MCTSNode, iterations: int, legal_moves: Sequence[MonthlyPolicy]):
+        """
+        Tree parallelization within one search: each round selects up to
+        tree_batch leaves, adding a virtual loss along every selected path so
+        later selections in the round spread over the tree, then rolls all
+        leaves out in one batch and backpropagates the real results.
+        """
+        remaining = iterations
+        while remaining > 0:
+            leaves = []
+            for _ in range(min(self.tree_batch, remaining)):
+                node = self._select(root_node)
+                leaves.append(node)
+                while node is not None:
+                    node.add_virtual_loss()
+                    node = node.parent
+            remaining -= len(leaves)
+
+            scores, survived = self.sim.rollout_leaves(
+                [leaf.state for leaf in leaves], [leaf.lagged_effects for leaf in leaves],
+                self._leaf_rng, legal_moves
+            )
+            for leaf, score, did_survive in zip(leaves, scores.tolist(), survived.tolist()):
+                node = leaf
+                while node is not None:
+                    node.revert_virtual_loss()
+                    node = node.parent
+                self._backpropagate(leaf, score, did_survive)
+
+    def _run_parallel_search(self, root_state: BusinessState, initial_effects: List[LaggedEffect], iterations: int, workers: int) -> Tuple[MonthlyPolicy, float]:
+        """
+        Root parallelization over a process pool (the rollout is pure Python,
+        so threads would serialize on the GIL). Each worker builds its own
+        engine of the same class and constructor arguments, since graph
+        lambdas can't be pickled.
+        Worker seeds come from `random`, so a seeded caller stays reproducible.
+        """
+        engine_factory = partial(type(self.sim), successor_cache=self.sim.successor_cache)
+        seeds = [random.getrandbits(64) for _ in range(workers)]
+        shares = [iterations // workers + (i < iterations % workers) for i in range(workers)]
+        
+        # Sum visits / value / survival wins per move across the trees
+        totals: Dict[str, List[float]] = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            trees = executor.map(
+                _search_worker, repeat(engine_factory), repeat(root_state),
+                repeat(initial_effects), shares, seeds, repeat(self.tt_capacity),
+                repeat(self.leaf_batch), repeat(self.tree_batch)
+            )
+            for root_stats in trees:
+                for name, visits, value, survival_wins in root_stats:
+                    stats = totals.setdefault(name, [0, 0.0, 0])
+                    stats[0] += visits
+                    stats[1] += value
+                    stats[2] += survival_wins
+
+        moves = {move.name: move for move in self.sim.legal_moves}
+        if not totals:
+            return random.choice(list(moves.values())), 0.0
+
+        best_name = max(totals, key=lambda name: totals[name][0])
+        visits, _, survival_wins = totals[best_name]
+        return moves[best_name], survival_wins / visits
+
     def _select(self, node: MCTSNode) -> MCTSNode:
         while not self.sim.is_terminal(node.state):
             if not node.is_fully_expanded():
@@ -99,34 +271,64 @@ class MCTSEngine:
         new_state, new_effects = self.sim.step(node.state, node.lagged_effects, move)
         child_node = MCTSNode(new_state, new_effects, parent=node, move=move)
         child_node.untried_moves = self.sim.get_legal_moves()
-        node.children.append(child_node)
+        node.add_child(child_node)
         return child_node
 
-    def _simulate(self, node: MCTSNode) -> Tuple[float, bool]:
+    def _simulate(self, node: MCTSNode, legal_moves: Optional[Sequence[MonthlyPolicy]] = None) -> Tuple[float, float]:
         """
         Run a random rollout.
-        Returns: (Score, DidSurvive)
+        Returns: (Score, DidSurvive) - survival is a fraction for leaf batches
         """
-        current_state = node.state
-        current_effects = node.lagged_effects
-        
-        # Rollout loop
-        while not self.sim.is_terminal(current_state):
-            move = random.choice(self.sim.get_legal_moves())
-            current_state, current_effects = self.sim.step(current_state, current_effects, move)
-            
-        # Evaluate final state
-        # SimulationEngine.evaluate needs to return BOTH score and survival bool now
-        # But to keep API simple, we'll check survival here based on terminal condition
-        score = self.sim.evaluate(current_state)
-        did_survive = current_state.cash >= 0
+        if self.leaf_batch:
+            scores, survived = self.sim.rollout_batch(
+                node.state, node.lagged_effects, self.leaf_batch, self._leaf_rng, legal_moves
+            )
+            return float(scores.mean()), float(survived.mean())
         
-        return score, did_survive
+        if not self.tt_capacity:
+            # The whole playout runs inside the engine on a private, in-place state
+            return self.sim.rollout(node.state, node.lagged_effects, legal_moves)
+
+        key = state_hash(node.state)
+        depth = node.state.month
+        slot_index = key % self.tt_capacity
+        entry = self._tt[slot_index]
+        if entry is not None and entry[0] == key and entry[4] >= TT_MIN_SAMPLES:
+            # Reuse the cached mean; survival is drawn at the cached rate
+            count = entry[4]
+            return entry[2] / count, random.random() * count < entry[3]
+
+        score, survived = self.sim.rollout(node.state, node.lagged_effects, legal_moves)
+
+        if entry is not None and entry[0] == key:
+            entry[2] += score
+            entry[3] += survived
+            entry[4] += 1
+        elif entry is None or depth <= entry[1]:
+            self._tt[slot_index] = [key, depth, score, int(survived), 1]
+        return score, survived
 
     def _backpropagate(self, node: MCTSNode, score: float, survived: bool):
         while node is not None:
-            node.visits += 1
-            node.value += score
-            if survived:
-                node.survival_wins += 1
+            node.record(score, survived)
             node = node.parent
+
+
+def _search_worker(
+    engine_factory: Callable[[], SimulationEngine],
+    root_state: BusinessState,
+    initial_effects: List[LaggedEffect],
+    iterations: int,
+    seed: int,
+    tt_capacity: int = 0,
+    leaf_batch: int = 0,
+    tree_batch: int = 0
+) -> List[Tuple[str, int, float, float]]:
+    """Grows one independent tree in a worker process; returns root child stats"""
+    random.seed(seed)
+    engine = MCTSEngine(engine_factory(), tt_capacity, leaf_batch, tree_batch)
+    root_node = engine._build_tree(root_state, initial_effects, iterations)
+    return [
+        (child.move.name, child.visits, child.value, child.survival_wins)
+        for child in root_node.children
+    ]
@@ -4,27 +4,42 @@ Monte Carlo simulation engine.
 Orchestrates multiple simulation runs with Gemini-derived third-order modifiers
 and computes statistical outcomes.
 """
+import asyncio
 import random
-from typing import Dict, Any, List, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Union
 
 import numpy as np
 
-from business_state import BusinessState
-from simulator import BusinessSimulator
+from business_state import BusinessState, BusinessStateBatch, BATCH_FIELDS, INT_FIELDS, STATE_SETTERS
+from first_order import sample_first_order_noise
+from simulator import BusinessSimulator, ActionPairs, resolve_action, resolve_gemini_modifiers
 from utils.gemini_client import call_gemini_with_schema
 from utils.schemas import ThirdOrderModifiers, StrategicAnalysis
 
 
+# Third-order modifiers, either as the Gemini model or its model_dump()
+ModifiersLike = Union[ThirdOrderModifiers, Dict[str, Any]]
+
+
 # -----------------------------------------------------------------------------
 # State Helpers
 # -----------------------------------------------------------------------------
 
-def apply_action_to_state(state: BusinessState, action_modifiers: Dict[str, Any]) -> BusinessState:
+def as_modifiers_dict(modifiers: ModifiersLike) -> Dict[str, Any]:
+    """Dict form of the modifiers; dumps the pydantic model only if needed."""
+    if isinstance(modifiers, dict):
+        return modifiers
+    return modifiers.model_dump()
+
+
+def apply_action_to_state(
+    state: BusinessState, action_modifiers: Union[Dict[str, Any], ActionPairs]
+) -> BusinessState:
     """Creates a new state with action modifiers applied."""
-    new_state = BusinessState.from_dict(state.to_dict())
-    for key, value in action_modifiers.items():
-        if hasattr(new_state, key):
-            setattr(new_state, key, value)
+    new_state = state.clone()
+    for key, value in resolve_action(new_state, action_modifiers):
+        STATE_SETTERS[key](new_state, value)
     return new_state
 
 
@@ -51,119 +66,213 @@ def fetch_third_order_modifiers(state: BusinessState, months: int) -> ThirdOrder
     return call_gemini_with_schema(prompt, ThirdOrderModifiers)
 
 
+async def fetch_third_order_modifiers_async(state: BusinessState, months: int) -> ThirdOrderModifiers:
+    """fetch_third_order_modifiers on a worker thread so several calls can overlap."""
+    return await asyncio.to_thread(fetch_third_order_modifiers, state, months)
+
+
 # -----------------------------------------------------------------------------
 # Simulation Execution
 # -----------------------------------------------------------------------------
 
 def run_single_simulation(
     initial_state: BusinessState,
-    action_modifiers: Dict[str, Any],
-    gemini_modifiers: ThirdOrderModifiers,
+    action_modifiers: Union[Dict[str, Any], ActionPairs],
+    gemini_modifiers: ModifiersLike,
     months: int,
     simulator: BusinessSimulator,
     run_seed: Optional[int] = None,
+    return_full_trace: bool = False,
 ) -> Dict[str, Any]:
     """
     Runs a single Monte Carlo simulation path.
 
     Args:
         initial_state: Starting business state.
-        action_modifiers: Dict of changes to state variables.
-        gemini_modifiers: Third-order modifiers from Gemini.
+        action_modifiers: Dict of changes to state variables (or resolve_action pairs).
+        gemini_modifiers: Third-order modifiers from Gemini (model or its dict).
         months: Number of months to simulate.
         simulator: BusinessSimulator instance.
         run_seed: Optional seed for reproducible randomness (HP-4).
+        return_full_trace: Also record every monthly state (debugging).
 
     Returns:
-        Dict with 'trace' (list of state dicts), 'final_cash', and 'survived'.
+        Dict with 'cash_trace' (array of month-end cash, shape (months,)),
+        'final_cash', 'survived', and 'trace' only when return_full_trace is
+        set: an array of shape (months, len(BATCH_FIELDS)) whose columns are
+        addressed by FIELD_INDEX (e.g. trace[:, CASH_IDX]).
     """
-    # Set seed for reproducibility if provided (HP-4)
-    if run_seed is not None:
-        random.seed(run_seed)
+    # Private generator, seeded for reproducibility if provided (HP-4)
+    rng = random.Random(run_seed)
 
-    current_state = BusinessState.from_dict(initial_state.to_dict())
-    trace: List[Dict[str, Any]] = []
+    current_state = initial_state.clone()
+    cash_trace = np.empty(months)
+    trace: List[np.ndarray] = []
 
-    modifiers_dict = gemini_modifiers.model_dump()
+    gemini_plan = resolve_gemini_modifiers(gemini_modifiers)
+    action_applied = resolve_action(current_state, action_modifiers)
 
-    for _ in range(months):
-        current_state = simulator.step(current_state, action_modifiers, modifiers_dict)
-        trace.append(current_state.to_dict())
+    for month_idx in range(months):
+        current_state = simulator.step(current_state, action_applied, gemini_plan, rng=rng)
+        cash_trace[month_idx] = current_state.cash
+        if return_full_trace:
+            trace.append(current_state.to_row())
 
-    return {
-        "trace": trace,
+    result = {
+        "cash_trace": cash_trace,
         "final_cash": current_state.cash,
         "survived": current_state.cash > 0,
     }
+    if return_full_trace:
+        result["trace"] = np.stack(trace) if trace else np.empty((0, len(BATCH_FIELDS)))
+    return result
 
 
 def run_all_simulations(
     initial_state: BusinessState,
-    action_modifiers: Dict[str, Any],
-    gemini_modifiers: ThirdOrderModifiers,
+    action_modifiers: Union[Dict[str, Any], ActionPairs],
+    gemini_modifiers: ModifiersLike,
     months: int,
     num_runs: int,
     base_seed: Optional[int] = None,
-) -> List[Dict[str, Any]]:
+    workers: int = 1,
+) -> Dict[str, np.ndarray]:
     """
-    Runs all Monte Carlo simulation paths.
+    Runs all Monte Carlo simulation paths at once on a BusinessStateBatch.
+
+    Every path advances in lockstep through BusinessSimulator.step_batch,
+    so the per-month cost is a handful of array operations instead of
+    num_runs Python-level steps.
+
+    With workers > 1 the paths are split into that many shards that run on
+    a thread pool (NumPy releases the GIL on large arrays), each with an
+    independent generator spawned from base_seed. Results are reproducible
+    for a given (base_seed, workers) pair.
 
     Args:
         initial_state: Starting business state.
-        action_modifiers: Dict of changes to state variables.
-        gemini_modifiers: Third-order modifiers from Gemini.
+        action_modifiers: Dict of changes to state variables (or resolve_action pairs).
+        gemini_modifiers: Third-order modifiers from Gemini (model or its dict).
         months: Number of months to simulate.
         num_runs: Number of simulation paths to run.
-        base_seed: Optional base seed for reproducibility (HP-4).
-                   Each run uses base_seed + run_index as its seed.
+        base_seed: Optional seed for the NumPy generator (HP-4).
+        workers: Number of shards to simulate concurrently.
+
+    Returns:
+        Dict mapping each field in BATCH_FIELDS to an array of shape
+        (months, num_runs) holding the end-of-month value of every path.
     """
+    action_applied = resolve_action(initial_state, action_modifiers)
+    modifiers_dict = as_modifiers_dict(gemini_modifiers)
+
+    if workers <= 1:
+        return _simulate_shard(
+            initial_state, action_applied, modifiers_dict, months, num_runs,
+            np.random.default_rng(base_seed)
+        )
+
+    shard_sizes = [len(shard) for shard in np.array_split(np.arange(num_runs), workers)]
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(base_seed).spawn(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        shards = list(executor.map(
+            lambda args: _simulate_shard(initial_state, action_applied, modifiers_dict, months, *args),
+            zip(shard_sizes, rngs)
+        ))
+    return {name: np.concatenate([shard[name] for shard in shards], axis=1) for name in BATCH_FIELDS}
+
+
+def _simulate_shard(
+    initial_state: BusinessState,
+    action_applied: ActionPairs,
+    modifiers_dict: Dict[str, Any],
+    months: int,
+    num_runs: int,
+    rng: np.random.Generator,
+) -> Dict[str, np.ndarray]:
+    """Simulates one batch of paths with its own generator; see run_all_simulations."""
     simulator = BusinessSimulator()
-    results = []
+    batch = BusinessStateBatch.from_state(initial_state, num_runs)
+
+    # All first-order noise for the run in one draw (HP-4)
+    noise = sample_first_order_noise(rng, (months, num_runs))
 
-    for i in range(num_runs):
-        run_seed = (base_seed + i) if base_seed is not None else None
-        result = run_single_simulation(
-            initial_state, action_modifiers, gemini_modifiers, months, simulator, run_seed
+    history = {name: np.empty((months, num_runs)) for name in BATCH_FIELDS}
+    for month_idx in range(months):
+        batch = simulator.step_batch(
+            batch, rng, action_applied, modifiers_dict, first_order_noise=noise[month_idx]
         )
-        results.append(result)
+        for name in BATCH_FIELDS:
+            history[name][month_idx] = getattr(batch, name)
+
+    return history
+
 
-    return results
+def history_to_traces(history: Dict[str, np.ndarray], start_month: int = 0) -> List[List[Dict[str, Any]]]:
+    """
+    Converts batched history into per-run traces (lists of state dicts),
+    the shape returned by the API. Count fields are exported as ints.
+    """
+    num_runs = history["cash"].shape[1]
+    columns = [
+        (history[name].astype(np.int64) if name in INT_FIELDS else history[name]).T.tolist()
+        for name in BATCH_FIELDS
+    ]
+    
+    traces = []
+    for run in range(num_runs):
+        rows = zip(*(column[run] for column in columns))
+        traces.append([
+            {**dict(zip(BATCH_FIELDS, values)), "month": start_month + month_idx + 1}
+            for month_idx, values in enumerate(rows)
+        ])
+    
+    return traces
 
 
 # -----------------------------------------------------------------------------
 # Statistics
 # -----------------------------------------------------------------------------
 
-def compute_final_statistics(simulation_results: List[Dict[str, Any]]) -> Dict[str, float]:
-    """Computes final cash percentiles and survival probability."""
-    final_cash_values = np.array([r["final_cash"] for r in simulation_results])
-    survived_count = sum(1 for r in simulation_results if r["survived"])
+# Reported cash percentiles; always requested together so NumPy sorts once per call
+CASH_PERCENTILES = (10, 50, 90)
+
+
+def compute_final_statistics(
+    history: Dict[str, np.ndarray], initial_cash: Optional[float] = None
+) -> Dict[str, float]:
+    """
+    Computes final cash percentiles and survival probability.
+
+    A zero-month history has no rows; every path then ends where it started,
+    at initial_cash.
+    """
+    cash = history["cash"]
+    if len(cash):
+        final_cash_values = cash[-1]
+    elif initial_cash is None:
+        raise ValueError("An empty (months=0) history needs initial_cash")
+    else:
+        final_cash_values = np.full(cash.shape[1], float(initial_cash))
+    p10, p50, p90 = np.percentile(final_cash_values, CASH_PERCENTILES)
     
     return {
-        "p10": float(np.percentile(final_cash_values, 10)),
-        "p50": float(np.percentile(final_cash_values, 50)),
-        "p90": float(np.percentile(final_cash_values, 90)),
-        "survival_probability": survived_count / len(simulation_results),
+        "p10": float(p10),
+        "p50": float(p50),
+        "p90": float(p90),
+        "survival_probability": np.count_nonzero(final_cash_values > 0) / final_cash_values.size,
     }
 
 
 def compute_cash_time_series(
-    simulation_results: List[Dict[str, Any]], months: int
+    history: Dict[str, np.ndarray], months: int
 ) -> List[Dict[str, Any]]:
     """Computes monthly cash percentiles across all runs."""
-    traces = [r["trace"] for r in simulation_results]
-    series = []
+    p10, p50, p90 = np.percentile(history["cash"][:months], CASH_PERCENTILES, axis=1).tolist()
     
-    for month_idx in range(months):
-        month_cash = [trace[month_idx]["cash"] for trace in traces]
-        series.append({
-            "month": month_idx + 1,
-            "p10": float(np.percentile(month_cash, 10)),
-            "p50": float(np.percentile(month_cash, 50)),
-            "p90": float(np.percentile(month_cash, 90)),
-        })
-    
-    return series
+    return [
+        {"month": month_idx + 1, "p10": p10[month_idx], "p50": p50[month_idx], "p90": p90[month_idx]}
+        for month_idx in range(months)
+    ]
 
 
 # -----------------------------------------------------------------------------
@@ -173,7 +282,7 @@ def compute_cash_time_series(
 def build_analysis_prompt(
     initial_state: BusinessState,
     action_modifiers: Dict[str, Any],
-    gemini_modifiers: ThirdOrderModifiers,
+    gemini_modifiers: ModifiersLike,
     stats: Dict[str, float],
     months: int,
     num_runs: int,
@@ -189,7 +298,7 @@ Inputs:
 - num_runs: {num_runs}
 - initial_state: {initial_state.to_dict()}
 - action_modifiers_applied: {action_modifiers}
-- gemini_modifiers_used: {gemini_modifiers.model_dump()}
+- gemini_modifiers_used: {as_modifiers_dict(gemini_modifiers)}
 - survival_probability: {stats['survival_probability']}
 - final_cash_percentiles: {{ "p10": {stats['p10']}, "p50": {stats['p50']}, "p90": {stats['p90']} }}
 
@@ -200,7 +309,7 @@ Return up to 5 items per category as JSON.
 def fetch_strategic_analysis(
     initial_state: BusinessState,
     action_modifiers: Dict[str, Any],
-    gemini_modifiers: ThirdOrderModifiers,
+    gemini_modifiers: ModifiersLike,
     stats: Dict[str, float],
     months: int,
     num_runs: int,
@@ -212,6 +321,21 @@ def fetch_strategic_analysis(
     return call_gemini_with_schema(prompt, StrategicAnalysis)
 
 
+async def fetch_strategic_analysis_async(
+    initial_state: BusinessState,
+    action_modifiers: Dict[str, Any],
+    gemini_modifiers: ModifiersLike,
+    stats: Dict[str, float],
+    months: int,
+    num_runs: int,
+) -> StrategicAnalysis:
+    """fetch_strategic_analysis on a worker thread so several calls can overlap."""
+    return await asyncio.to_thread(
+        fetch_strategic_analysis,
+        initial_state, action_modifiers, gemini_modifiers, stats, months, num_runs
+    )
+
+
 # -----------------------------------------------------------------------------
 # Main Entry Point
 # -----------------------------------------------------------------------------
@@ -242,29 +366,113 @@ def run_monte_carlo(
     Returns:
         Dict with survival probability, percentiles, time series, traces, and Gemini analysis.
     """
+    # Resolve the action against the state fields once for every path
+    action_applied = resolve_action(initial_state, action_modifiers)
+
     # Prepare state with action applied (for Gemini context)
-    projected_state = apply_action_to_state(initial_state, action_modifiers)
+    projected_state = apply_action_to_state(initial_state, action_applied)
 
     # Get third-order modifiers from Gemini
     gemini_modifiers = fetch_third_order_modifiers(projected_state, months)
+    # Serialized once and shared by the simulation, the prompt and the response
+    modifiers_dict = gemini_modifiers.model_dump()
 
     # Run all simulations (with stochastic variance - HP-4)
-    simulation_results = run_all_simulations(
-        initial_state, action_modifiers, gemini_modifiers, months, num_runs, seed
+    history = run_all_simulations(
+        initial_state, action_applied, modifiers_dict, months, num_runs, seed
     )
     
     # Compute statistics
-    stats = compute_final_statistics(simulation_results)
-    cash_series = compute_cash_time_series(simulation_results, months)
+    stats = compute_final_statistics(history, initial_state.cash)
     
     # Get strategic analysis from Gemini
     analysis = fetch_strategic_analysis(
-        initial_state, action_modifiers, gemini_modifiers, stats, months, num_runs
+        initial_state, action_modifiers, modifiers_dict, stats, months, num_runs
     )
     
-    # Collect all traces
-    traces = [r["trace"] for r in simulation_results]
-    
+    return build_results(initial_state, history, stats, months, modifiers_dict, analysis)
+
+
+async def run_monte_carlo_many(
+    initial_state: BusinessState,
+    actions: Sequence[Dict[str, Any]],
+    months: int = 12,
+    num_runs: int = 50,
+    seed: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Runs run_monte_carlo for several action proposals, overlapping the Gemini calls.
+
+    All third-order modifier fetches are issued concurrently, the simulations
+    run in a process pool, and then all strategic analysis fetches are issued
+    concurrently, so a batch costs about two Gemini round trips instead of two
+    per action.
+
+    Args:
+        initial_state: Starting business state shared by every proposal.
+        actions: Action modifier dicts, one per proposal.
+        months: Number of months to simulate.
+        num_runs: Number of Monte Carlo paths per proposal.
+        seed: Optional seed, reused for every proposal so they see the same noise.
+        executor: Executor for the simulations; a temporary ProcessPoolExecutor
+            is used when omitted.
+
+    Returns:
+        One run_monte_carlo result dict per action, in the same order.
+    """
+    actions_applied = [resolve_action(initial_state, action) for action in actions]
+    projected_states = [
+        apply_action_to_state(initial_state, applied) for applied in actions_applied
+    ]
+
+    all_modifiers = [
+        modifiers.model_dump()
+        for modifiers in await asyncio.gather(*(
+            fetch_third_order_modifiers_async(projected, months) for projected in projected_states
+        ))
+    ]
+
+    loop = asyncio.get_running_loop()
+    pool = executor if executor is not None else ProcessPoolExecutor()
+    try:
+        histories = await asyncio.gather(*(
+            loop.run_in_executor(
+                pool, run_all_simulations,
+                initial_state, applied, modifiers, months, num_runs, seed
+            )
+            for applied, modifiers in zip(actions_applied, all_modifiers)
+        ))
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+    all_stats = [compute_final_statistics(history, initial_state.cash) for history in histories]
+    analyses = await asyncio.gather(*(
+        fetch_strategic_analysis_async(
+            initial_state, action, modifiers, stats, months, num_runs
+        )
+        for action, modifiers, stats in zip(actions, all_modifiers, all_stats)
+    ))
+
+    return [
+        build_results(initial_state, history, stats, months, modifiers, analysis)
+        for history, stats, modifiers, analysis in zip(histories, all_stats, all_modifiers, analyses)
+    ]
+
+
+def build_results(
+    initial_state: BusinessState,
+    history: Dict[str, np.ndarray],
+    stats: Dict[str, float],
+    months: int,
+    gemini_modifiers: ModifiersLike,
+    analysis: StrategicAnalysis,
+) -> Dict[str, Any]:
+    """Assembles the run_monte_carlo response from the history and Gemini outputs."""
+    cash_series = compute_cash_time_series(history, months)
+    traces = history_to_traces(history, initial_state.month)
+
     return {
         "survival_probability": stats["survival_probability"],
         "p10": stats["p10"],
@@ -272,7 +480,7 @@ def run_monte_carlo(
         "p90": stats["p90"],
         "series": cash_series,
         "traces": traces,
-        "gemini_modifiers": gemini_modifiers.model_dump(),
+        "gemini_modifiers": as_modifiers_dict(gemini_modifiers),
         "gemini_recommendations": analysis.recommendations,
         "gemini_risks": analysis.risks,
         "gemini_opportunities": analysis.opportunities,
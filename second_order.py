@@ -1,4 +1,6 @@
-from business_state import BusinessState
+import numpy as np
+
+from business_state import BusinessState, BusinessStateBatch
 
 def apply_second_order_effects(state: BusinessState) -> BusinessState:
     """
@@ -15,10 +17,13 @@ def apply_second_order_effects(state: BusinessState) -> BusinessState:
     # Let's assume a small discount on CAC for high spend (economies of scale)
     # But usually it's the opposite (saturation). 
     # I will implement a slight improvement for now as requested.
-    if state.ad_spend > 50000:
-        state.cac *= 0.95 # 5% improvement
-    elif state.ad_spend > 10000:
-        state.cac *= 0.98 # 2% improvement
+    ad_spend = state.ad_spend
+    cac = state.cac
+    if ad_spend > 50000:
+        cac *= 0.95 # 5% improvement
+    elif ad_spend > 10000:
+        cac *= 0.98 # 2% improvement
+    state.cac = cac
         
     # 2. Increased customers -> higher burn (operational overhead)
     # Simple model: $10 extra burn per customer
@@ -27,7 +32,24 @@ def apply_second_order_effects(state: BusinessState) -> BusinessState:
     
     # 3. High CAC -> lower LTV
     # If CAC is very high, maybe we are acquiring lower quality users?
-    if state.cac > 200: # Threshold
+    if cac > 200: # Threshold
         state.ltv *= 0.95
         
     return state
+
+
+def apply_second_order_effects_batch(batch: BusinessStateBatch) -> BusinessStateBatch:
+    """
+    Vectorized apply_second_order_effects; the spend tiers and the CAC
+    threshold become np.where selections per path.
+    """
+    # 1. Higher ad spend -> CAC efficiency improvement
+    batch.cac = batch.cac * np.where(batch.ad_spend > 50000, 0.95, np.where(batch.ad_spend > 10000, 0.98, 1.0))
+
+    # 2. Increased customers -> higher burn ($10 per customer)
+    batch.burn = batch.burn + batch.customers * 10
+
+    # 3. High CAC -> lower LTV
+    batch.ltv = batch.ltv * np.where(batch.cac > 200, 0.95, 1.0)
+
+    return batch
@@ -5,19 +5,59 @@ Integrates Causal Graphs and Bet Sizing to provide the simulation environment fo
 Acts as the bridge between the Abstract Strategy (MCTS) and the Physics (Causal Graph).
 """
 
-import copy
-from typing import List, Dict, Tuple, Any, Union
+import logging
+import os
+import random
+from typing import Callable, List, Dict, Optional, Sequence, Tuple, Any, Union
 from dataclasses import asdict
 
+import numpy as np
+
 from causal_graph_prototype import (
     BusinessState, 
+    BusinessStateBatch,
     CausalGraph, 
     build_prototype_graph, 
-    propagate_effects, 
-    calculate_basic_financials,
-    LaggedEffect
+    calculate_basic_financials_batch,
+    compile_specialized_kernel,
+    compile_specialized_scalar_kernel,
+    LaggedEffect,
+    LaggedEffectRing,
+    BatchLaggedEffect,
+    BATCH_FIELDS,
+    BATCH_FIELD_INDEX,
+    EFFECT_TYPE_CODES,
+    STATE_SETTERS,
 )
-from bet_sizing import Discretizer, StrategicGroup, MonthlyPolicy, create_default_discretizer
+from bet_sizing import Discretizer, StrategicGroup, MonthlyPolicy, PolicyTable, create_default_discretizer
+
+logger = logging.getLogger(__name__)
+
+# Default baselines; each engine copies them so a single engine can be recalibrated
+BASELINE_CAC = 100.0
+BASELINE_CONVERSION = 0.05 # 5%
+
+# Prior targets handled by _advance; other targets are sampled but ignored
+_PRIOR_CAC, _PRIOR_CONVERSION = 1, 2
+_PRIOR_TARGET_CODES = {"cac": _PRIOR_CAC, "conversion_rate": _PRIOR_CONVERSION}
+
+# (setter, sample) per decision and (target code, sample) per prior of a policy
+BetPlan = Tuple[Tuple[Tuple[Optional[Callable], Callable[[], float]], ...],
+                Tuple[Tuple[int, Callable[[], float]], ...]]
+
+def successor_key(state: BusinessState,
+                  lagged_effects: List[LaggedEffect],
+                  policy: MonthlyPolicy) -> tuple:
+    """
+    Quantized memo key for SimulationEngine.step. ad_spend and arpu are left
+    out: every default policy resamples them before the physics runs.
+    """
+    return (
+        round(state.cash, -2), round(state.customers, -1), round(state.cac), round(state.burn, -2),
+        round(state.market_saturation, 2), round(state.cultural_degradation, 2),
+        round(state.rapid_growth, 2), state.month, id(policy),
+        tuple((e.target_metric, e.effect_value, e.effect_type, e.months_remaining) for e in lagged_effects),
+    )
 
 class SimulationEngine:
     """
@@ -28,7 +68,13 @@ class SimulationEngine:
     3. Evaluate State (Calculate score/reward)
     """
 
-    def __init__(self):
+    def __init__(self, successor_cache: int = 0):
+        """
+        successor_cache > 0 enables a fixed-size memo of step: the first
+        sampled successor of each quantized (state, lagged effects, policy)
+        key (see successor_key) is reused for later steps with that key.
+        This trades sampling variance for speed, so it is off by default.
+        """
         self.graph: CausalGraph = build_prototype_graph()
         self.discretizer: Discretizer = create_default_discretizer()
         
@@ -37,9 +83,26 @@ class SimulationEngine:
         self.target_cash = 1000000  # for scoring
         self.penalty_burn = 50000   # penalty threshold
         
+        # Policies come from a fixed discretizer, so rollouts may reuse one move list
+        self.legal_moves_depend_on_state = False
+        # Built once per engine; shared read-only (get_legal_moves hands out copies)
+        self.legal_moves: Tuple[MonthlyPolicy, ...] = self.discretizer.all_policies
+        # Compiled samplers per policy (see _bet_plan); the policy is kept so ids stay valid
+        self._bet_plans: Dict[int, Tuple[MonthlyPolicy, BetPlan]] = {}
+        self._policy_table = PolicyTable(self.legal_moves)
+        
         # Baselines (should be part of state or config in full version)
-        self.baseline_cac = 100.0
-        self.baseline_conversion = 0.05 # 5%
+        self.baseline_cac = BASELINE_CAC
+        self.baseline_conversion = BASELINE_CONVERSION
+        
+        # Slot: (key, policy, successor state, successor effects)
+        self.successor_cache = successor_cache
+        self._successors: List[Optional[tuple]] = [None] * successor_cache
+        
+        # Graph-specialized physics for step/rollout and rollout_batch (cached per graph)
+        self._month_kernel = compile_specialized_scalar_kernel(self.graph, with_financials=True)
+        self._kernel = compile_specialized_kernel(self.graph)
+        self._max_lag = self.graph.compile(BATCH_FIELDS).max_lag
     
     def get_initial_state(self) -> Tuple[BusinessState, List[LaggedEffect]]:
         """Returns standard initial state"""
@@ -60,8 +123,10 @@ class SimulationEngine:
         """
         Returns the discrete moves available to the agent.
         Now returns combinatorial MonthlyPolicy objects (e.g. Spend + Price).
+        The list is fresh (MCTS pops untried moves from it); the policies are
+        the cached, shared ones and must not be mutated.
         """
-        return self.discretizer.generate_all_policies()
+        return list(self.legal_moves)
 
     def step(self, 
              state: BusinessState, 
@@ -70,63 +135,290 @@ class SimulationEngine:
         """
         Executes one month of simulation based on the selected MonthlyPolicy.
         Now includes PROBABILISTIC PRIOR SAMPLING.
+        A terminal state (see is_terminal) comes back unchanged, as a copy.
         """
-        # 1. Clone state to avoid mutation side effects
-        new_state = copy.deepcopy(state)
-        new_effects = copy.deepcopy(lagged_effects)
+        # A terminal (bankrupt or final-month) state is absorbing: skip all work
+        if state.cash < 0 or state.month >= self.max_months:
+            return state.clone(), list(lagged_effects)
+        
+        if self.successor_cache:
+            key = successor_key(state, lagged_effects, policy)
+            slot_index = hash(key) % self.successor_cache
+            entry = self._successors[slot_index]
+            if entry is not None and entry[0] == key and entry[1] is policy:
+                return entry[2].clone(), list(entry[3])
+        
+        # 1. Clone state to avoid mutation side effects. The state holds only
+        # scalars and queued effects are never mutated, so shallow copies suffice
+        new_state = state.clone()
+        new_effects = list(lagged_effects)
+        new_state, new_effects = self._advance(new_state, new_effects, policy)
+        
+        if self.successor_cache:
+            self._successors[slot_index] = (key, policy, new_state.clone(), list(new_effects))
+        return new_state, new_effects
+
+    def _advance(self,
+                 state: BusinessState,
+                 lagged_effects: List[LaggedEffect],
+                 policy: MonthlyPolicy) -> Tuple[BusinessState, List[LaggedEffect]]:
+        """
+        Advances `state` by one month IN PLACE; the caller must own it.
+        `lagged_effects` is only read (the graph kernel builds a new queue).
+        """
+        new_state = state
+        new_effects = lagged_effects
         new_state.month += 1
         
         # 2a. Realize the Bets (Sample specific values for inputs)
-        for var_name, group in policy.decisions.items():
-            value = group.sample()
-            if hasattr(new_state, var_name):
-                setattr(new_state, var_name, value)
+        bets, priors = self._bet_plan(policy)
+        for setter, sample in bets:
+            value = sample()
+            if setter is not None:
+                setter(new_state, value)
                 
         # 2b. APPLY PRIORS (Sample outcomes for downstream vars)
         # This is where we inject the "Risk" and "Non-linear effects"
-        for group in policy.decisions.values():
-            for prior in group.priors:
-                # Sample the multiplier (e.g. 1.4x for Blitz spend)
-                multiplier = prior.distribution.sample_multiplier()
-                
-                # Apply to state
-                # Note: This logic overrides the previous state value with a fresh sample from baseline
-                # effectively modeling "Monthly Performance" based on current choice.
-                # In a more complex model, this might be a delta on previous state.
-                if prior.target_variable == "cac":
-                    # CAC = Baseline * Multiplier
-                    new_state.cac = self.baseline_cac * multiplier
-                
-                elif prior.target_variable == "conversion_rate":
-                    # We don't track conversion_rate explicitly in BusinessState yet, 
-                    # but let's assume it affects new_customers calculation.
-                    # For now, we'll store it in a temporary way or update 'new_customers' formula
-                    # In this minimal prototype, let's treat it as a modifier on CAC (inverse) or new customers.
-                    # Let's say: New Customers = Spend / (Baseline CAC / ConversionMult)
-                    # Actually, easier: Update CAC inversely (Higher conv = Lower CAC)
-                    # But wait, we have pricing priors.
-                    # Let's model Conversion impact by modifying the effective CAC directly for this step.
-                    # If Conversion drops by 0.5x, CAC doubles by 2x.
-                    
-                    if multiplier > 0:
-                         # Inverse relationship: Lower conversion -> Higher CAC
-                         # But wait, we already set CAC from Ad Spend prior.
-                         # We need to combine them.
-                         # Effect = CAC_from_Spend * (1/Conversion_from_Price)
-                         new_state.cac = new_state.cac * (1.0 / multiplier)
-                    else:
-                         new_state.cac = 9999.0 # Effectively 0 conversions
+        # Each sample overrides the previous value with a fresh draw from the
+        # baseline, modeling "Monthly Performance" under the current choice;
+        # cac stays a local until every prior has been applied
+        cac = new_state.cac
+        baseline_cac = self.baseline_cac
+        for target, sample in priors:
+            multiplier = sample()
+            if target == _PRIOR_CAC:
+                # CAC = Baseline * Multiplier
+                cac = baseline_cac * multiplier
+            elif target == _PRIOR_CONVERSION:
+                # Conversion acts on effective CAC inversely (Higher conv = Lower CAC):
+                # Effect = CAC_from_Spend * (1/Conversion_from_Price)
+                cac = cac * (1.0 / multiplier) if multiplier > 0 else 9999.0 # ~0 conversions
+        new_state.cac = cac
 
         
         # 3. Propagate Causal Effects (The "Physics" takes over)
         # The Graph now sees the updated 'ad_spend' and the risk-adjusted 'cac'
         # and propagates second/third order effects (like burn, saturation)
-        new_state, new_effects, _ = propagate_effects(new_state, self.graph, new_effects)
-        
         # 4. Update Financials
-        new_state = calculate_basic_financials(new_state)
+        # (one fused kernel: propagate_effects without the effect log, then
+        # calculate_basic_financials in the same function body)
+        return self._month_kernel(new_state, new_effects)
+
+    def _bet_plan(self, policy: MonthlyPolicy) -> BetPlan:
+        """
+        The bound samplers of `policy`, compiled once per policy object:
+        (setter or None, group.sample) per decision, then (target code,
+        sample_multiplier) per prior. Samplers are kept for unknown
+        variables and targets so the random stream matches the policy.
+        """
+        entry = self._bet_plans.get(id(policy))
+        if entry is None or entry[0] is not policy:
+            bets = tuple((STATE_SETTERS.get(var_name), group.sample) for var_name, group in policy.decisions.items())
+            priors = tuple(
+                (_PRIOR_TARGET_CODES.get(prior.target_variable, 0), prior.distribution.sample_multiplier)
+                for group in policy.decisions.values() for prior in group.priors
+            )
+            entry = self._bet_plans[id(policy)] = (policy, (bets, priors))
+        return entry[1]
+
+    def rollout(self,
+                state: BusinessState,
+                lagged_effects: List[LaggedEffect],
+                legal_moves: Optional[Sequence[MonthlyPolicy]] = None) -> Tuple[float, bool]:
+        """
+        Random playout from `state` to a terminal month for MCTS.
+        The state is cloned once and then advanced in place: intermediate
+        rollout states are never shared, so per-step deep copies are skipped.
+        Moves default to the cached legal_moves tuple; they are refetched
+        per step only when legal_moves_depend_on_state is set.
+        Returns: (Score, DidSurvive)
+        """
+        current_state = state.clone()
+        current_effects = lagged_effects
+        moves = self.legal_moves if legal_moves is None else legal_moves
+        max_months = self.max_months
         
-        return new_state, new_effects
+        # is_terminal, inlined: stop at the final month or on bankruptcy
+        while current_state.month < max_months and current_state.cash >= 0:
+            if self.legal_moves_depend_on_state:
+                moves = self.get_legal_moves()
+            move = moves[random.randrange(len(moves))]
+            current_state, current_effects = self._advance(current_state, current_effects, move)
+        
+        return self.evaluate(current_state), current_state.cash >= 0
+
+    def rollout_batch(self,
+                      state: BusinessState,
+                      lagged_effects: List[LaggedEffect],
+                      num_rollouts: int,
+                      rng: np.random.Generator,
+                      legal_moves: Optional[Sequence[MonthlyPolicy]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        `num_rollouts` random playouts from one leaf, advanced together as a
+        BusinessStateBatch (leaf parallelization). Each path draws its own
+        move, bet values and prior multipliers every month; a path that goes
+        bankrupt is frozen at the bankruptcy score. The move list is fixed
+        for the whole playout (see legal_moves_depend_on_state).
+        Returns: (Scores, DidSurvive) arrays of shape (num_rollouts,)
+        """
+        batch = BusinessStateBatch.from_state(state, num_rollouts)
+        batch.month = 0
+        pending = LaggedEffectRing(self._max_lag)
+        everywhere = np.ones(num_rollouts, dtype=bool)
+        self._schedule_effects(batch, pending, lagged_effects, everywhere)
+        horizon = np.full(num_rollouts, self.max_months - state.month)
+        return self._rollout_paths(batch, pending, horizon, rng, legal_moves)
+
+    def rollout_many(self,
+                     state: BusinessState,
+                     policy_seq: Sequence[MonthlyPolicy],
+                     num_runs: int,
+                     seed: Optional[int] = None,
+                     lagged_effects: Optional[List[LaggedEffect]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        `num_runs` playouts of a fixed plan: every path plays policy_seq
+        month by month (independent bet and prior draws per path), then
+        random legal moves if the plan ends before max_months. All moves
+        and draws for the horizon are sampled up front from
+        default_rng(seed), so the month loop is pure array updates.
+        Returns: (Scores, DidSurvive) arrays of shape (num_runs,)
+        """
+        batch = BusinessStateBatch.from_state(state, num_runs)
+        batch.month = 0
+        pending = LaggedEffectRing(self._max_lag)
+        self._schedule_effects(batch, pending, lagged_effects or [], np.ones(num_runs, dtype=bool))
+        horizon = np.full(num_runs, self.max_months - state.month)
+        rng = np.random.default_rng(seed)
+        return self._rollout_paths(batch, pending, horizon, rng, None, prefix=policy_seq)
+
+    def rollout_leaves(self,
+                       states: Sequence[BusinessState],
+                       lagged_effects: Sequence[List[LaggedEffect]],
+                       rng: np.random.Generator,
+                       legal_moves: Optional[Sequence[MonthlyPolicy]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        One random playout from each of several leaves (which may sit at
+        different months), advanced together as one BusinessStateBatch.
+        Path i carries only leaf i's lagged effects and stops at its own
+        terminal month. Used by tree-parallel MCTS with virtual loss.
+        Returns: (Scores, DidSurvive) arrays with one entry per leaf
+        """
+        batch = BusinessStateBatch.from_states(states)
+        pending = LaggedEffectRing(self._max_lag)
+        
+        # Merge the leaves' effects into one masked batch effect per
+        # (due month, target, op); a second same-key effect on a path
+        # opens another group so effects never overwrite each other
+        groups: Dict[Tuple[int, int, int], List[BatchLaggedEffect]] = {}
+        for path, effects in enumerate(lagged_effects):
+            for effect in effects:
+                target_idx = BATCH_FIELD_INDEX[effect.target_metric]
+                effect_type = EFFECT_TYPE_CODES[effect.effect_type]
+                key = (effect.months_remaining, target_idx, effect_type)
+                slots = groups.setdefault(key, [])
+                group = next((g for g in slots if not g.active[path]), None)
+                if group is None:
+                    group = BatchLaggedEffect(
+                        target_idx=target_idx,
+                        effect_values=np.zeros(batch.num_runs, dtype=batch.data.dtype),
+                        active=np.zeros(batch.num_runs, dtype=bool),
+                        effect_type=effect_type
+                    )
+                    slots.append(group)
+                    pending.schedule(0, effect.months_remaining, group)
+                group.effect_values[path] = effect.effect_value
+                group.active[path] = True
+        
+        horizon = self.max_months - np.array([state.month for state in states])
+        return self._rollout_paths(batch, pending, horizon, rng, legal_moves)
+
+    def _schedule_effects(self,
+                          batch: BusinessStateBatch,
+                          pending: LaggedEffectRing,
+                          lagged_effects: List[LaggedEffect],
+                          active: np.ndarray):
+        """Queue scalar LaggedEffects on the `active` paths of batch's fresh ring (month 0)"""
+        for effect in lagged_effects:
+            pending.schedule(0, effect.months_remaining, BatchLaggedEffect(
+                target_idx=BATCH_FIELD_INDEX[effect.target_metric],
+                effect_values=np.full(batch.num_runs, effect.effect_value, dtype=batch.data.dtype),
+                active=active,
+                effect_type=EFFECT_TYPE_CODES[effect.effect_type]
+            ))
+
+    def _rollout_paths(self,
+                       batch: BusinessStateBatch,
+                       pending: LaggedEffectRing,
+                       horizon: np.ndarray,
+                       rng: np.random.Generator,
+                       legal_moves: Optional[Sequence[MonthlyPolicy]],
+                       prefix: Sequence[MonthlyPolicy] = ()) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Plays every path of `batch` for up to horizon[i] months. batch.month
+        counts months since the rollout started. A path's result is taken
+        when it hits its horizon or goes bankrupt; later months still
+        advance it (branchless) but no longer count. Every path plays the
+        `prefix` moves first, then random legal moves.
+        """
+        moves = self.legal_moves if legal_moves is None else tuple(legal_moves)
+        known = {id(m) for m in moves}
+        extra = tuple({id(p): p for p in prefix if id(p) not in known}.values())
+        table = self._policy_table if legal_moves is None and not extra else PolicyTable(moves + extra)
+        move_index = {id(policy): i for i, policy in enumerate(table.policies)}
+        num_paths = batch.num_runs
+        scores = self.evaluate_batch(batch)
+        survived = batch.cash >= 0
+        running = survived & (horizon > 0)
+        
+        # Every move, bet value and prior multiplier of the rollout, drawn up front
+        months = int(horizon[running].max()) if running.any() else 0
+        choice = rng.integers(len(moves), size=(months, num_paths))
+        for month, policy in enumerate(prefix[:months]):
+            choice[month] = move_index[id(policy)]
+        values, multipliers = table.sample(rng, choice)
+        
+        month = 0
+        while running.any():
+            month += 1
+            batch.month += 1
+            self._realize_bets_batch(batch, table, choice[month - 1], values[:, month - 1], multipliers[:, month - 1])
+            
+            self._kernel(batch, pending)
+            calculate_basic_financials_batch(batch)
+            
+            solvent = batch.cash >= 0
+            ended = running & (~solvent | (horizon <= month))
+            scores[ended] = self.evaluate_batch(batch)[ended]
+            survived[ended] = solvent[ended]
+            running &= ~ended
+        
+        return scores, survived
+
+    def _realize_bets_batch(self,
+                            batch: BusinessStateBatch,
+                            table: PolicyTable,
+                            choice: np.ndarray,
+                            values: np.ndarray,
+                            multipliers: np.ndarray):
+        """
+        Batched steps 2a/2b of _advance: path i plays move choice[i], with
+        its pre-drawn bet values and prior multipliers (see PolicyTable.sample).
+        """
+        for v, var_name in enumerate(table.variables):
+            if var_name in BATCH_FIELD_INDEX:
+                field = batch.data[BATCH_FIELD_INDEX[var_name]]
+                np.copyto(field, values[v], where=table.has_decision[v, choice])
+        
+        targets = table.prior_targets
+        for slot, multiplier in enumerate(multipliers):
+            target = table.prior_target[slot, choice]
+            if "cac" in targets:
+                np.copyto(batch.cac, self.baseline_cac * multiplier, where=target == targets.index("cac"))
+            if "conversion_rate" in targets:
+                # Higher conversion -> lower effective CAC; none at all is ~zero conversions
+                cac = batch.cac
+                converted = np.divide(cac, multiplier, out=np.full_like(cac, 9999.0), where=multiplier > 0)
+                np.copyto(cac, converted, where=target == targets.index("conversion_rate"))
 
     def evaluate(self, state: BusinessState) -> float:
         """
@@ -134,44 +426,53 @@ class SimulationEngine:
         Higher is better.
         """
         # Simple score: Cash + (Customers * LTV proxy) - Penalty for risks
+        # (bankruptcy is checked first so bankrupt leaves skip the rest)
+        cash = state.cash
+        if cash < 0: return -1000 # Bankruptcy
         
         # 1. Cash Score (Normalized)
-        cash_score = state.cash / 100000
+        cash_score = cash / 100000
         
         # 2. Growth Score
         growth_score = (state.customers / 100) * (state.arpu / 50)
         
         # 3. Risk Penalties (Strategic Metrics)
-        risk_penalty = 0
-        if state.market_saturation > 0.8: risk_penalty += 50
-        if state.cultural_degradation > 0.3: risk_penalty += 30
-        if state.cash < 0: return -1000 # Bankruptcy
+        risk_penalty = (50 if state.market_saturation > 0.8 else 0) + (30 if state.cultural_degradation > 0.3 else 0)
         
+        return cash_score + growth_score - risk_penalty
+
+    def evaluate_batch(self, batch: BusinessStateBatch) -> np.ndarray:
+        """evaluate for every path of a batch"""
+        cash_score = batch.cash / 100000
+        growth_score = (batch.customers / 100) * (batch.arpu / 50)
+        risk_penalty = 50.0 * (batch.market_saturation > 0.8) + 30.0 * (batch.cultural_degradation > 0.3)
         score = cash_score + growth_score - risk_penalty
-        return score
+        return np.where(batch.cash < 0, -1000.0, score)
 
     def is_terminal(self, state: BusinessState) -> bool:
         """Check if simulation should end"""
         return state.month >= self.max_months or state.cash < 0
 
 # Test
-if __name__ == "__main__":
+# Opt-in (RUN_DEMO=1) so profiling runs that exec this module skip the demo
+if __name__ == "__main__" and os.environ.get("RUN_DEMO"):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     sim = SimulationEngine()
     state, effects = sim.get_initial_state()
     moves = sim.get_legal_moves()
     
-    print(f"Generated {len(moves)} combined policies.")
+    logger.info("Generated %d combined policies.", len(moves))
     
     # Pick a risky move: Blitz Spend + Elite Price
     # This should result in High CAC (Blitz) and Low Conversion (Elite) -> Ultra High Effective CAC
     move = moves[-1] 
-    print(f"\nSelecting Move: {move.name}")
-    print(move.description)
+    logger.info("\nSelecting Move: %s", move.name)
+    logger.info("%s", move.description)
     
     state, effects = sim.step(state, effects, move)
     
-    print(f"New State (Month {state.month}):")
-    print(f"  Ad Spend: ${state.ad_spend:,.0f}")
-    print(f"  ARPU: ${state.arpu:.2f}")
-    print(f"  CAC: ${state.cac:.2f} (Should be very high)")
-    print(f"  New Customers: {state.new_customers}")
+    logger.info("New State (Month %d):", state.month)
+    logger.info("  Ad Spend: $%.0f", state.ad_spend)
+    logger.info("  ARPU: $%.2f", state.arpu)
+    logger.info("  CAC: $%.2f (Should be very high)", state.cac)
+    logger.info("  New Customers: %d", state.new_customers)
@@ -1,47 +1,195 @@
-import copy
 import logging
 import random
-from typing import Dict, Any, List, Optional
-from business_state import BusinessState
-from first_order import apply_first_order_effects
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+
+import numpy as np
+
+from business_state import BusinessState, BusinessStateBatch, BATCH_FIELDS, STATE_FIELDS, STATE_SETTERS
+from first_order import apply_first_order_effects, sample_first_order_noise
 from second_order import apply_second_order_effects
 from third_order_gemini import apply_third_order_effects_gemini
-from validators import validate_and_enforce, ValidationResult, ConstraintViolation
+from validators import (
+    validate_and_enforce, validate_and_enforce_batch, ValidationResult, ConstraintViolation
+)
 
 logger = logging.getLogger(__name__)
 
+# An action as pre-resolved (attribute, value) pairs
+ActionPairs = Tuple[Tuple[str, Any], ...]
+
+
+def resolve_action(
+    target: Any,
+    action_modifiers: Union[Dict[str, Any], ActionPairs, None]
+) -> ActionPairs:
+    """
+    Returns the (attribute, value) pairs of an action that exist on target.
+
+    Resolve once outside a simulation loop and pass the tuple to step /
+    step_batch, so the per-month update is a STATE_SETTERS call per pair
+    with no hasattr reflection. Already-resolved tuples are returned as is.
+    For states and batches the check is a lookup in the STATE_FIELDS set.
+    """
+    if not action_modifiers:
+        return ()
+    if isinstance(action_modifiers, tuple):
+        return action_modifiers
+    if isinstance(target, (BusinessState, BusinessStateBatch)):
+        return tuple((k, v) for k, v in action_modifiers.items() if k in STATE_FIELDS)
+    return tuple((k, v) for k, v in action_modifiers.items() if hasattr(target, k))
+
+
+def apply_first_and_second_order_effects_batch(
+    batch: BusinessStateBatch, noise: np.ndarray
+) -> BusinessStateBatch:
+    """
+    Fused apply_first_order_effects_batch + apply_second_order_effects_batch.
+
+    Reads each field from the batch once, chains the first- and second-order
+    formulas through local arrays, and writes every field back once at the
+    end, instead of storing and re-reading intermediates (cac, burn, ltv,
+    customers) between the two passes. Same operation order, so results are
+    identical to running the two functions back to back.
+    """
+    acquisition_noise, churn_noise, revenue_noise = noise.T
+    cac = batch.cac
+    ad_spend = batch.ad_spend
+    arpu = batch.arpu
+    burn = batch.burn
+    churn_rate = batch.churn_rate
+
+    # First order: acquisition and churn
+    has_cac = cac > 0
+    new_customers = np.where(has_cac, np.trunc(ad_spend / np.where(has_cac, cac, 1.0) * acquisition_noise), 0.0)
+    churned_customers = np.trunc(batch.customers * churn_rate * churn_noise)
+    customers = batch.customers + new_customers - churned_customers
+
+    # First order: LTV, revenue, cash and runway (on this month's burn)
+    has_churn = churn_rate > 0
+    ltv = np.where(has_churn, arpu / np.where(has_churn, churn_rate, 1.0), arpu * 100)
+    revenue = customers * arpu * revenue_noise
+    cash = batch.cash + revenue - burn - ad_spend
+    total_monthly_spend = burn + ad_spend
+    spending = total_monthly_spend > 0
+    runway = np.where(spending, cash / np.where(spending, total_monthly_spend, 1.0), 999.0)
+
+    # Second order: spend-tier CAC efficiency, per-customer overhead, CAC -> LTV
+    cac = cac * np.where(ad_spend > 50000, 0.95, np.where(ad_spend > 10000, 0.98, 1.0))
+    burn = burn + customers * 10
+    ltv = ltv * np.where(cac > 200, 0.95, 1.0)
+
+    batch.new_customers = new_customers
+    batch.churned_customers = churned_customers
+    batch.customers = customers
+    batch.ltv = ltv
+    batch.revenue = revenue
+    batch.cash = cash
+    batch.runway = runway
+    batch.cac = cac
+    batch.burn = burn
+    return batch
+
+
+# Noisy third-order updates as (modifier key, state field, update(value, modifier, noise))
+GEMINI_UPDATES: Tuple[Tuple[str, str, Callable[[Any, float, float], Any]], ...] = (
+    ("burn_multiplier", "burn", lambda value, m, noise: value * (m * noise)),
+    ("ARPU_shift", "arpu", lambda value, m, noise: value + (m * noise)),
+    ("CAC_drift", "cac", lambda value, m, noise: value * (m * noise)),
+    ("demand_adjustments", "traffic", lambda value, m, noise: int(value * m * noise)),
+)
+
+_STATE_GETTERS = {field: getattr(BusinessState, field).__get__ for _, field, _ in GEMINI_UPDATES}
+
+# Gemini modifiers as pre-resolved (setter, getter, update, modifier) updates
+# plus the shock probability (None when long_term_risk is absent)
+GeminiPlan = Tuple[Tuple[Tuple[Callable, Callable, Callable, float], ...], Optional[float]]
+
+
+def resolve_gemini_modifiers(modifiers: Union[Dict[str, Any], Any, GeminiPlan, None]) -> GeminiPlan:
+    """
+    Flattens third-order modifiers (dict, ThirdOrderModifiers model or an
+    already-resolved plan) into a GeminiPlan.
+
+    Resolve once outside a simulation loop and pass the plan to step, so
+    the per-month update does no dict lookups or float() casts. Absent keys
+    are skipped, as with a partial dict.
+    """
+    if not modifiers:
+        return (), None
+    if isinstance(modifiers, tuple):
+        return modifiers
+    if not isinstance(modifiers, dict):
+        modifiers = modifiers.model_dump()
+    updates = tuple(
+        (STATE_SETTERS[field], _STATE_GETTERS[field], update, float(modifiers[key]))
+        for key, field, update in GEMINI_UPDATES if key in modifiers
+    )
+    risk_prob = float(modifiers["long_term_risk"]) if "long_term_risk" in modifiers else None
+    return updates, risk_prob
+
+
+# Modifier key of each update in GEMINI_UPDATES, to read a GeminiPlan back
+_UPDATE_KEYS = {update: key for key, _, update in GEMINI_UPDATES}
+
+
+def _gemini_modifiers_dict(modifiers: Union[Dict[str, Any], Any, GeminiPlan, None]) -> Dict[str, Any]:
+    """
+    Dict form of third-order modifiers (dict, ThirdOrderModifiers model or a
+    GeminiPlan), as the vectorized step reads them.
+    """
+    if not modifiers:
+        return {}
+    if isinstance(modifiers, dict):
+        return modifiers
+    if isinstance(modifiers, tuple):
+        updates, risk_prob = modifiers
+        resolved = {_UPDATE_KEYS[update]: m for _, _, update, m in updates}
+        if risk_prob is not None:
+            resolved["long_term_risk"] = risk_prob
+        return resolved
+    return modifiers.model_dump()
+
+
 class BusinessSimulator:
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
         self.violations: List[ConstraintViolation] = []
+        # Private generator: no contention on the module-level random state,
+        # and reproducible per simulator when seeded (HP-4)
+        self._rng = random.Random(seed)
 
     def step(
         self,
         state: BusinessState,
-        action_modifiers: Optional[Dict[str, Any]] = None,
-        gemini_modifiers: Optional[Dict[str, Any]] = None,
-        validate: bool = True
+        action_modifiers: Union[Dict[str, Any], ActionPairs, None] = None,
+        gemini_modifiers: Union[Dict[str, Any], GeminiPlan, None] = None,
+        validate: bool = True,
+        rng: Optional[random.Random] = None
     ) -> BusinessState:
         """
         Advances the simulation by one month.
 
         Args:
             state: Current BusinessState.
-            action_modifiers: Dict of changes to state variables (e.g. {'ad_spend': 50000}).
-            gemini_modifiers: Cached/Pre-calculated Gemini modifiers for 3rd order effects.
+            action_modifiers: Dict of changes to state variables (e.g. {'ad_spend': 50000}),
+                              or the pairs from resolve_action.
+            gemini_modifiers: Cached/Pre-calculated Gemini modifiers for 3rd order effects,
+                              or the plan from resolve_gemini_modifiers.
                               If None, we might skip or call Gemini (but for MC we want to pass them).
             validate: Whether to validate and enforce constraints (HP-5). Default True.
+            rng: Optional random.Random for all stochastic noise; the simulator's
+                 own generator (see seed) is used when omitted.
         """
-        new_state = copy.deepcopy(state)
+        if rng is None:
+            rng = self._rng
+        new_state = state.clone()
         new_state.month += 1
         
         # Apply Action (update parameters)
-        if action_modifiers:
-            for k, v in action_modifiers.items():
-                if hasattr(new_state, k):
-                    setattr(new_state, k, v)
+        for k, v in resolve_action(new_state, action_modifiers):
+            STATE_SETTERS[k](new_state, v)
         
         # 1. First Order
-        new_state = apply_first_order_effects(new_state)
+        new_state = apply_first_order_effects(new_state, rng)
         
         # 2. Second Order
         new_state = apply_second_order_effects(new_state)
@@ -54,7 +202,7 @@ class BusinessSimulator:
         # define the *trends* and we apply them here.
         
         if gemini_modifiers:
-            self._apply_gemini_modifiers(new_state, gemini_modifiers)
+            self._apply_gemini_modifiers(new_state, gemini_modifiers, rng)
 
         # 4. Validate and enforce constraints (HP-5)
         if validate:
@@ -63,34 +211,164 @@ class BusinessSimulator:
 
         return new_state
 
-    def _apply_gemini_modifiers(self, state: BusinessState, modifiers: Dict[str, Any]):
+    def _apply_gemini_modifiers(
+        self,
+        state: BusinessState,
+        modifiers: Union[Dict[str, Any], GeminiPlan],
+        rng: Optional[random.Random] = None
+    ):
         """
-        Applies the structured modifiers from Gemini.
+        Applies the structured modifiers from Gemini (a dict or the plan
+        from resolve_gemini_modifiers).
         """
         # Apply stochastic randomness if requested by prompt "apply stochastic randomness"
         # We can add small noise to the multipliers
+        if rng is None:
+            rng = self._rng
+        updates, risk_prob = resolve_gemini_modifiers(modifiers)
         
-        noise = lambda: random.uniform(0.95, 1.05) # +/- 5% noise
-        
-        if "burn_multiplier" in modifiers:
-            state.burn *= (float(modifiers["burn_multiplier"]) * noise())
+        # One +/- 5% noise draw per modifier present, in GEMINI_UPDATES order
+        for setter, getter, update, modifier in updates:
+            setter(state, update(getter(state), modifier, rng.uniform(0.95, 1.05)))
             
+        # Strategic penalty / risk could trigger a "shock" event
+        if risk_prob is not None:
+            if rng.random() < risk_prob * 0.1: # Small monthly chance if risk is high
+                # Shock event
+                state.revenue *= 0.8
+                state.traffic = int(state.traffic * 0.8)
+
+    def step_batch(
+        self,
+        batch: BusinessStateBatch,
+        rng: np.random.Generator,
+        action_modifiers: Union[Dict[str, Any], ActionPairs, None] = None,
+        gemini_modifiers: Union[Dict[str, Any], GeminiPlan, None] = None,
+        validate: bool = True,
+        first_order_noise: Optional[np.ndarray] = None
+    ) -> BusinessStateBatch:
+        """
+        Advances every path of a batch by one month (vectorized step).
+
+        Same pipeline as step, but on a BusinessStateBatch: the batch is
+        updated in place and all noise is drawn from rng, one value per path.
+
+        Args:
+            batch: Current BusinessStateBatch.
+            rng: NumPy Generator supplying the stochastic noise.
+            action_modifiers: Dict of changes to state variables (e.g. {'ad_spend': 50000}),
+                              or the pairs from resolve_action.
+            gemini_modifiers: Pre-calculated Gemini modifiers for 3rd order effects
+                              (dict, ThirdOrderModifiers model or GeminiPlan).
+            validate: Whether to validate and enforce constraints (HP-5). Default True.
+            first_order_noise: Optional pre-generated (num_runs, 3) noise for
+                               first-order effects; drawn from rng when omitted.
+        """
+        gemini_modifiers = _gemini_modifiers_dict(gemini_modifiers)
+        batch.month += 1
+
+        # Apply Action (update parameters on every path)
+        for k, v in resolve_action(batch, action_modifiers):
+            if k in BATCH_FIELDS:
+                getattr(batch, k).fill(v)
+            else:
+                setattr(batch, k, v)
+
+        # 1 + 2. First and Second Order, fused into one pass
+        if first_order_noise is None:
+            first_order_noise = sample_first_order_noise(rng, (batch.num_runs,))
+        batch = apply_first_and_second_order_effects_batch(batch, first_order_noise)
+
+        # 3. Third Order (Gemini)
+        if gemini_modifiers:
+            self._apply_gemini_modifiers_batch(batch, gemini_modifiers, rng)
+
+        # 4. Validate and enforce constraints (HP-5)
+        if validate:
+            batch, validation_result = validate_and_enforce_batch(batch, log_violations=True)
+            self.violations.extend(validation_result.violations)
+
+        return batch
+
+    def run_batch(
+        self,
+        states: List[BusinessState],
+        n_steps: int,
+        action_modifiers: Union[Dict[str, Any], ActionPairs, None] = None,
+        gemini_modifiers: Union[Dict[str, Any], GeminiPlan, None] = None,
+        validate: bool = True,
+        rng: Optional[np.random.Generator] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Advances several states together for n_steps months with step_batch,
+        one path per state, and records every month.
+
+        Args:
+            states: Starting states, all at the same month.
+            n_steps: Number of months to simulate.
+            action_modifiers: Applied every month, as in step_batch.
+            gemini_modifiers: Pre-calculated Gemini modifiers for 3rd order effects.
+            validate: Whether to validate and enforce constraints (HP-5). Default True.
+            rng: NumPy Generator for the noise; seeded from this simulator's
+                 own generator when omitted.
+
+        Returns:
+            Dict of field name -> (n_steps, len(states)) array, row m holding
+            the states after month m + 1.
+        """
+        if rng is None:
+            rng = np.random.default_rng(self._rng.getrandbits(64))
+        batch = BusinessStateBatch.from_states(states)
+        action = resolve_action(batch, action_modifiers)
+        gemini_modifiers = _gemini_modifiers_dict(gemini_modifiers)
+
+        # All first-order noise for the run in one draw (HP-4)
+        noise = sample_first_order_noise(rng, (n_steps, batch.num_runs))
+
+        history = {name: np.empty((n_steps, batch.num_runs)) for name in BATCH_FIELDS}
+        for month_idx in range(n_steps):
+            batch = self.step_batch(
+                batch, rng, action, gemini_modifiers, validate, first_order_noise=noise[month_idx]
+            )
+            for name in BATCH_FIELDS:
+                history[name][month_idx] = getattr(batch, name)
+
+        return history
+
+    def _apply_gemini_modifiers_batch(
+        self,
+        batch: BusinessStateBatch,
+        modifiers: Dict[str, Any],
+        rng: np.random.Generator
+    ):
+        """
+        Vectorized _apply_gemini_modifiers: independent ±5% noise and shock
+        draws per path. The noise for every present modifier comes from a
+        single (modifiers, paths) draw.
+        """
+        n = batch.num_runs
+        present = sum(key in modifiers for key, _, _ in GEMINI_UPDATES)
+        noise_rows = iter(rng.uniform(0.95, 1.05, (present, n))) # +/- 5% noise
+        noise = lambda: next(noise_rows)
+
+        if "burn_multiplier" in modifiers:
+            batch.burn = batch.burn * (float(modifiers["burn_multiplier"]) * noise())
+
         if "ARPU_shift" in modifiers:
-            state.arpu += (float(modifiers["ARPU_shift"]) * noise())
-            
+            batch.arpu = batch.arpu + (float(modifiers["ARPU_shift"]) * noise())
+
         if "CAC_drift" in modifiers:
-            state.cac *= (float(modifiers["CAC_drift"]) * noise())
-            
+            batch.cac = batch.cac * (float(modifiers["CAC_drift"]) * noise())
+
         if "demand_adjustments" in modifiers:
-            state.traffic = int(state.traffic * float(modifiers["demand_adjustments"]) * noise())
-            
-        # Strategic penalty / risk could trigger a "shock" event
+            batch.traffic = np.trunc(batch.traffic * float(modifiers["demand_adjustments"]) * noise())
+
+        # Strategic penalty / risk could trigger a "shock" event on some paths
         if "long_term_risk" in modifiers:
             risk_prob = float(modifiers["long_term_risk"])
-            if random.random() < risk_prob * 0.1: # Small monthly chance if risk is high
-                # Shock event
-                state.revenue *= 0.8
-                state.traffic = int(state.traffic * 0.8)
+            shock = rng.random(n) < risk_prob * 0.1 # Small monthly chance if risk is high
+            batch.revenue = np.where(shock, batch.revenue * 0.8, batch.revenue)
+            batch.traffic = np.where(shock, np.trunc(batch.traffic * 0.8), batch.traffic)
 
     def get_violations(self) -> List[ConstraintViolation]:
         """Returns all constraint violations recorded during simulation."""
@@ -0,0 +1,139 @@
+"""Tests for bet sizing priors and policy generation.
+
+Tests that:
+1. Batched prior sampling matches the configured distributions
+2. Seeded generators make batched sampling reproducible
+   (and antithetic / stratified sampling reduce variance, with one
+   stratified draw per stratum)
+3. Policies are generated once per Discretizer configuration
+"""
+
+import dataclasses
+import math
+import statistics
+
+import numpy as np
+import pytest
+
+from bet_sizing import (
+    Discretizer, PriorDistribution, StrategicGroup,
+    _inverse_normal_cdf, _stratified_standard_normal,
+)
+
+
+class TestSampleMultiplierBatch:
+    """Tests for PriorDistribution.sample_multiplier_batch."""
+
+    def test_log_normal_mean_matches_multiplier(self):
+        """Log-normal samples should average to mean_multiplier."""
+        dist = PriorDistribution("log-normal", 1.2, 0.20)
+        samples = dist.sample_multiplier_batch(200_000, np.random.default_rng(0))
+        assert samples.shape == (200_000,)
+        assert samples.dtype == np.float32
+        assert abs(samples.mean() - 1.2) < 0.01
+        assert (samples > 0).all()
+
+    def test_fat_tailed_has_black_swans(self):
+        """Fat-tailed samples carry boosted outliers above the log-normal mean."""
+        dist = PriorDistribution("fat-tailed", 1.4, 0.40)
+        samples = dist.sample_multiplier_batch(200_000, np.random.default_rng(0))
+        # 5% black swans boosted by 1.5-3.0x lift the mean by ~5.6%
+        assert 1.45 < samples.mean() < 1.5
+
+    def test_deterministic_returns_mean(self):
+        """Deterministic priors always return the mean multiplier."""
+        dist = PriorDistribution("deterministic", 0.9, 0.0)
+        samples = dist.sample_multiplier_batch(10)
+        np.testing.assert_allclose(samples, 0.9)
+
+    def test_seeded_rng_reproduces_samples(self):
+        """Same generator seed should produce identical samples."""
+        dist = PriorDistribution("fat-tailed", 0.40, 0.50)
+        first = dist.sample_multiplier_batch(100, np.random.default_rng(42))
+        second = dist.sample_multiplier_batch(100, np.random.default_rng(42))
+        np.testing.assert_array_equal(first, second)
+
+    def test_antithetic_pairs_mirror_each_other(self):
+        """Antithetic log-normal draws pair x with exp(2 * mu) / x."""
+        dist = PriorDistribution("log-normal", 1.0, 0.10)
+        samples = dist.sample_multiplier_batch(10, np.random.default_rng(0), antithetic=True)
+        mu = -(0.10 ** 2) / 2
+        np.testing.assert_allclose(samples[:5] * samples[5:], np.exp(2 * mu), rtol=1e-6)
+
+    def test_antithetic_reduces_variance_of_mean(self):
+        """Antithetic sampling should tighten the estimate of the mean."""
+        dist = PriorDistribution("log-normal", 1.2, 0.20)
+        rng = np.random.default_rng(1)
+        plain = [dist.sample_multiplier_batch(50, rng).mean() for _ in range(300)]
+        paired = [dist.sample_multiplier_batch(50, rng, antithetic=True).mean() for _ in range(300)]
+        assert np.var(paired) < np.var(plain) / 4
+
+    def test_stratified_reduces_variance_of_mean(self):
+        """One draw per stratum should tighten the estimate of the mean."""
+        dist = PriorDistribution("log-normal", 1.2, 0.20)
+        rng = np.random.default_rng(2)
+        plain = [dist.sample_multiplier_batch(50, rng).mean() for _ in range(300)]
+        strat = [dist.sample_multiplier_batch(50, rng, stratified=True).mean() for _ in range(300)]
+        assert np.var(strat) < np.var(plain) / 10
+
+    def test_stratified_normals_hit_every_stratum_once(self):
+        """Mapped back through the normal CDF, the draws fill each of the n strata once."""
+        n = 64
+        z = _stratified_standard_normal(np.random.default_rng(5), n).astype(np.float64)
+        cdf = statistics.NormalDist().cdf
+        strata = sorted(int(cdf(value) * n) for value in z)
+        assert strata == list(range(n))
+
+    def test_inverse_normal_cdf_matches_statistics(self):
+        """The vectorized inverse CDF agrees with NormalDist.inv_cdf, tails included."""
+        u = np.array([1e-12, 1e-4, 0.02, 0.0243, 0.3, 0.5, 0.77, 0.9757, 0.999, 1 - 1e-10])
+        expected = [statistics.NormalDist().inv_cdf(value) for value in u]
+        np.testing.assert_allclose(_inverse_normal_cdf(u), expected, rtol=1e-8)
+
+    def test_stratified_fat_tail_matches_mean(self):
+        """Stratified fat-tailed draws keep the black-swan-lifted mean."""
+        dist = PriorDistribution("fat-tailed", 1.4, 0.40)
+        samples = dist.sample_multiplier_batch(20_000, np.random.default_rng(0), stratified=True)
+        assert samples.dtype == np.float32
+        assert 1.45 < samples.mean() < 1.5
+
+
+class TestPriorDistribution:
+    """Tests for the precomputed log-normal parameters."""
+
+    def test_mu_is_precomputed(self):
+        """mu is derived once so E[X] equals mean_multiplier."""
+        dist = PriorDistribution("log-normal", 1.2, 0.20)
+        assert dist._mu == pytest.approx(math.log(1.2) - 0.20 ** 2 / 2)
+
+    def test_prior_is_immutable(self):
+        """Frozen priors cannot drift out of sync with their cached mu."""
+        dist = PriorDistribution("fat-tailed", 1.4, 0.40)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            dist.mean_multiplier = 2.0
+
+
+class TestDiscretizerPolicies:
+    """Tests for cached policy generation on Discretizer."""
+
+    def test_policies_are_built_once(self):
+        """Repeated calls reuse the same MonthlyPolicy objects."""
+        disc = Discretizer()
+        disc.add_variable("ad_spend", [StrategicGroup("Pause", 0, 0, "Stop")])
+        first = disc.generate_all_policies()
+        second = disc.generate_all_policies()
+        assert first is not second
+        assert all(a is b for a, b in zip(first, second))
+
+    def test_add_variable_invalidates_cache(self):
+        """Adding a variable extends the Cartesian product."""
+        disc = Discretizer()
+        disc.add_variable("ad_spend", [StrategicGroup("Pause", 0, 0, "Stop"),
+                                       StrategicGroup("Grow", 1, 1, "Scale")])
+        assert len(disc.generate_all_policies()) == 2
+        disc.add_variable("arpu", [StrategicGroup("Economy", 20, 20, "Mass"),
+                                   StrategicGroup("Elite", 120, 120, "Niche")])
+        policies = disc.generate_all_policies()
+        assert len(policies) == 4
+        assert policies[-1].name == "Grow + Elite"
+        assert policies[-1].description == "Scale + Niche"
@@ -0,0 +1,71 @@
+"""Tests for BusinessState and BusinessStateBatch.
+
+Tests that:
+1. clone, to_dict and to_row copy every field
+2. A batch broadcasts a state and extracts paths back out unchanged
+"""
+
+import dataclasses
+
+import pytest
+
+from business_state import BATCH_FIELDS, FIELD_INDEX, BusinessState, BusinessStateBatch
+
+
+@pytest.fixture
+def state():
+    """Create a standard business state."""
+    return BusinessState(
+        cac=100.0,
+        ltv=1000.0,
+        arpu=50.0,
+        burn=20000.0,
+        cash=500000.0,
+        revenue=50000.0,
+        customers=1000,
+        new_customers=40,
+        traffic=10000,
+        ad_spend=5000.0,
+        runway=25.0,
+        churn_rate=0.04,
+        churned_customers=12,
+        month=3,
+    )
+
+
+class TestBusinessState:
+    """Tests for the scalar state helpers."""
+
+    def test_clone_is_equal_and_independent(self, state):
+        """clone copies every field into a new object."""
+        copy = state.clone()
+        assert copy == state and copy is not state
+        copy.cash = 0.0
+        assert state.cash == 500000.0
+
+    def test_to_dict_round_trips(self, state):
+        """to_dict covers every dataclass field."""
+        assert state.to_dict() == dataclasses.asdict(state)
+        assert BusinessState.from_dict(state.to_dict()) == state
+
+    def test_to_row_follows_schema(self, state):
+        """to_row lays fields out at their FIELD_INDEX offsets."""
+        row = state.to_row()
+        assert row.shape == (len(BATCH_FIELDS),)
+        for name, index in FIELD_INDEX.items():
+            assert row[index] == getattr(state, name)
+
+    def test_state_is_slotted(self, state):
+        """Slotted states carry no per-instance __dict__."""
+        assert not hasattr(state, "__dict__")
+
+
+class TestBusinessStateBatch:
+    """Tests for the Struct-of-Arrays batch."""
+
+    def test_get_run_round_trips(self, state):
+        """Every path of a fresh batch is the original state."""
+        batch = BusinessStateBatch.from_state(state, num_runs=3)
+        assert batch.num_runs == 3
+        assert batch.get_run(2) == state
+        assert isinstance(batch.get_run(0).customers, int)
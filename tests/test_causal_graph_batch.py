@@ -0,0 +1,258 @@
+"""Tests for the vectorized (Struct-of-Arrays) causal graph simulation.
+
+Tests that:
+1. A batch of identical paths reproduces the scalar propagation exactly
+2. run_batch_simulation returns per-month arrays for every path
+3. Seeded batch runs are reproducible and paths have variance
+4. The codegen-specialized kernels match the generic scalar and batch propagation
+5. The final-state-only scalar driver matches the full trajectory
+"""
+
+import copy
+import dataclasses
+import random
+
+import numpy as np
+
+from causal_graph_prototype import (
+    BATCH_FIELDS,
+    BusinessState,
+    BusinessStateBatch,
+    LaggedEffectRing,
+    build_prototype_graph,
+    calculate_basic_financials,
+    calculate_basic_financials_batch,
+    compile_specialized_kernel,
+    compile_specialized_scalar_kernel,
+    propagate_effects,
+    propagate_effects_batch,
+    run_batch_simulation,
+    run_single_simulation,
+    run_single_simulation_final_state,
+)
+
+
+def create_initial_state() -> BusinessState:
+    """Create the standard prototype initial state."""
+    return BusinessState(
+        cash=500000,
+        customers=1000,
+        ad_spend=0,
+        cac=100,
+        arpu=50,
+        burn=20000,
+        churn_rate=0.05,
+    )
+
+
+class TestBatchMatchesScalar:
+    """The batched kernels must agree with the scalar reference implementation."""
+
+    def test_fixed_decisions_match_scalar_path(self):
+        """Same ad_spend schedule gives the same state for scalar and batch paths."""
+        graph = build_prototype_graph()
+        compiled = graph.compile(BATCH_FIELDS)
+        state = create_initial_state()
+        batch = BusinessStateBatch.from_state(copy.deepcopy(state), num_runs=3)
+        scalar_queue, pending = [], LaggedEffectRing(compiled.max_lag)
+
+        for month, ad_spend in enumerate([60000, 90000, 20000, 75000, 0, 55000]):
+            state.month = batch.month = month
+            state.ad_spend = ad_spend
+            batch.ad_spend = np.full(batch.num_runs, float(ad_spend))
+
+            state, scalar_queue, _ = propagate_effects(state, graph, scalar_queue)
+            state = calculate_basic_financials(state)
+            batch, pending = propagate_effects_batch(batch, compiled, pending)
+            batch = calculate_basic_financials_batch(batch)
+
+            assert len(pending) == len(scalar_queue)
+            for name in BATCH_FIELDS:
+                np.testing.assert_allclose(
+                    getattr(batch, name), getattr(state, name), rtol=1e-5,
+                    err_msg=f"{name} diverged at month {month}"
+                )
+
+
+class TestStateSerialization:
+    """Tests for the hand-written BusinessState.to_dict."""
+
+    def test_to_dict_covers_every_field(self):
+        """to_dict stays in sync with the dataclass fields and round-trips."""
+        state = create_initial_state()
+        state.market_saturation = 0.4
+        assert state.to_dict() == dataclasses.asdict(state)
+        assert BusinessState(**state.to_dict()) == state
+
+
+    def test_clone_is_an_equal_independent_copy(self):
+        """clone copies every slot, and the copy can be mutated on its own."""
+        state = create_initial_state()
+        state.rapid_growth = 0.25
+        copy_ = state.clone()
+        assert copy_ == state
+        copy_.cash = 0
+        assert state.cash == 500000
+        assert not hasattr(state, "__dict__")
+
+
+class TestCompiledGraph:
+    """Tests for CausalGraph.compile."""
+
+    def test_compile_resolves_field_offsets(self):
+        """Edges compile to integer offsets, op codes and -inf-for-None thresholds."""
+        graph = build_prototype_graph()
+        compiled = graph.compile(BATCH_FIELDS)
+        assert compiled.num_edges == len(graph.edges)
+        first = graph.edges[0]
+        assert BATCH_FIELDS[compiled.source_idx[0]] == first.source
+        assert BATCH_FIELDS[compiled.target_idx[0]] == first.target
+        for edge, threshold in zip(graph.edges, compiled.threshold):
+            if edge.threshold is None:
+                assert threshold == -np.inf
+            else:
+                assert threshold == edge.threshold
+
+
+class TestSpecializedKernel:
+    """Tests for compile_specialized_kernel."""
+
+    def test_kernel_matches_generic_propagation(self):
+        """The unrolled kernel produces the same batch and pending effects."""
+        graph = build_prototype_graph()
+        compiled = graph.compile(BATCH_FIELDS)
+        kernel = compile_specialized_kernel(graph)
+        generic = BusinessStateBatch.from_state(create_initial_state(), num_runs=4)
+        special = BusinessStateBatch.from_state(create_initial_state(), num_runs=4)
+        generic_pending = LaggedEffectRing(compiled.max_lag)
+        special_pending = LaggedEffectRing(compiled.max_lag)
+        rng = np.random.default_rng(0)
+
+        for month in range(8):
+            generic.month = special.month = month
+            generic.ad_spend = special.ad_spend = rng.uniform(0, 100000, 4)
+            propagate_effects_batch(generic, compiled, generic_pending)
+            kernel(special, special_pending)
+            calculate_basic_financials_batch(generic)
+            calculate_basic_financials_batch(special)
+
+            assert len(special_pending) == len(generic_pending)
+            np.testing.assert_array_equal(special.data, generic.data)
+
+    def test_scalar_kernel_matches_propagate_effects(self):
+        """The unrolled scalar kernel yields the same state and lagged queue."""
+        graph = build_prototype_graph()
+        kernel = compile_specialized_scalar_kernel(graph)
+        generic, special = create_initial_state(), create_initial_state()
+        generic_queue, special_queue = [], []
+        rng = np.random.default_rng(1)
+
+        for month in range(10):
+            generic.month = special.month = month
+            generic.ad_spend = special.ad_spend = float(rng.uniform(0, 100000))
+            generic, generic_queue, _ = propagate_effects(generic, graph, generic_queue)
+            special, special_queue = kernel(special, special_queue)
+            calculate_basic_financials(generic)
+            calculate_basic_financials(special)
+
+            assert special == generic
+            assert special_queue == generic_queue
+
+    def test_fused_kernel_matches_kernel_then_financials(self):
+        """with_financials folds calculate_basic_financials into the kernel."""
+        graph = build_prototype_graph()
+        kernel = compile_specialized_scalar_kernel(graph)
+        fused = compile_specialized_scalar_kernel(graph, with_financials=True)
+        separate, together = create_initial_state(), create_initial_state()
+        separate_queue, together_queue = [], []
+
+        for month in range(10):
+            separate.month = together.month = month
+            separate.ad_spend = together.ad_spend = 20000.0 * month
+            separate, separate_queue = kernel(separate, separate_queue)
+            calculate_basic_financials(separate)
+            together, together_queue = fused(together, together_queue)
+
+            assert together == separate
+            assert together_queue == separate_queue
+
+    def test_kernel_is_cached_per_graph(self):
+        """Compiling the same edge set twice returns the same function."""
+        graph = build_prototype_graph()
+        assert compile_specialized_kernel(graph) is compile_specialized_kernel(graph)
+        assert compile_specialized_scalar_kernel(graph) is compile_specialized_scalar_kernel(graph)
+
+
+class TestRunSingleSimulation:
+    """Tests for the scalar run_single_simulation driver."""
+
+    def test_final_only_matches_trajectory(self):
+        """run_single_simulation_final_state returns the trajectory's final state."""
+        graph = build_prototype_graph()
+        random.seed(4)
+        trajectory = run_single_simulation(create_initial_state(), graph, 12)
+        random.seed(4)
+        final = run_single_simulation_final_state(create_initial_state(), graph, 12)
+
+        assert final.to_dict() == trajectory[-1]['state']
+
+
+class TestRunBatchSimulation:
+    """Tests for run_batch_simulation."""
+
+    def test_history_shape(self):
+        """Every field is recorded per month for every path."""
+        history = run_batch_simulation(
+            create_initial_state(), build_prototype_graph(), months=6, num_runs=50, seed=1
+        )
+        assert set(history) == set(BATCH_FIELDS)
+        for values in history.values():
+            assert values.shape == (6, 50)
+
+    def test_same_seed_reproduces_results(self):
+        """Same seed should produce identical batches."""
+        graph = build_prototype_graph()
+        first = run_batch_simulation(create_initial_state(), graph, 6, 20, seed=42)
+        second = run_batch_simulation(create_initial_state(), graph, 6, 20, seed=42)
+        np.testing.assert_array_equal(first["cash"], second["cash"])
+
+    def test_paths_have_variance(self):
+        """Random decisions should spread the final cash across paths."""
+        history = run_batch_simulation(
+            create_initial_state(), build_prototype_graph(), months=6, num_runs=20, seed=7
+        )
+        assert np.unique(history["cash"][-1]).size > 1
+
+    def test_customers_never_negative(self):
+        """Churn is clamped so no path ends with negative customers."""
+        history = run_batch_simulation(
+            create_initial_state(), build_prototype_graph(), months=12, num_runs=100, seed=3
+        )
+        assert (history["customers"] >= 0).all()
+
+    def test_antithetic_decisions_are_paired(self):
+        """Antithetic ad_spend decisions mirror around the midpoint."""
+        history = run_batch_simulation(
+            create_initial_state(), build_prototype_graph(), months=3, num_runs=10, seed=5
+        )
+        np.testing.assert_allclose(
+            history["ad_spend"][:, :5] + history["ad_spend"][:, 5:], 100000
+        )
+
+    def test_sharded_workers_cover_all_paths(self):
+        """Sharding across workers keeps every path and stays reproducible."""
+        graph = build_prototype_graph()
+        first = run_batch_simulation(create_initial_state(), graph, 6, 101, seed=9, workers=4)
+        second = run_batch_simulation(create_initial_state(), graph, 6, 101, seed=9, workers=4)
+        assert first["cash"].shape == (6, 101)
+        np.testing.assert_array_equal(first["cash"], second["cash"])
+
+    def test_stratified_decisions_cover_every_stratum(self):
+        """Stratified ad_spend puts one path in each equal slice every month."""
+        history = run_batch_simulation(
+            create_initial_state(), build_prototype_graph(), months=4, num_runs=20,
+            seed=11, stratified=True
+        )
+        strata = np.floor(history["ad_spend"] / 100000 * 20)
+        for month_strata in strata:
+            np.testing.assert_array_equal(np.sort(month_strata), np.arange(20))
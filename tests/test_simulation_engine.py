@@ -0,0 +1,336 @@
+"""Tests for the MCTS simulation environment.
+
+Tests that:
+1. Rollouts play out to a terminal state without mutating their input
+2. Rollouts replay exactly under the same random seed, and the opt-in
+   successor cache reuses a step's first sample
+3. Root-parallel MCTS merges worker trees into one legal move, building
+   worker engines with the parent's constructor arguments
+4. Vectorized UCB1 selection agrees with the scalar formula
+5. The transposition table reuses rollouts for repeated states
+6. Batched leaf rollouts agree with the scalar playout, drawing every
+   bet of the rollout up front
+7. Tree-parallel rounds use virtual loss and per-leaf horizons
+"""
+
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import mcts
+from bet_sizing import PolicyTable
+from mcts import TT_MIN_SAMPLES, MCTSEngine, MCTSNode, state_hash
+from causal_graph_prototype import BusinessStateBatch
+from simulation_engine import SimulationEngine
+
+
+class TestRollout:
+    """Tests for SimulationEngine.rollout."""
+
+    def test_rollout_leaves_input_untouched(self):
+        """The in-place playout works on a private clone of the state."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        state, effects = sim.step(state, effects, sim.get_legal_moves()[-1])
+        before = state.to_dict()
+        pending = list(effects)
+
+        score, survived = sim.rollout(state, effects)
+
+        assert isinstance(score, (int, float))
+        assert isinstance(survived, bool)
+        assert state.to_dict() == before
+        assert effects == pending
+
+    def test_legal_moves_are_cached(self):
+        """Each call returns a fresh list over the same cached policies."""
+        sim = SimulationEngine()
+        first, second = sim.get_legal_moves(), sim.get_legal_moves()
+        assert first is not second
+        first.pop()
+        assert len(second) == len(sim.legal_moves)
+        assert all(a is b for a, b in zip(second, sim.legal_moves))
+
+    def test_rollout_is_reproducible(self):
+        """Same seed gives the same playout."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        random.seed(7)
+        first = sim.rollout(state, effects)
+        random.seed(7)
+        second = sim.rollout(state, effects)
+        assert first == second
+
+    def test_step_from_terminal_state_is_a_no_op(self):
+        """A bankrupt state is absorbing: step returns a copy and draws nothing."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        state.cash = -1.0
+        random.seed(9)
+        expected = random.random()
+        random.seed(9)
+
+        new_state, new_effects = sim.step(state, effects, sim.legal_moves[0])
+
+        assert new_state == state and new_state is not state
+        assert new_effects == effects
+        assert random.random() == expected
+
+    def test_successor_cache_reuses_first_sample(self):
+        """With successor_cache, a repeated (state, policy) step is a cache hit."""
+        sim = SimulationEngine(successor_cache=64)
+        state, effects = sim.get_initial_state()
+        move = sim.legal_moves[-1]
+        first_state, first_effects = sim.step(state, effects, move)
+        second_state, second_effects = sim.step(state, effects, move)
+
+        assert second_state == first_state and second_effects == first_effects
+        assert second_state is not first_state
+        second_state.cash = 0.0
+        assert sim.step(state, effects, move)[0] == first_state
+
+
+class TestParallelSearch:
+    """Tests for root-parallel MCTSEngine.run_search."""
+
+    def test_parallel_search_returns_legal_move(self):
+        """Merged worker statistics pick a legal move and a valid probability."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        random.seed(1)
+        move, survival = MCTSEngine(sim).run_search(state, effects, iterations=60, workers=2)
+        assert move.name in {m.name for m in sim.get_legal_moves()}
+        assert 0.0 <= survival <= 1.0
+
+    def test_parallel_search_is_reproducible(self):
+        """Worker seeds derive from random, so a seeded caller replays."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        results = []
+        for _ in range(2):
+            random.seed(5)
+            move, survival = MCTSEngine(sim).run_search(state, effects, iterations=60, workers=2)
+            results.append((move.name, survival))
+        assert results[0] == results[1]
+
+    def test_workers_keep_the_successor_cache(self, monkeypatch):
+        """Worker engines are built with the parent engine's successor_cache."""
+        sizes = []
+        search_worker = mcts._search_worker
+
+        def recording_worker(engine_factory, *args):
+            sizes.append(engine_factory().successor_cache)
+            return search_worker(engine_factory, *args)
+
+        monkeypatch.setattr(mcts, "ProcessPoolExecutor", ThreadPoolExecutor)
+        monkeypatch.setattr(mcts, "_search_worker", recording_worker)
+        sim = SimulationEngine(successor_cache=64)
+        state, effects = sim.get_initial_state()
+        random.seed(2)
+        MCTSEngine(sim).run_search(state, effects, iterations=20, workers=2)
+        assert sizes == [64, 64]
+
+
+class TestBestChild:
+    """Tests for the array-backed MCTSNode.best_child."""
+
+    def test_best_child_matches_ucb1(self):
+        """The argmax over child arrays is the scalar UCB1 maximum."""
+        root = MCTSNode(None, [])
+        for visits, value in [(3, 6.0), (1, 1.0), (5, 15.0), (2, 0.5)]:
+            child = MCTSNode(None, [], parent=root)
+            root.add_child(child)
+            for _ in range(visits):
+                child.record(value / visits, survived=True)
+                root.record(value / visits, survived=True)
+
+        def ucb1(child):
+            return child.value / child.visits + 1.414 * math.sqrt(math.log(root.visits) / child.visits)
+
+        assert root.best_child() is max(root.children, key=ucb1)
+        assert root._child_visits.tolist() == [3, 1, 5, 2]
+
+    def test_scalar_and_vector_paths_agree(self, monkeypatch):
+        """The small-fan-out scalar loop picks the same child as NumPy."""
+        root = MCTSNode(None, [])
+        for visits, value in [(3, 6.0), (1, 1.0), (5, 15.0), (2, 0.5)]:
+            child = MCTSNode(None, [], parent=root)
+            root.add_child(child)
+            for _ in range(visits):
+                child.record(value / visits, survived=True)
+                root.record(value / visits, survived=True)
+
+        scalar = root.best_child()
+        monkeypatch.setattr("mcts.VECTORIZED_UCB_MIN_CHILDREN", 0)
+        assert root.best_child() is scalar
+
+
+class TestTranspositionTable:
+    """Tests for the opt-in MCTSEngine transposition table."""
+
+    def test_cached_mean_replaces_rollouts(self, monkeypatch):
+        """After TT_MIN_SAMPLES playouts a state returns the cached mean score."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        scores = iter([10.0, 20.0, 30.0, 40.0])
+        calls = []
+
+        def fake_rollout(*args):
+            calls.append(args)
+            return next(scores), True
+
+        monkeypatch.setattr(sim, "rollout", fake_rollout)
+        engine = MCTSEngine(sim, tt_capacity=64)
+        node = MCTSNode(state, effects)
+
+        results = [engine._simulate(node) for _ in range(TT_MIN_SAMPLES + 2)]
+
+        assert len(calls) == TT_MIN_SAMPLES
+        assert results[-1] == (25.0, True)
+
+    def test_shallower_state_keeps_slot(self):
+        """On a slot collision the deeper state does not evict the shallower one."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        engine = MCTSEngine(sim, tt_capacity=1)
+        deeper, deeper_effects = sim.step(state, effects, sim.get_legal_moves()[0])
+
+        engine._simulate(MCTSNode(state, effects))
+        engine._simulate(MCTSNode(deeper, deeper_effects))
+
+        assert engine._tt[0][0] == state_hash(state)
+
+
+class TestRolloutBatch:
+    """Tests for SimulationEngine.rollout_batch and leaf-parallel MCTS."""
+
+    def test_batch_matches_scalar_distribution(self):
+        """Mean batched score agrees with the scalar rollout mean."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        state, effects = sim.step(state, effects, sim.get_legal_moves()[-1])
+        random.seed(3)
+        scalar = np.array([sim.rollout(state, effects)[0] for _ in range(3000)])
+
+        scores, survived = sim.rollout_batch(state, effects, 3000, np.random.default_rng(3))
+
+        assert scores.shape == survived.shape == (3000,)
+        assert abs(scores.mean() - scalar.mean()) < 4 * scalar.std() / math.sqrt(1500)
+
+    def test_bankrupt_leaf_scores_bankruptcy(self):
+        """A leaf that is already bankrupt is terminal for every path."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        state.cash = -1.0
+        scores, survived = sim.rollout_batch(state, effects, 8, np.random.default_rng(0))
+        np.testing.assert_array_equal(scores, -1000.0)
+        assert not survived.any()
+
+    def test_evaluate_matches_evaluate_batch(self):
+        """Scalar and batched scoring agree on penalties and bankruptcy."""
+        sim = SimulationEngine()
+        states = []
+        for cash, saturation, degradation in [(5e5, 0.0, 0.0), (5e5, 0.9, 0.0), (2e5, 0.9, 0.5), (-1.0, 0.9, 0.5)]:
+            state, _ = sim.get_initial_state()
+            state.cash, state.market_saturation, state.cultural_degradation = cash, saturation, degradation
+            states.append(state)
+        batch = BusinessStateBatch.from_states(states)
+        expected = [sim.evaluate(state) for state in states]
+        np.testing.assert_allclose(sim.evaluate_batch(batch), expected, rtol=1e-6)
+        assert expected[-1] == -1000
+
+    def test_rollout_many_plays_the_plan(self):
+        """A full-horizon plan scores like stepping it path by path."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        plan = [sim.legal_moves[3], sim.legal_moves[17]] * (sim.max_months // 2)
+        random.seed(6)
+        scalar = []
+        for _ in range(2000):
+            current, pending = state, effects
+            for move in plan:
+                current, pending = sim.step(current, pending, move)
+            scalar.append(sim.evaluate(current))
+        scalar = np.array(scalar)
+
+        scores, survived = sim.rollout_many(state, plan, 2000, seed=6)
+
+        assert scores.shape == survived.shape == (2000,)
+        np.testing.assert_array_equal(scores, sim.rollout_many(state, plan, 2000, seed=6)[0])
+        assert abs(scores.mean() - scalar.mean()) < 4 * scalar.std() / math.sqrt(1000)
+
+    def test_leaf_batch_search_returns_legal_move(self):
+        """Leaf-parallel search records fractional survival per visit."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        random.seed(2)
+        move, survival = MCTSEngine(sim, leaf_batch=16).run_search(state, effects, iterations=40)
+        assert move.name in {m.name for m in sim.get_legal_moves()}
+        assert 0.0 <= survival <= 1.0
+
+    def test_policy_table_samples_each_move(self):
+        """Pre-drawn bets stay in each move's range and match the prior means."""
+        sim = SimulationEngine()
+        table = PolicyTable(sim.legal_moves)
+        choice = np.repeat(np.arange(len(sim.legal_moves)), 4000)
+        values, multipliers = table.sample(np.random.default_rng(0), choice)
+
+        assert values.shape == (len(table.variables), choice.size)
+        for m, move in enumerate(sim.legal_moves):
+            paths = choice == m
+            for v, var_name in enumerate(table.variables):
+                group = move.decisions[var_name]
+                assert group.min_value <= values[v, paths].min() <= values[v, paths].max() <= group.max_value
+            priors = [p for g in move.decisions.values() for p in g.priors]
+            slots = np.flatnonzero(table.prior_target[:, m] >= 0)
+            assert [table.prior_targets[table.prior_target[s, m]] for s in slots] == [
+                p.target_variable for p in priors
+            ]
+            for slot, prior in zip(slots, priors):
+                if prior.distribution.dist_type == "log-normal":
+                    mean = prior.distribution.mean_multiplier
+                    assert abs(multipliers[slot, paths].mean() - mean) < 0.05 * mean
+
+
+class TestTreeParallelSearch:
+    """Tests for virtual loss and SimulationEngine.rollout_leaves."""
+
+    def test_virtual_loss_round_trips(self):
+        """A reverted virtual loss leaves node and parent stats untouched."""
+        root = MCTSNode(None, [])
+        child = MCTSNode(None, [], parent=root)
+        root.add_child(child)
+        child.record(4.0, survived=True)
+        root.record(4.0, survived=True)
+
+        child.add_virtual_loss()
+        assert child.visits == 2 and root._child_visits[0] == 2
+        assert root._child_values[0] == 4.0
+        child.revert_virtual_loss()
+        assert child.visits == 1 and root._child_visits[0] == 1
+
+    def test_terminal_leaf_keeps_its_score(self):
+        """A leaf at the horizon is evaluated as is; others are played out."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        done = state.clone()
+        done.month = sim.max_months
+        scores, survived = sim.rollout_leaves(
+            [state, done], [effects, []], np.random.default_rng(0)
+        )
+        assert scores.shape == (2,)
+        assert math.isclose(scores[1], sim.evaluate(done), rel_tol=1e-5)
+        assert scores[0] != scores[1]
+        assert survived.all()
+
+    def test_tree_batch_search_returns_legal_move(self):
+        """Batched rounds still visit every iteration once."""
+        sim = SimulationEngine()
+        state, effects = sim.get_initial_state()
+        random.seed(4)
+        engine = MCTSEngine(sim, tree_batch=8)
+        root = engine._build_tree(state, effects, iterations=50)
+        assert root.visits == 50
+        assert sum(child.visits for child in root.children) == 50
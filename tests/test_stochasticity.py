@@ -4,12 +4,41 @@ Tests that Monte Carlo simulations have proper variance and reproducibility:
 1. Multiple runs without seed produce different results
 2. Same seed produces identical results
 3. Different seeds produce different results
+4. Batched results have one row per month and one column per path
+   (also when sharded across workers); a zero-month run reports the
+   initial cash
+5. Pre-generated first-order noise stays within the HP-4 ranges
+6. The fused first + second order batch kernel matches the separate passes
+7. Single-path runs record a cash vector, with full traces only on request,
+   and seeded simulators replay their steps
+8. run_monte_carlo_many matches run_monte_carlo for every proposal
+9. Batched third-order effects apply each state's own modifiers, in order,
+   and neighbouring states share a cached response keyed on every prompted
+   field; the cache is bounded LRU; the vectorized modifier pass matches
+   the scalar one per path
 """
 
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pytest
-from business_state import BusinessState
-from monte_carlo import run_all_simulations
-from utils.schemas import ThirdOrderModifiers
+from pydantic import ValidationError
+import monte_carlo
+import third_order_gemini
+from business_state import BusinessState, BusinessStateBatch, BATCH_FIELDS, CASH_IDX
+from first_order import apply_first_order_effects_batch, sample_first_order_noise
+from second_order import apply_second_order_effects_batch
+from simulator import BusinessSimulator, apply_first_and_second_order_effects_batch
+from monte_carlo import (
+    run_all_simulations,
+    run_single_simulation,
+    compute_final_statistics,
+    compute_cash_time_series,
+    history_to_traces,
+)
+from utils.schemas import ThirdOrderModifiers, StrategicAnalysis
 
 
 @pytest.fixture
@@ -62,8 +91,8 @@ class TestStochasticVariance:
             test_state, action, neutral_modifiers, months=6, num_runs=3
         )
 
-        cash1 = [r["final_cash"] for r in results1]
-        cash2 = [r["final_cash"] for r in results2]
+        cash1 = results1["cash"][-1].tolist()
+        cash2 = results2["cash"][-1].tolist()
 
         # At least one value should differ between runs
         assert cash1 != cash2, "Unseeded runs should produce different results"
@@ -77,8 +106,8 @@ class TestStochasticVariance:
             test_state, action, neutral_modifiers, months=6, num_runs=3, base_seed=42
         )
 
-        cash1 = [r["final_cash"] for r in results1]
-        cash2 = [r["final_cash"] for r in results2]
+        cash1 = results1["cash"][-1].tolist()
+        cash2 = results2["cash"][-1].tolist()
 
         assert cash1 == cash2, "Same seed should produce identical results"
 
@@ -91,8 +120,8 @@ class TestStochasticVariance:
             test_state, action, neutral_modifiers, months=6, num_runs=3, base_seed=99
         )
 
-        cash1 = [r["final_cash"] for r in results1]
-        cash2 = [r["final_cash"] for r in results2]
+        cash1 = results1["cash"][-1].tolist()
+        cash2 = results2["cash"][-1].tolist()
 
         assert cash1 != cash2, "Different seeds should produce different results"
 
@@ -102,8 +131,262 @@ class TestStochasticVariance:
             test_state, action, neutral_modifiers, months=6, num_runs=5, base_seed=42
         )
 
-        cash_values = [r["final_cash"] for r in results]
+        cash_values = results["cash"][-1].tolist()
         unique_values = set(cash_values)
 
         # With 5 runs, we should have multiple unique values
         assert len(unique_values) > 1, "Runs within simulation should have variance"
+
+
+class TestBatchedHistory:
+    """Test the array layout returned by run_all_simulations."""
+
+    def test_history_shape(self, test_state, neutral_modifiers, action):
+        """Every field is recorded as a (months, num_runs) array."""
+        history = run_all_simulations(
+            test_state, action, neutral_modifiers, months=6, num_runs=4, base_seed=1
+        )
+        assert set(history) == set(BATCH_FIELDS)
+        for values in history.values():
+            assert values.shape == (6, 4)
+
+    def test_sharded_workers_cover_all_paths(self, test_state, neutral_modifiers, action):
+        """Sharding across workers keeps every path and stays reproducible."""
+        first = run_all_simulations(test_state, action, neutral_modifiers, 4, 101, base_seed=9, workers=4)
+        second = run_all_simulations(test_state, action, neutral_modifiers, 4, 101, base_seed=9, workers=4)
+        assert first["cash"].shape == (4, 101)
+        np.testing.assert_array_equal(first["cash"], second["cash"])
+
+    def test_statistics_from_history(self, test_state, neutral_modifiers, action):
+        """Percentiles and survival are computed straight from the arrays."""
+        history = run_all_simulations(
+            test_state, action, neutral_modifiers, months=6, num_runs=20, base_seed=1
+        )
+        stats = compute_final_statistics(history)
+        assert stats["p10"] <= stats["p50"] <= stats["p90"]
+        assert 0.0 <= stats["survival_probability"] <= 1.0
+
+        series = compute_cash_time_series(history, 6)
+        assert [point["month"] for point in series] == [1, 2, 3, 4, 5, 6]
+        assert series[-1]["p50"] == stats["p50"]
+
+    def test_zero_months_keeps_initial_cash(self, test_state):
+        """With no months simulated every path ends at the initial cash."""
+        history = run_all_simulations(test_state, {}, {}, 0, 5, base_seed=1)
+        assert history["cash"].shape == (0, 5)
+
+        stats = compute_final_statistics(history, test_state.cash)
+        assert stats == {
+            "p10": test_state.cash, "p50": test_state.cash, "p90": test_state.cash,
+            "survival_probability": 1.0,
+        }
+        assert compute_cash_time_series(history, 0) == []
+        with pytest.raises(ValueError):
+            compute_final_statistics(history)
+
+    def test_traces_match_history(self, test_state, neutral_modifiers, action):
+        """Per-run traces carry the same values, with counts as ints."""
+        history = run_all_simulations(
+            test_state, action, neutral_modifiers, months=3, num_runs=2, base_seed=1
+        )
+        traces = history_to_traces(history, test_state.month)
+        assert len(traces) == 2 and len(traces[0]) == 3
+        assert traces[1][2]["cash"] == history["cash"][2, 1]
+        assert isinstance(traces[0][0]["customers"], int)
+        assert traces[0][2]["month"] == 3
+
+
+class TestFirstOrderNoise:
+    """Test the batched first-order noise draw (HP-4)."""
+
+    def test_noise_shape_and_ranges(self):
+        """One (acquisition, churn, revenue) triple per month and path."""
+        noise = sample_first_order_noise(np.random.default_rng(0), (12, 500))
+        assert noise.shape == (12, 500, 3)
+        low, high = noise.min(axis=(0, 1)), noise.max(axis=(0, 1))
+        assert (low >= [0.90, 0.85, 0.95]).all()
+        assert (high <= [1.10, 1.15, 1.05]).all()
+
+
+class TestFusedEffects:
+    """Test the fused first + second order batch kernel."""
+
+    @pytest.mark.parametrize("ad_spend", [0, 20000, 75000])
+    def test_fused_matches_separate_passes(self, test_state, ad_spend):
+        """Every field is bit-identical to running the two passes in turn."""
+        test_state.ad_spend = ad_spend
+        noise = sample_first_order_noise(np.random.default_rng(0), (8,))
+        separate = BusinessStateBatch.from_state(test_state, 8)
+        fused = BusinessStateBatch.from_state(test_state, 8)
+
+        apply_second_order_effects_batch(apply_first_order_effects_batch(separate, noise))
+        apply_first_and_second_order_effects_batch(fused, noise)
+
+        for name in BATCH_FIELDS:
+            np.testing.assert_array_equal(getattr(fused, name), getattr(separate, name), err_msg=name)
+
+
+class TestSingleSimulation:
+    """Test the scalar reference path."""
+
+    def test_cash_trace_replaces_dict_trace(self, test_state, neutral_modifiers, action):
+        """Only the cash vector is kept unless the full trace is requested."""
+        sim = BusinessSimulator()
+        result = run_single_simulation(test_state, action, neutral_modifiers, 6, sim, run_seed=3)
+        assert result["cash_trace"].shape == (6,)
+        assert result["cash_trace"][-1] == result["final_cash"]
+        assert "trace" not in result
+
+        full = run_single_simulation(
+            test_state, action, neutral_modifiers, 6, sim, run_seed=3, return_full_trace=True
+        )
+        assert full["trace"].shape == (6, len(BATCH_FIELDS))
+        np.testing.assert_array_equal(full["trace"][:, CASH_IDX], result["cash_trace"])
+
+    def test_seeded_run_leaves_global_random_alone(self, test_state, neutral_modifiers, action):
+        """Seeded runs draw from a private random.Random, not the module state."""
+        random.seed(11)
+        expected = random.random()
+        random.seed(11)
+        run_single_simulation(test_state, action, neutral_modifiers, 3, BusinessSimulator(), run_seed=1)
+        assert random.random() == expected
+
+    def test_seeded_simulator_reproduces_steps(self, test_state, neutral_modifiers, action):
+        """A simulator's own generator replays its steps under the same seed."""
+        modifiers = neutral_modifiers.model_dump()
+        first = BusinessSimulator(seed=8).step(test_state, action, modifiers)
+        second = BusinessSimulator(seed=8).step(test_state, action, modifiers)
+        assert first == second
+
+
+class TestRunMonteCarloMany:
+    """Test the batched multi-proposal entry point."""
+
+    def test_matches_sequential_runs(self, monkeypatch, test_state, neutral_modifiers):
+        """Each proposal gets the same result as a standalone run_monte_carlo."""
+        analysis = StrategicAnalysis(recommendations=["hold"], risks=[], opportunities=[])
+        monkeypatch.setattr(monte_carlo, "fetch_third_order_modifiers", lambda *args: neutral_modifiers)
+        monkeypatch.setattr(monte_carlo, "fetch_strategic_analysis", lambda *args: analysis)
+        actions = [{"ad_spend": 25000}, {"ad_spend": 0, "burn": 40000}]
+
+        with ThreadPoolExecutor() as executor:
+            batched = asyncio.run(monte_carlo.run_monte_carlo_many(
+                test_state, actions, months=4, num_runs=8, seed=5, executor=executor
+            ))
+
+        assert len(batched) == len(actions)
+        for action, result in zip(actions, batched):
+            expected = monte_carlo.run_monte_carlo(test_state, action, months=4, num_runs=8, seed=5)
+            assert result == expected
+
+
+class TestThirdOrderBatch:
+    """Test the concurrent third-order effects entry point."""
+
+    def test_batch_applies_each_states_modifiers(self, monkeypatch, test_state, neutral_modifiers):
+        """Every state gets the response to its own prompt, as in the sequential path."""
+        async def fake_call(prompt, schema):
+            await asyncio.sleep(0)
+            shift = 5.0 if "'burn': 50000," in prompt else -5.0
+            return neutral_modifiers.model_copy(update={"ARPU_shift": shift})
+
+        monkeypatch.setattr(third_order_gemini, "call_gemini_with_schema_async", fake_call)
+        third_order_gemini.clear_third_order_cache()
+        other = test_state.clone()
+        other.burn = 60000
+
+        states = third_order_gemini.apply_third_order_effects_gemini_many([test_state, other])
+
+        assert states[0] is test_state and states[1] is other
+        assert [state.arpu for state in states] == [105.0, 95.0]
+
+    def test_neighbouring_states_share_a_response(self, monkeypatch, test_state, neutral_modifiers):
+        """States with the same rounded signature cost a single Gemini call."""
+        prompts = []
+
+        def fake_call(prompt, schema):
+            prompts.append(prompt)
+            return neutral_modifiers
+
+        monkeypatch.setattr(third_order_gemini, "call_gemini_with_schema", fake_call)
+        third_order_gemini.clear_third_order_cache()
+        near = test_state.clone()
+        near.burn += 10
+        far = test_state.clone()
+        far.burn += 1000
+
+        for state in (test_state, near, far):
+            third_order_gemini.apply_third_order_effects_gemini(state)
+
+        assert len(prompts) == 2
+
+    def test_signature_covers_every_prompted_field(self, monkeypatch, test_state, neutral_modifiers):
+        """A state differing only in cash or month gets its own request, and equal keys send equal prompts."""
+        prompts = []
+
+        def fake_call(prompt, schema):
+            prompts.append(prompt)
+            return neutral_modifiers
+
+        monkeypatch.setattr(third_order_gemini, "call_gemini_with_schema", fake_call)
+        third_order_gemini.clear_third_order_cache()
+        poorer = test_state.clone()
+        poorer.cash -= 100000
+        later = test_state.clone()
+        later.month += 1
+        near = test_state.clone()
+        near.cash += 10
+
+        for state in (test_state, poorer, later):
+            third_order_gemini.apply_third_order_effects_gemini(state)
+
+        assert len(prompts) == 3
+        assert third_order_gemini.build_third_order_prompt(near) == prompts[0]
+
+    def test_cache_evicts_least_recently_used(self, monkeypatch, test_state, neutral_modifiers):
+        """The cache stays bounded, keeps recently hit keys, and cache_clear empties it."""
+        cache = third_order_gemini._ModifierCache(2)
+        monkeypatch.setattr(third_order_gemini, "_third_order_cache", cache)
+        first, second, third = (
+            third_order_gemini.third_order_signature(test_state)[:-1] + (month,)
+            for month in (0, 1, 2)
+        )
+
+        cache.put(first, neutral_modifiers)
+        cache.put(second, neutral_modifiers)
+        assert cache.get(first) is neutral_modifiers
+        cache.put(third, neutral_modifiers)
+
+        assert len(cache) == 2
+        assert cache.get(second) is None
+        assert cache.get(first) is neutral_modifiers
+        cache.cache_clear()
+        assert len(cache) == 0
+
+    def test_shared_modifiers_are_frozen(self, neutral_modifiers):
+        """A cached response is shared between states, so it cannot be edited in place."""
+        with pytest.raises(ValidationError):
+            neutral_modifiers.ARPU_shift = 1.0
+
+    def test_vectorized_modifiers_match_scalar(self, test_state, neutral_modifiers):
+        """Each path of the batch ends where the scalar update leaves that state."""
+        modifiers = [
+            neutral_modifiers,
+            neutral_modifiers.model_copy(update={"burn_multiplier": 1.3, "ARPU_shift": -7.5}),
+            neutral_modifiers.model_copy(update={"CAC_drift": 0.9, "demand_adjustments": 1.37}),
+        ]
+        batch = BusinessStateBatch.from_state(test_state, len(modifiers))
+        batch.traffic[:] = [1000, 999, 1234]
+
+        third_order_gemini.apply_third_order_modifiers_batch(batch, modifiers)
+
+        for i, mods in enumerate(modifiers):
+            state = test_state.clone()
+            state.traffic = [1000, 999, 1234][i]
+            expected = third_order_gemini.apply_third_order_modifiers(state, mods)
+            assert batch.get_run(i) == expected
+
+        shared = BusinessStateBatch.from_state(test_state, 2)
+        third_order_gemini.apply_third_order_modifiers_batch(shared, modifiers[2])
+        expected = third_order_gemini.apply_third_order_modifiers(test_state.clone(), modifiers[2])
+        assert shared.get_run(0) == shared.get_run(1) == expected
@@ -5,21 +5,39 @@ Tests that:
 1. Validation detects constraint violations
 2. Enforcement clamps values to valid ranges
 3. Simulator integrates validation correctly
+4. Batched validation and stepping keep every path within bounds, with
+   third-order modifiers accepted in any form
+5. The short-circuit validity check and the violation bitmask agree with
+   validate_state
+6. run_batch stacks several states and records every month
 """
 
-from business_state import BusinessState
+import random
+
+import numpy as np
+import pytest
+
+import validators
+from business_state import BusinessState, BusinessStateBatch, BATCH_FIELDS
 from validators import (
     validate_state,
+    is_valid_state,
+    validate_bitmask,
     enforce_constraints,
     validate_and_enforce,
+    validate_batch,
+    enforce_constraints_batch,
+    validate_and_enforce_batch,
     ValidationResult,
     ConstraintViolation,
 )
-from simulator import BusinessSimulator
+from simulator import BusinessSimulator, resolve_action, resolve_gemini_modifiers
+from utils.schemas import ThirdOrderModifiers
 
 
-def create_valid_state() -> BusinessState:
-    """Create a valid BusinessState for testing."""
+@pytest.fixture(scope="session")
+def valid_state_proto() -> BusinessState:
+    """A valid BusinessState, built once; tests work on clones of it."""
     return BusinessState(
         cac=100.0,
         ltv=1000.0,
@@ -38,75 +56,47 @@ def create_valid_state() -> BusinessState:
     )
 
 
+@pytest.fixture
+def state(valid_state_proto) -> BusinessState:
+    """A fresh copy of the valid state for each test."""
+    return valid_state_proto.clone()
+
+
 class TestValidateState:
     """Tests for validate_state function."""
 
-    def test_valid_state_passes(self):
+    def test_valid_state_passes(self, state):
         """A valid state should pass validation."""
-        state = create_valid_state()
         result = validate_state(state)
         assert result.is_valid
         assert len(result.violations) == 0
 
-    def test_negative_customers_detected(self):
-        """Negative customers should be detected as a violation."""
-        state = create_valid_state()
-        state.customers = -10
-        result = validate_state(state)
-        assert not result.is_valid
-        assert any(v.variable == "customers" for v in result.violations)
-
-    def test_negative_revenue_detected(self):
-        """Negative revenue should be detected as a violation."""
-        state = create_valid_state()
-        state.revenue = -5000.0
-        result = validate_state(state)
-        assert not result.is_valid
-        assert any(v.variable == "revenue" for v in result.violations)
-
-    def test_negative_new_customers_detected(self):
-        """Negative new_customers should be detected."""
-        state = create_valid_state()
-        state.new_customers = -5
-        result = validate_state(state)
-        assert not result.is_valid
-        assert any(v.variable == "new_customers" for v in result.violations)
-
-    def test_negative_churned_customers_detected(self):
-        """Negative churned_customers should be detected."""
-        state = create_valid_state()
-        state.churned_customers = -5
-        result = validate_state(state)
-        assert not result.is_valid
-        assert any(v.variable == "churned_customers" for v in result.violations)
-
-    def test_churn_rate_above_one_detected(self):
-        """Churn rate above 1.0 should be detected."""
-        state = create_valid_state()
-        state.churn_rate = 1.5
-        result = validate_state(state)
-        assert not result.is_valid
-        assert any(v.variable == "churn_rate" for v in result.violations)
-
-    def test_churn_rate_below_zero_detected(self):
-        """Churn rate below 0.0 should be detected."""
-        state = create_valid_state()
-        state.churn_rate = -0.1
+    @pytest.mark.parametrize("field, bad", [
+        ("customers", -10),
+        ("revenue", -5000.0),
+        ("new_customers", -5),
+        ("churned_customers", -5),
+        ("churn_rate", 1.5),
+        ("churn_rate", -0.1),
+        ("burn", -1000.0),
+        ("cac", -50.0),
+    ])
+    def test_violation_detected(self, state, field, bad):
+        """An out-of-range field is reported as a violation of that variable."""
+        setattr(state, field, bad)
         result = validate_state(state)
         assert not result.is_valid
-        assert any(v.variable == "churn_rate" for v in result.violations)
+        assert any(v.variable == field for v in result.violations)
 
-    def test_negative_cash_not_violation(self):
+    def test_negative_cash_not_violation(self, state):
         """Negative cash is allowed (represents debt), not a violation."""
-        state = create_valid_state()
         state.cash = -50000.0
         result = validate_state(state)
         # Cash can be negative - it's logged but not a violation
         assert result.is_valid or not any(v.variable == "cash" for v in result.violations)
 
-    def test_multiple_violations_detected(self):
+    def test_multiple_violations_detected(self, state):
         """Multiple violations should all be detected."""
-        state = create_valid_state()
         state.customers = -10
         state.revenue = -5000.0
         state.churn_rate = 2.0
@@ -114,72 +104,98 @@ class TestValidateState:
         assert not result.is_valid
         assert len(result.violations) >= 3
 
-    def test_negative_burn_detected(self):
-        """Negative burn should be detected."""
-        state = create_valid_state()
-        state.burn = -1000.0
-        result = validate_state(state)
-        assert not result.is_valid
-        assert any(v.variable == "burn" for v in result.violations)
+    def test_is_valid_state_agrees_with_validate_state(self, valid_state_proto):
+        """The early-exit predicate accepts exactly what validate_state does."""
+        overrides = [
+            {},
+            {"churned_customers": -1},
+            {"churn_rate": 1.5, "arpu": -1.0},
+            {"cac": 0.005, "cash": -1.0},
+            {"traffic": float("nan")},
+        ]
+        for changes in overrides:
+            state = valid_state_proto.clone()
+            for name, value in changes.items():
+                setattr(state, name, value)
+            assert is_valid_state(state) == validate_state(state).is_valid
+
+    def test_clamp_bounds_reject_states_that_still_need_clamping(self, valid_state_proto):
+        """cac below 0.01 and NaN are valid but fail the clamp-bounds check."""
+        assert is_valid_state(valid_state_proto, clamp_bounds=True)
+        for name, value in (("cac", 0.005), ("burn", float("nan")), ("churn_rate", 1.5)):
+            state = valid_state_proto.clone()
+            setattr(state, name, value)
+            assert not is_valid_state(state, clamp_bounds=True)
+
+    def test_bitmask_flags_the_violated_rules(self, state):
+        """Bit i is set exactly for the violations validate_state reports."""
+        assert validate_bitmask(state) == 0
+        state.customers = -1
+        state.arpu = -2.0
+        state.churn_rate = 1.5
+        assert validate_bitmask(state) == 1 << 0 | 1 << 7 | 1 << 9
+        assert [v.variable for v in validate_state(state).violations] == ["customers", "arpu", "churn_rate"]
 
-    def test_negative_cac_detected(self):
-        """Negative CAC should be detected."""
-        state = create_valid_state()
-        state.cac = -50.0
-        result = validate_state(state)
-        assert not result.is_valid
-        assert any(v.variable == "cac" for v in result.violations)
+    def test_bitmask_matches_rules(self, valid_state_proto):
+        """The hand-written bitmask sets bit i for exactly the field of _RULES[i]."""
+        for bit, (name, _, ceiling, _, _) in enumerate(validators._RULES):
+            state = valid_state_proto.clone()
+            setattr(state, name, -1 if ceiling is None else ceiling + 1)
+            assert validate_bitmask(state) == 1 << bit, name
+            assert [v.variable for v in validate_state(state).violations] == [name]
+
+    def test_valid_states_share_one_result(self, state):
+        """A valid state allocates no ValidationResult of its own."""
+        assert validate_state(state) is validate_state(state.clone())
+        assert validate_state(state).violations == []
 
 
 class TestEnforceConstraints:
     """Tests for enforce_constraints function."""
 
-    def test_negative_customers_clamped(self):
-        """Negative customers should be clamped to 0."""
-        state = create_valid_state()
-        state.customers = -10
-        enforce_constraints(state)
-        assert state.customers == 0
-
-    def test_negative_revenue_clamped(self):
-        """Negative revenue should be clamped to 0."""
-        state = create_valid_state()
-        state.revenue = -5000.0
-        enforce_constraints(state)
-        assert state.revenue == 0.0
-
-    def test_churn_rate_clamped_to_range(self):
-        """Churn rate should be clamped to [0, 1]."""
-        state = create_valid_state()
-        state.churn_rate = 1.5
-        enforce_constraints(state)
-        assert state.churn_rate == 1.0
-
-        state.churn_rate = -0.1
+    @pytest.mark.parametrize("field, bad, clamped", [
+        ("customers", -10, 0),
+        ("revenue", -5000.0, 0.0),
+        ("churn_rate", 1.5, 1.0),
+        ("churn_rate", -0.1, 0.0),
+        # CAC is kept at 0.01 to prevent division by zero
+        ("cac", 0.0, 0.01),
+        ("cac", -100.0, 0.01),
+    ])
+    def test_value_clamped(self, state, field, bad, clamped):
+        """An out-of-range field is clamped to the nearest valid value."""
+        setattr(state, field, bad)
         enforce_constraints(state)
-        assert state.churn_rate == 0.0
+        assert getattr(state, field) == clamped
 
-    def test_cac_clamped_to_minimum(self):
-        """CAC should be clamped to minimum 0.01 to prevent division by zero."""
-        state = create_valid_state()
-        state.cac = 0.0
-        enforce_constraints(state)
-        assert state.cac == 0.01
-
-        state.cac = -100.0
-        enforce_constraints(state)
-        assert state.cac == 0.01
-
-    def test_cash_not_clamped(self):
+    def test_cash_not_clamped(self, state):
         """Cash should NOT be clamped - negative cash represents debt."""
-        state = create_valid_state()
         state.cash = -50000.0
         enforce_constraints(state)
         assert state.cash == -50000.0
 
-    def test_valid_state_unchanged(self):
+    @pytest.mark.parametrize("changes", [
+        {},
+        {"customers": -3, "traffic": -1, "arpu": -0.5, "cac": 0.001},
+        {"churn_rate": float("nan"), "burn": float("nan"), "ad_spend": -1e9},
+        {"new_customers": -2, "churned_customers": -4, "revenue": -1.0, "churn_rate": 7.0},
+    ])
+    def test_matches_builtin_clamps(self, state, changes):
+        """The clamps agree with the builtin max/min formulas, NaN included."""
+        for name, value in changes.items():
+            setattr(state, name, value)
+        expected = state.clone()
+        for name in ("customers", "new_customers", "churned_customers", "traffic"):
+            setattr(expected, name, max(0, getattr(expected, name)))
+        for name in ("revenue", "burn", "ad_spend", "arpu"):
+            setattr(expected, name, max(0.0, getattr(expected, name)))
+        expected.cac = max(0.01, expected.cac)
+        expected.churn_rate = max(0.0, min(1.0, expected.churn_rate))
+
+        assert enforce_constraints(state) == expected
+
+    def test_valid_state_unchanged(self, state):
         """A valid state should remain unchanged after enforcement."""
-        state = create_valid_state()
         original_customers = state.customers
         original_revenue = state.revenue
         enforce_constraints(state)
@@ -190,18 +206,16 @@ class TestEnforceConstraints:
 class TestValidateAndEnforce:
     """Tests for validate_and_enforce combined function."""
 
-    def test_returns_tuple(self):
+    def test_returns_tuple(self, state):
         """Should return (state, validation_result) tuple."""
-        state = create_valid_state()
         result = validate_and_enforce(state)
         assert isinstance(result, tuple)
         assert len(result) == 2
         assert isinstance(result[0], BusinessState)
         assert isinstance(result[1], ValidationResult)
 
-    def test_enforces_after_validation(self):
+    def test_enforces_after_validation(self, state):
         """Should enforce constraints after validating."""
-        state = create_valid_state()
         state.customers = -10
         state.churn_rate = 1.5
         state, validation_result = validate_and_enforce(state)
@@ -211,6 +225,49 @@ class TestValidateAndEnforce:
         assert state.customers == 0
         assert state.churn_rate == 1.0
 
+    @pytest.mark.parametrize("changes, clamped, violations", [
+        ({}, {}, []),
+        (
+            {"customers": -10, "revenue": -5.0, "churn_rate": 1.5},
+            {"customers": 0, "revenue": 0.0, "churn_rate": 1.0},
+            [
+                ("customers", -10, "non_negative", "Negative customers: -10"),
+                ("revenue", -5.0, "non_negative", "Negative revenue: -5.0"),
+                ("churn_rate", 1.5, "rate_bounds", "Invalid churn_rate (must be 0-1): 1.5"),
+            ],
+        ),
+        (
+            {"cac": 0.005, "arpu": -1.0, "traffic": -3},
+            {"cac": 0.01, "arpu": 0.0, "traffic": 0},
+            [
+                ("arpu", -1.0, "non_negative", "Negative ARPU: -1.0"),
+                ("traffic", -3, "non_negative", "Negative traffic: -3"),
+            ],
+        ),
+        ({"cac": 0.005}, {"cac": 0.01}, []),
+        (
+            {"churn_rate": float("nan"), "burn": float("nan"), "cash": -1.0},
+            {"churn_rate": 1.0, "burn": 0.0, "cash": -1.0},
+            [],
+        ),
+    ])
+    def test_records_and_clamps_in_one_pass(self, state, changes, clamped, violations):
+        """Out-of-range fields are clamped and reported; cac below 0.01 and NaN are clamped silently."""
+        for name, value in changes.items():
+            setattr(state, name, value)
+        expected = state.clone()
+        for name, value in clamped.items():
+            setattr(expected, name, value)
+
+        _, result = validate_and_enforce(state, log_violations=False)
+
+        assert state.to_dict() == expected.to_dict()
+        assert result.is_valid == (not violations)
+        assert [
+            (v.variable, v.value, v.constraint, v.message) for v in result.violations
+        ] == violations
+        assert all(v.month == 1 for v in result.violations)
+
 
 class TestSimulatorIntegration:
     """Tests for simulator integration with validators."""
@@ -221,10 +278,9 @@ class TestSimulatorIntegration:
         assert hasattr(sim, "violations")
         assert sim.violations == []
 
-    def test_simulator_enforces_constraints_by_default(self):
+    def test_simulator_enforces_constraints_by_default(self, state):
         """Simulator step should enforce constraints by default."""
         sim = BusinessSimulator()
-        state = create_valid_state()
         # Create a state that would result in negative customers after simulation
         state.customers = 10
         state.churn_rate = 0.99  # Very high churn
@@ -234,10 +290,9 @@ class TestSimulatorIntegration:
         # Even with high churn, customers should not go negative
         assert new_state.customers >= 0
 
-    def test_simulator_records_violations(self):
+    def test_simulator_records_violations(self, state):
         """Simulator should record violations when they occur."""
         sim = BusinessSimulator()
-        state = create_valid_state()
         # Force a state that triggers validation
         state.churn_rate = 1.5  # Invalid churn rate
 
@@ -264,33 +319,173 @@ class TestSimulatorIntegration:
         sim.clear_violations()
         assert not sim.has_violations()
 
-    def test_simulator_validate_flag(self):
+    def test_simulator_validate_flag(self, state):
         """Simulator should respect validate=False flag."""
         sim = BusinessSimulator()
-        state = create_valid_state()
         # Even with validate=False, simulation should work
         new_state = sim.step(state, validate=False)
         assert new_state.month == state.month + 1
 
-    def test_customers_stay_non_negative_over_time(self):
+    def test_resolved_action_matches_dict_action(self, state):
+        """Pre-resolved action pairs drop unknown keys and step like the dict."""
+        action = {"ad_spend": 20000.0, "not_a_field": 1}
+        pairs = resolve_action(state, action)
+        assert pairs == (("ad_spend", 20000.0),)
+        assert BusinessSimulator().step(state, pairs, validate=False).ad_spend == 20000.0
+
+    def test_resolve_action_ignores_methods(self, state):
+        """Only dataclass fields resolve; method names are not state variables."""
+        assert resolve_action(state, {"clone": 1, "cash": 5.0}) == (("cash", 5.0),)
+        batch = BusinessStateBatch.from_state(state, num_runs=2)
+        assert resolve_action(batch, {"get_run": 1, "cash": 5.0}) == (("cash", 5.0),)
+
+    def test_gemini_modifiers_apply_in_table_order(self, state):
+        """Each present modifier draws one noise value, in GEMINI_UPDATES order."""
+        modifiers = {"CAC_drift": 1.1, "burn_multiplier": 1.2, "demand_adjustments": 0.9}
+        BusinessSimulator()._apply_gemini_modifiers(state, modifiers, random.Random(5))
+
+        rng = random.Random(5)
+        burn_noise, cac_noise, demand_noise = (rng.uniform(0.95, 1.05) for _ in range(3))
+        assert state.burn == 10000.0 * (1.2 * burn_noise)
+        assert state.cac == 100.0 * (1.1 * cac_noise)
+        assert state.traffic == int(10000 * 0.9 * demand_noise)
+        assert state.arpu == 50.0
+
+    def test_resolved_gemini_plan_matches_dict(self, valid_state_proto):
+        """A resolved plan (from a dict or the model) applies like the raw dict."""
+        modifiers = ThirdOrderModifiers(
+            burn_multiplier=1.01, ARPU_shift=-0.1, CAC_drift=1.02,
+            strategic_penalty=0.0, long_term_risk=0.5, demand_adjustments=0.9,
+        )
+        sim = BusinessSimulator()
+        expected = valid_state_proto.clone()
+        sim._apply_gemini_modifiers(expected, modifiers.model_dump(), random.Random(2))
+
+        for source in (modifiers, modifiers.model_dump()):
+            plan = resolve_gemini_modifiers(source)
+            assert resolve_gemini_modifiers(plan) is plan
+            state = valid_state_proto.clone()
+            sim._apply_gemini_modifiers(state, plan, random.Random(2))
+            assert state == expected
+
+    def test_customers_stay_non_negative_over_time(self, state):
         """Over multiple steps, customers should never go negative."""
         sim = BusinessSimulator()
-        state = create_valid_state()
         state.customers = 100
         state.churn_rate = 0.50  # 50% monthly churn
         state.ad_spend = 100  # Very low ad spend
 
-        for _ in range(24):  # Simulate 2 years
-            state = sim.step(state)
-            assert state.customers >= 0, f"Customers went negative: {state.customers}"
+        history = sim.run_batch([state] * 20, 24)  # 20 paths over 2 years
+        assert (history["customers"] >= 0).all()
 
-    def test_revenue_stays_non_negative(self):
+    def test_revenue_stays_non_negative(self, state):
         """Revenue should never go negative."""
         sim = BusinessSimulator()
-        state = create_valid_state()
         state.customers = 10
         state.churn_rate = 0.80  # Very high churn
 
-        for _ in range(12):
-            state = sim.step(state)
-            assert state.revenue >= 0, f"Revenue went negative: {state.revenue}"
+        history = sim.run_batch([state] * 20, 12)
+        assert (history["revenue"] >= 0).all()
+
+
+class TestBatchValidation:
+    """Tests for the vectorized validators and BusinessSimulator.step_batch."""
+
+    def test_batch_violations_summarized_per_variable(self, state):
+        """One violation per variable, reporting the worst path."""
+        batch = BusinessStateBatch.from_state(state, num_runs=4)
+        batch.customers[[0, 2]] = [-10, -3]
+        result = validate_batch(batch)
+        assert not result.is_valid
+        assert len(result.violations) == 1
+        assert result.violations[0].variable == "customers"
+        assert result.violations[0].value == -10
+
+    def test_batch_enforcement_clamps_every_path(self, state):
+        """Enforcement clamps each path like the scalar version."""
+        batch = BusinessStateBatch.from_state(state, num_runs=3)
+        batch.churn_rate[:] = [-0.5, 0.5, 1.5]
+        batch.cac[:] = [-5, 0.001, 50]
+        enforce_constraints_batch(batch)
+        np.testing.assert_array_equal(batch.churn_rate, [0.0, 0.5, 1.0])
+        np.testing.assert_array_equal(batch.cac, [0.01, 0.01, 50])
+
+    def test_fused_batch_pass_matches_separate_calls(self, valid_state_proto):
+        """validate_and_enforce_batch reports and clamps like the two passes."""
+        for churn in ([0.1, 0.2, 0.3], [-0.5, 0.5, 1.5]):
+            fused = BusinessStateBatch.from_state(valid_state_proto, num_runs=3)
+            fused.churn_rate[:] = churn
+            fused.cac[:] = [-5, 0.001, 50]
+            fused.revenue[1] = -2.0
+            separate = BusinessStateBatch.from_state(valid_state_proto, num_runs=3)
+            separate.churn_rate[:] = churn
+            separate.cac[:] = [-5, 0.001, 50]
+            separate.revenue[1] = -2.0
+
+            _, result = validate_and_enforce_batch(fused, log_violations=False)
+            expected = validate_batch(separate)
+            enforce_constraints_batch(separate)
+
+            assert result.violations == expected.violations
+            for name in BATCH_FIELDS:
+                np.testing.assert_array_equal(getattr(fused, name), getattr(separate, name))
+
+    def test_run_batch_records_each_state_as_a_path(self, valid_state_proto):
+        """One column per starting state; seeded simulators replay the history."""
+        low, high = valid_state_proto.clone(), valid_state_proto.clone()
+        high.cash = 2 * low.cash
+        first = BusinessSimulator(seed=3).run_batch([low, high], 6, {"ad_spend": 0.0})
+        second = BusinessSimulator(seed=3).run_batch([low, high], 6, {"ad_spend": 0.0})
+
+        assert set(first) == set(BATCH_FIELDS)
+        assert first["cash"].shape == (6, 2)
+        assert (first["ad_spend"] == 0.0).all()
+        for name in BATCH_FIELDS:
+            np.testing.assert_array_equal(first[name], second[name])
+
+    def test_from_states_round_trips(self, valid_state_proto):
+        """Path i of the stacked batch is states[i]; mixed months are rejected."""
+        other = valid_state_proto.clone()
+        other.customers, other.churn_rate = 7, 0.3
+        batch = BusinessStateBatch.from_states([valid_state_proto, other])
+        assert batch.get_run(0) == valid_state_proto
+        assert batch.get_run(1) == other
+
+        later = valid_state_proto.clone()
+        later.month += 1
+        with pytest.raises(ValueError):
+            BusinessStateBatch.from_states([valid_state_proto, later])
+
+    def test_step_batch_accepts_every_modifier_form(self, valid_state_proto):
+        """A model or a resolved plan steps the batch exactly like the dict."""
+        modifiers = ThirdOrderModifiers(
+            burn_multiplier=1.2, ARPU_shift=-3.0, CAC_drift=1.1,
+            strategic_penalty=0.0, long_term_risk=0.9, demand_adjustments=0.8,
+        )
+        results = []
+        for source in (modifiers.model_dump(), modifiers, resolve_gemini_modifiers(modifiers)):
+            batch = BusinessStateBatch.from_state(valid_state_proto, num_runs=8)
+            BusinessSimulator().step_batch(batch, np.random.default_rng(4), gemini_modifiers=source)
+            results.append(batch)
+
+        plain = BusinessStateBatch.from_state(valid_state_proto, num_runs=8)
+        BusinessSimulator().step_batch(plain, np.random.default_rng(4))
+        assert not np.array_equal(results[0].burn, plain.burn)
+        for batch in results[1:]:
+            for name in BATCH_FIELDS:
+                np.testing.assert_array_equal(getattr(batch, name), getattr(results[0], name))
+
+    def test_step_batch_keeps_customers_non_negative(self, state):
+        """High churn never drives any path below zero customers."""
+        sim = BusinessSimulator()
+        state.customers = 100
+        state.churn_rate = 0.50
+        state.ad_spend = 100
+        batch = BusinessStateBatch.from_state(state, num_runs=50)
+        rng = np.random.default_rng(0)
+
+        for _ in range(24):
+            batch = sim.step_batch(batch, rng)
+            assert (batch.customers >= 0).all()
+            assert (batch.revenue >= 0).all()
+        assert batch.month == state.month + 24
@@ -1,19 +1,100 @@
 """
 Third-order effects application using Gemini with JSON schema validation.
 """
-from business_state import BusinessState
-from utils.gemini_client import call_gemini_with_schema
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from business_state import BusinessState, BusinessStateBatch
+from utils.gemini_client import call_gemini_with_schema, call_gemini_with_schema_async
 from utils.schemas import ThirdOrderModifiers
 
+# Decimal places each state field is rounded to, in to_dict order. The
+# rounded values are both the cache key and what the prompt shows Gemini,
+# so two states with the same signature send the same prompt.
+_SIGNATURE_DIGITS = (
+    ("cac", 0),
+    ("ltv", -1),
+    ("arpu", 1),
+    ("burn", -2),
+    ("cash", -3),
+    ("revenue", -2),
+    ("customers", 0),
+    ("new_customers", 0),
+    ("traffic", -3),
+    ("ad_spend", -2),
+    ("runway", 1),
+    ("churn_rate", 2),
+    ("churned_customers", 0),
+    ("month", 0),
+)
 
-def build_third_order_prompt(state: BusinessState) -> str:
-    """Builds the prompt for third-order effects analysis."""
-    return f"""
+THIRD_ORDER_CACHE_SIZE = 4096
+
+
+class _ModifierCache:
+    """
+    Least-recently-used map from third_order_signature to Gemini's response.
+
+    The key is lossy on purpose: neighbouring states (e.g. Monte Carlo paths
+    a few dollars apart) share one response instead of costing a request
+    each, at the price of Gemini never seeing differences below the
+    rounding in _SIGNATURE_DIGITS. A lock guards the entries, so threads
+    stepping simulators may share the cache.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[float, ...]) -> Optional[ThirdOrderModifiers]:
+        with self._lock:
+            modifiers = self._entries.get(key)
+            if modifiers is not None:
+                self._entries.move_to_end(key)
+            return modifiers
+
+    def put(self, key: Tuple[float, ...], modifiers: ThirdOrderModifiers) -> None:
+        with self._lock:
+            self._entries[key] = modifiers
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_third_order_cache = _ModifierCache(THIRD_ORDER_CACHE_SIZE)
+
+
+def clear_third_order_cache() -> None:
+    """Drops every cached Gemini response."""
+    _third_order_cache.cache_clear()
+
+
+def third_order_signature(state: BusinessState) -> Tuple[float, ...]:
+    """Rounds every field the prompt includes into a cache key."""
+    return tuple(round(getattr(state, name), digits) for name, digits in _SIGNATURE_DIGITS)
+
+
+# Fixed text around the state in the third-order prompt
+_PROMPT_PREFIX = """
 You are a strategic business simulation engine.
 Analyze the current business state and determine 3rd order effects (strategic emergent effects).
 
 Current State:
-{state.to_dict()}
+"""
+
+_PROMPT_SUFFIX = """
 
 Consider:
 - Core business degradation
@@ -26,19 +107,99 @@ Return the modifiers as JSON.
 """
 
 
+def _prompt_for_signature(signature: Tuple[float, ...]) -> str:
+    state = {name: value for (name, _), value in zip(_SIGNATURE_DIGITS, signature)}
+    return _PROMPT_PREFIX + str(state) + _PROMPT_SUFFIX
+
+
+def build_third_order_prompt(state: BusinessState) -> str:
+    """Builds the prompt for third-order effects analysis from the rounded state."""
+    return _prompt_for_signature(third_order_signature(state))
+
+
 def apply_third_order_effects_gemini(state: BusinessState) -> BusinessState:
     """
     Applies strategic emergent effects using Gemini with schema validation.
     
-    Mutates and returns the state with third-order effects applied.
+    Mutates and returns the state with third-order effects applied. States
+    with the same third_order_signature reuse the first response.
     """
-    prompt = build_third_order_prompt(state)
-    modifiers = call_gemini_with_schema(prompt, ThirdOrderModifiers)
-    
-    # Apply modifiers to state
+    key = third_order_signature(state)
+    modifiers = _third_order_cache.get(key)
+    if modifiers is None:
+        modifiers = call_gemini_with_schema(_prompt_for_signature(key), ThirdOrderModifiers)
+        _third_order_cache.put(key, modifiers)
+    return apply_third_order_modifiers(state, modifiers)
+
+
+def apply_third_order_modifiers(state: BusinessState, modifiers: ThirdOrderModifiers) -> BusinessState:
+    """Applies Gemini's modifiers to the state in place and returns it."""
     state.burn *= modifiers.burn_multiplier
     state.arpu += modifiers.ARPU_shift
     state.cac *= modifiers.CAC_drift
     state.traffic = int(state.traffic * modifiers.demand_adjustments)
-    
+
     return state
+
+
+def apply_third_order_modifiers_batch(
+    batch: BusinessStateBatch,
+    modifiers: Union[ThirdOrderModifiers, Sequence[ThirdOrderModifiers]]
+) -> BusinessStateBatch:
+    """
+    Vectorized apply_third_order_modifiers: path i gets modifiers[i], or
+    every path the same modifiers when a single model is passed.
+
+    The four modifier columns are gathered once and applied as in-place
+    array ops; int() truncation of traffic becomes np.trunc. Mutates and
+    returns the batch.
+    """
+    if isinstance(modifiers, ThirdOrderModifiers):
+        burn_multiplier = modifiers.burn_multiplier
+        arpu_shift = modifiers.ARPU_shift
+        cac_drift = modifiers.CAC_drift
+        demand = modifiers.demand_adjustments
+    else:
+        n = len(modifiers)
+        burn_multiplier = np.fromiter((m.burn_multiplier for m in modifiers), dtype=np.float64, count=n)
+        arpu_shift = np.fromiter((m.ARPU_shift for m in modifiers), dtype=np.float64, count=n)
+        cac_drift = np.fromiter((m.CAC_drift for m in modifiers), dtype=np.float64, count=n)
+        demand = np.fromiter((m.demand_adjustments for m in modifiers), dtype=np.float64, count=n)
+
+    np.multiply(batch.burn, burn_multiplier, out=batch.burn)
+    np.add(batch.arpu, arpu_shift, out=batch.arpu)
+    np.multiply(batch.cac, cac_drift, out=batch.cac)
+    np.trunc(np.multiply(batch.traffic, demand, out=batch.traffic), out=batch.traffic)
+
+    return batch
+
+
+async def apply_third_order_effects_batch(states: List[BusinessState]) -> List[BusinessState]:
+    """
+    apply_third_order_effects_gemini over many states with the Gemini
+    requests issued concurrently, so a batch costs about one round trip
+    instead of one per state.
+
+    Mutates and returns the states, in order. Only one request is sent per
+    signature not already cached.
+    """
+    keys = [third_order_signature(state) for state in states]
+    cached = {}
+    missing = []
+    for key in keys:
+        if key not in cached:
+            cached[key] = _third_order_cache.get(key)
+            if cached[key] is None:
+                missing.append(key)
+    results = await asyncio.gather(*(
+        call_gemini_with_schema_async(_prompt_for_signature(key), ThirdOrderModifiers) for key in missing
+    ))
+    for key, modifiers in zip(missing, results):
+        _third_order_cache.put(key, modifiers)
+        cached[key] = modifiers
+    return [apply_third_order_modifiers(state, cached[key]) for state, key in zip(states, keys)]
+
+
+def apply_third_order_effects_gemini_many(states: List[BusinessState]) -> List[BusinessState]:
+    """Synchronous entry point for apply_third_order_effects_batch."""
+    return asyncio.run(apply_third_order_effects_batch(states))
@@ -4,10 +4,11 @@ Gemini API client with JSON schema enforcement via Pydantic models.
 Uses the new google-genai SDK as per:
 https://ai.google.dev/gemini-api/docs/structured-output
 """
+import functools
 import os
 from typing import Type, TypeVar
 from google import genai
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,6 +20,31 @@ T = TypeVar("T", bound=BaseModel)
 MODEL_NAME = "gemini-2.5-flash"
 
 
+@functools.lru_cache(maxsize=1)
+def _get_client() -> genai.Client:
+    """One client per process; building it per call repeated the HTTP/TLS setup."""
+    return genai.Client(api_key=API_KEY)
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_json(schema: Type[BaseModel]) -> dict:
+    """JSON schema for a response model, generated once per class."""
+    return schema.model_json_schema()
+
+
+@functools.lru_cache(maxsize=None)
+def _adapter(schema: Type[T]) -> TypeAdapter:
+    """Response validator for a model class, built once per class."""
+    return TypeAdapter(schema)
+
+
+def _generation_config(schema: Type[BaseModel]) -> dict:
+    return {
+        "response_mime_type": "application/json",
+        "response_json_schema": _schema_json(schema),
+    }
+
+
 def call_gemini_with_schema(prompt: str, schema: Type[T]) -> T:
     """
     Calls Gemini with a prompt and enforces response structure via JSON schema.
@@ -37,15 +63,40 @@ def call_gemini_with_schema(prompt: str, schema: Type[T]) -> T:
     if not API_KEY:
         raise ValueError("GOOGLE_API_KEY not set; cannot call Gemini.")
 
-    client = genai.Client(api_key=API_KEY)
-    
+    client = _get_client()
+
     response = client.models.generate_content(
         model=MODEL_NAME,
         contents=prompt,
-        config={
-            "response_mime_type": "application/json",
-            "response_json_schema": schema.model_json_schema(),
-        },
+        config=_generation_config(schema),
     )
     
-    return schema.model_validate_json(response.text)
+    return _adapter(schema).validate_json(response.text)
+
+
+async def call_gemini_with_schema_async(prompt: str, schema: Type[T]) -> T:
+    """
+    call_gemini_with_schema on the client's native async API, so several
+    requests can be in flight at once (e.g. under asyncio.gather).
+
+    Args:
+        prompt: The prompt to send to Gemini
+        schema: A Pydantic model class defining the expected response structure
+
+    Returns:
+        An instance of the schema class populated with Gemini's response
+
+    Raises:
+        ValueError: If GOOGLE_API_KEY is not set
+        Exception: If Gemini API call or parsing fails
+    """
+    if not API_KEY:
+        raise ValueError("GOOGLE_API_KEY not set; cannot call Gemini.")
+
+    response = await _get_client().aio.models.generate_content(
+        model=MODEL_NAME,
+        contents=prompt,
+        config=_generation_config(schema),
+    )
+
+    return _adapter(schema).validate_json(response.text)
@@ -2,12 +2,16 @@
 Pydantic schemas for Gemini API structured outputs.
 These are used to enforce JSON schema validation on Gemini responses.
 """
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ThirdOrderModifiers(BaseModel):
     """Third-order strategic effects returned by Gemini for simulation physics."""
+    # Frozen: one cached response is shared by every state with the same
+    # signature (see third_order_gemini), so it must not be mutated in place
+    model_config = ConfigDict(frozen=True)
+
     burn_multiplier: float = Field(
         description="Monthly burn rate multiplier (e.g., 1.01 for 1% monthly increase)"
     )
@@ -64,3 +68,26 @@ class StrategicDecisions(BaseModel):
     decisions: List[StrategicDecision] = Field(
         description="3-5 strategic decision options"
     )
+
+
+class CashPercentiles(BaseModel):
+    """Cash percentiles across Monte Carlo runs for one month."""
+    month: int
+    p10: float
+    p50: float
+    p90: float
+
+
+class SimulationResponse(BaseModel):
+    """Response body of the /simulate endpoints (see monte_carlo.run_monte_carlo)."""
+    survival_probability: float
+    p10: float
+    p50: float
+    p90: float
+    series: List[CashPercentiles]
+    traces: List[List[Dict[str, Union[int, float]]]]
+    gemini_modifiers: Dict[str, float]
+    gemini_recommendations: List[str]
+    gemini_risks: List[str]
+    gemini_opportunities: List[str]
+    gemini_analysis: Dict[str, List[str]]
@@ -6,15 +6,18 @@ to ensure simulation results stay within sensible bounds.
 """
 
 import logging
+import math
 from dataclasses import dataclass, field
 from typing import List
 
-from business_state import BusinessState
+import numpy as np
+
+from business_state import BusinessState, BusinessStateBatch
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ConstraintViolation:
     """Records a single constraint violation."""
     variable: str
@@ -24,7 +27,7 @@ class ConstraintViolation:
     month: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationResult:
     """Result of validating a BusinessState."""
     is_valid: bool
@@ -41,6 +44,84 @@ class ValidationResult:
         self.is_valid = False
 
 
+# Scalar constraints as (field, floor, ceiling, constraint, label). A value
+# below 0 (or above the ceiling) is a violation; enforcement clamps into
+# [floor, ceiling], so cac is raised to 0.01 without counting as a violation.
+# validate_state, enforce_constraints and the checks below all read this table.
+_RULES = (
+    ("customers", 0, None, "non_negative", "customers"),
+    ("new_customers", 0, None, "non_negative", "new_customers"),
+    ("churned_customers", 0, None, "non_negative", "churned_customers"),
+    ("revenue", 0.0, None, "non_negative", "revenue"),
+    ("burn", 0.0, None, "non_negative", "burn"),
+    ("ad_spend", 0.0, None, "non_negative", "ad_spend"),
+    ("cac", 0.01, None, "non_negative", "CAC"),  # Prevent division by zero
+    ("arpu", 0.0, None, "non_negative", "ARPU"),
+    ("traffic", 0, None, "non_negative", "traffic"),
+    ("churn_rate", 0.0, 1.0, "rate_bounds", "churn_rate"),
+)
+
+# Fields for the early-exit checks, most often violated first. Only arpu can
+# be driven negative by a step itself (the additive ARPU_shift modifier);
+# the rest break only when an action sets them out of range.
+_CHECK_ORDER = (
+    "arpu", "churn_rate", "cac", "burn", "ad_spend", "traffic",
+    "revenue", "customers", "new_customers", "churned_customers",
+)
+
+# (field, low, high) in _CHECK_ORDER: the violation bounds of validate_state,
+# and the clamp bounds of enforce_constraints (cac's floor is 0.01)
+_RULE_BY_FIELD = {rule[0]: rule for rule in _RULES}
+_VALID_BOUNDS = tuple(
+    (name, 0, math.inf if _RULE_BY_FIELD[name][2] is None else _RULE_BY_FIELD[name][2])
+    for name in _CHECK_ORDER
+)
+_CLAMP_BOUNDS = tuple(
+    (name, _RULE_BY_FIELD[name][1], math.inf if _RULE_BY_FIELD[name][2] is None else _RULE_BY_FIELD[name][2])
+    for name in _CHECK_ORDER
+)
+
+
+def _violation_message(constraint: str, label: str, value) -> str:
+    if constraint == "rate_bounds":
+        return f"Invalid {label} (must be 0-1): {value}"
+    return f"Negative {label}: {value}"
+
+
+def validate_bitmask(state: BusinessState) -> int:
+    """
+    Returns the violated constraints of validate_state as a bitmask, bit i
+    standing for _RULES[i] (bit 0 = customers < 0, ..., bit 9 = churn_rate
+    outside [0, 1]); 0 means the state is valid. No violation objects or
+    messages are built; validate_state (and so every simulator step) uses
+    it as a prefilter and only describes the set bits.
+
+    Args:
+        state: The BusinessState to check
+
+    Returns:
+        The violation bitmask
+    """
+    # Bit i is _RULES[i]; test_bitmask_matches_rules keeps the two in step
+    churn_rate = state.churn_rate
+    m = (state.customers < 0) << 0
+    m |= (state.new_customers < 0) << 1
+    m |= (state.churned_customers < 0) << 2
+    m |= (state.revenue < 0) << 3
+    m |= (state.burn < 0) << 4
+    m |= (state.ad_spend < 0) << 5
+    m |= (state.cac < 0) << 6
+    m |= (state.arpu < 0) << 7
+    m |= (state.traffic < 0) << 8
+    m |= (churn_rate < 0.0 or churn_rate > 1.0) << 9
+    return m
+
+
+# Shared result for valid states, so the common case allocates nothing.
+# Callers must not add violations to it.
+_EMPTY_RESULT = ValidationResult(is_valid=True)
+
+
 def validate_state(state: BusinessState) -> ValidationResult:
     """
     Validates a BusinessState against mathematical integrity constraints.
@@ -56,76 +137,24 @@ def validate_state(state: BusinessState) -> ValidationResult:
     Returns:
         ValidationResult with any violations found
     """
-    result = ValidationResult(is_valid=True)
     month = state.month
-
-    # Non-negative constraints
-    if state.customers < 0:
-        result.add_violation(
-            "customers", state.customers, "non_negative",
-            f"Negative customers: {state.customers}", month
-        )
-
-    if state.new_customers < 0:
-        result.add_violation(
-            "new_customers", state.new_customers, "non_negative",
-            f"Negative new_customers: {state.new_customers}", month
-        )
-
-    if state.churned_customers < 0:
-        result.add_violation(
-            "churned_customers", state.churned_customers, "non_negative",
-            f"Negative churned_customers: {state.churned_customers}", month
-        )
-
-    if state.revenue < 0:
-        result.add_violation(
-            "revenue", state.revenue, "non_negative",
-            f"Negative revenue: {state.revenue}", month
-        )
-
-    if state.burn < 0:
-        result.add_violation(
-            "burn", state.burn, "non_negative",
-            f"Negative burn: {state.burn}", month
-        )
-
-    if state.ad_spend < 0:
-        result.add_violation(
-            "ad_spend", state.ad_spend, "non_negative",
-            f"Negative ad_spend: {state.ad_spend}", month
-        )
-
-    if state.cac < 0:
-        result.add_violation(
-            "cac", state.cac, "non_negative",
-            f"Negative CAC: {state.cac}", month
-        )
-
-    if state.arpu < 0:
-        result.add_violation(
-            "arpu", state.arpu, "non_negative",
-            f"Negative ARPU: {state.arpu}", month
-        )
-
-    if state.traffic < 0:
-        result.add_violation(
-            "traffic", state.traffic, "non_negative",
-            f"Negative traffic: {state.traffic}", month
-        )
-
-    # Rate bounds
-    if state.churn_rate < 0 or state.churn_rate > 1:
-        result.add_violation(
-            "churn_rate", state.churn_rate, "rate_bounds",
-            f"Invalid churn_rate (must be 0-1): {state.churn_rate}", month
-        )
-
     # Note: cash CAN be negative (represents debt/deficit)
     # We log a warning but don't treat it as a constraint violation
     if state.cash < 0:
-        logger.debug(f"Month {month}: Negative cash balance: {state.cash}")
+        logger.debug("Month %s: Negative cash balance: %s", month, state.cash)
 
+    # The bitmask prefilter: a valid state builds no violation objects
+    mask = validate_bitmask(state)
+    if not mask:
+        return _EMPTY_RESULT
+
+    result = ValidationResult(is_valid=True)
+    for bit, (name, _, _, constraint, label) in enumerate(_RULES):
+        if mask >> bit & 1:
+            value = getattr(state, name)
+            result.add_violation(
+                name, value, constraint, _violation_message(constraint, label, value), month
+            )
     return result
 
 
@@ -134,7 +163,8 @@ def enforce_constraints(state: BusinessState) -> BusinessState:
     Enforces constraints by clamping values to valid ranges.
 
     This is called after validation to ensure the simulation can continue
-    even if edge cases produce invalid intermediate values.
+    even if edge cases produce invalid intermediate values. A thin wrapper
+    over the fused pass, discarding its violations.
 
     Args:
         state: The BusinessState to enforce constraints on
@@ -142,26 +172,74 @@ def enforce_constraints(state: BusinessState) -> BusinessState:
     Returns:
         The same BusinessState with values clamped to valid ranges
     """
-    # Clamp non-negative values
-    state.customers = max(0, state.customers)
-    state.new_customers = max(0, state.new_customers)
-    state.churned_customers = max(0, state.churned_customers)
-    state.revenue = max(0.0, state.revenue)
-    state.burn = max(0.0, state.burn)
-    state.ad_spend = max(0.0, state.ad_spend)
-    state.cac = max(0.01, state.cac)  # Prevent division by zero
-    state.arpu = max(0.0, state.arpu)
-    state.traffic = max(0, state.traffic)
-
-    # Clamp churn_rate to [0, 1]
-    state.churn_rate = max(0.0, min(1.0, state.churn_rate))
-
     # Note: cash is NOT clamped - negative cash represents debt
     # Note: runway is NOT clamped - negative runway indicates insolvency
-
+    _validate_and_enforce_fused(state)
     return state
 
 
+def _validate_and_enforce_fused(state: BusinessState) -> List[ConstraintViolation]:
+    """
+    validate_state + enforce_constraints as one pass over _RULES: each field
+    is read once, clamped into [floor, ceiling], and only written back (and
+    checked for a violation) when the clamp changed it. The `not v <= hi`
+    / `not v >= lo` form maps NaN like the builtin min/max did: churn_rate
+    to 1.0, every other field to its floor.
+
+    This stays plain Python rather than a JIT kernel: numba is not a
+    dependency, and boxing ten attributes into a compiled call and a tuple
+    back out, then writing each field back, would cost more than this
+    sub-microsecond pass.
+    """
+    violations = []
+    month = state.month
+    for name, floor, ceiling, constraint, label in _RULES:
+        value = getattr(state, name)
+        clamped = ceiling if ceiling is not None and not value <= ceiling else value
+        if not clamped >= floor:
+            clamped = floor
+        if clamped != value:
+            setattr(state, name, clamped)
+            # cac in [0, 0.01) and NaN are clamped without being violations
+            if value < 0 or (ceiling is not None and value > ceiling):
+                violations.append(ConstraintViolation(
+                    name, value, constraint, _violation_message(constraint, label, value), month
+                ))
+    # Note: cash CAN be negative (represents debt/deficit); runway is not clamped
+    if state.cash < 0:
+        logger.debug("Month %s: Negative cash balance: %s", month, state.cash)
+    return violations
+
+
+def is_valid_state(state: BusinessState, clamp_bounds: bool = False) -> bool:
+    """
+    Returns whether validate_state would find no violations, stopping at
+    the first broken constraint instead of building a ValidationResult.
+
+    A valid state can still need clamping: cac in [0, 0.01) is raised to
+    0.01 and NaN fields are clamped without being violations. With
+    clamp_bounds=True the clamp bounds are checked instead (NaN fails), so
+    True means enforce_constraints would leave the state untouched.
+
+    Args:
+        state: The BusinessState to check
+        clamp_bounds: Check the enforcement bounds rather than validity
+
+    Returns:
+        True if every constraint holds
+    """
+    if clamp_bounds:
+        for name, low, high in _CLAMP_BOUNDS:
+            if not low <= getattr(state, name) <= high:
+                return False
+        return True
+    for name, low, high in _VALID_BOUNDS:
+        value = getattr(state, name)
+        if value < low or value > high:
+            return False
+    return True
+
+
 def validate_and_enforce(
     state: BusinessState,
     log_violations: bool = True
@@ -169,6 +247,16 @@ def validate_and_enforce(
     """
     Validates state and enforces constraints in one call.
 
+    Same result as validate_state followed by enforce_constraints, but in a
+    single pass over _RULES that reads each field once. Results are not
+    memoized per state: every state reaching here from BusinessSimulator.step
+    was just mutated, and a "validated" flag would go stale on any direct
+    field write.
+
+    Without logging, is_valid_state (against the clamp bounds) runs first
+    and a state it accepts is returned as-is; the fused pass and its
+    violation list are only built on failure.
+
     Args:
         state: The BusinessState to validate and enforce
         log_violations: Whether to log violations as warnings
@@ -176,15 +264,155 @@ def validate_and_enforce(
     Returns:
         Tuple of (enforced state, validation result)
     """
-    result = validate_state(state)
+    if not log_violations and is_valid_state(state, clamp_bounds=True):
+        return state, _EMPTY_RESULT
 
-    if log_violations and not result.is_valid:
+    violations = _validate_and_enforce_fused(state)
+    if not violations:
+        return state, _EMPTY_RESULT
+    result = ValidationResult(is_valid=False, violations=violations)
+
+    if log_violations:
         for violation in result.violations:
             logger.warning(
-                f"Constraint violation at month {violation.month}: "
-                f"{violation.message}"
+                "Constraint violation at month %s: %s",
+                violation.month, violation.message
             )
 
-    enforce_constraints(state)
-
     return state, result
+
+
+# Fields that must stay non-negative on every path (cash may go negative)
+NON_NEGATIVE_FIELDS = (
+    "customers", "new_customers", "churned_customers", "revenue",
+    "burn", "ad_spend", "cac", "arpu", "traffic",
+)
+
+
+# Clamp floor per field, from the scalar rules (cac is kept above zero)
+_FLOORS = {name: floor for name, floor, _, _, _ in _RULES}
+
+
+def validate_batch(batch: BusinessStateBatch) -> ValidationResult:
+    """
+    Vectorized validate_state over every path of a batch.
+
+    Records at most one violation per variable, summarizing how many paths
+    broke the constraint and the worst offending value.
+
+    Args:
+        batch: The BusinessStateBatch to validate
+
+    Returns:
+        ValidationResult with any violations found
+    """
+    result = ValidationResult(is_valid=True)
+    month = batch.month
+    num_runs = batch.num_runs
+
+    # Non-negative constraints
+    for name in NON_NEGATIVE_FIELDS:
+        values = getattr(batch, name)
+        count = int(np.count_nonzero(values < 0))
+        if count:
+            worst = float(values.min())
+            result.add_violation(
+                name, worst, "non_negative",
+                f"Negative {name} in {count}/{num_runs} paths (min {worst})", month
+            )
+
+    # Rate bounds
+    churn_rate = batch.churn_rate
+    out_of_bounds = (churn_rate < 0) | (churn_rate > 1)
+    count = int(np.count_nonzero(out_of_bounds))
+    if count:
+        worst = float(churn_rate[out_of_bounds][0])
+        result.add_violation(
+            "churn_rate", worst, "rate_bounds",
+            f"Invalid churn_rate (must be 0-1) in {count}/{num_runs} paths", month
+        )
+
+    return result
+
+
+def enforce_constraints_batch(batch: BusinessStateBatch) -> BusinessStateBatch:
+    """
+    Vectorized enforce_constraints: clamps every path in place.
+
+    Args:
+        batch: The BusinessStateBatch to enforce constraints on
+
+    Returns:
+        The same BusinessStateBatch with values clamped to valid ranges
+    """
+    for name in NON_NEGATIVE_FIELDS:
+        values = getattr(batch, name)
+        np.maximum(values, 0.0, out=values)
+    np.maximum(batch.cac, 0.01, out=batch.cac)  # Prevent division by zero
+
+    # Clamp churn_rate to [0, 1]
+    np.clip(batch.churn_rate, 0.0, 1.0, out=batch.churn_rate)
+
+    return batch
+
+
+def validate_and_enforce_batch(
+    batch: BusinessStateBatch,
+    log_violations: bool = True
+) -> tuple[BusinessStateBatch, ValidationResult]:
+    """
+    Validates and enforces constraints on a batch in one call.
+
+    Same result as validate_batch followed by enforce_constraints_batch, but
+    fused per field: one read-only min (and max for churn_rate) reduction
+    decides both. Masks are only built and rows only rewritten for fields
+    that actually break a bound, so a valid batch costs one pass per field.
+
+    Args:
+        batch: The BusinessStateBatch to validate and enforce
+        log_violations: Whether to log violations as warnings
+
+    Returns:
+        Tuple of (enforced batch, validation result)
+    """
+    result = ValidationResult(is_valid=True)
+    month = batch.month
+    num_runs = batch.num_runs
+    if not num_runs:
+        return batch, result
+
+    # Non-negative constraints
+    for name in NON_NEGATIVE_FIELDS:
+        values = getattr(batch, name)
+        lowest = values.min()
+        if lowest < 0:
+            count = int(np.count_nonzero(values < 0))
+            worst = float(lowest)
+            result.add_violation(
+                name, worst, "non_negative",
+                f"Negative {name} in {count}/{num_runs} paths (min {worst})", month
+            )
+        floor = _FLOORS[name]
+        if lowest < floor:
+            np.maximum(values, floor, out=values)
+
+    # Rate bounds
+    churn_rate = batch.churn_rate
+    if churn_rate.min() < 0 or churn_rate.max() > 1:
+        out_of_bounds = (churn_rate < 0) | (churn_rate > 1)
+        count = int(np.count_nonzero(out_of_bounds))
+        worst = float(churn_rate[out_of_bounds][0])
+        result.add_violation(
+            "churn_rate", worst, "rate_bounds",
+            f"Invalid churn_rate (must be 0-1) in {count}/{num_runs} paths", month
+        )
+        np.clip(churn_rate, 0.0, 1.0, out=churn_rate)
+
+    if log_violations and not result.is_valid:
+        for violation in result.violations:
+            logger.warning(
+                "Constraint violation at month %s: %s",
+                violation.month, violation.message
+            )
+
+    return batch, result